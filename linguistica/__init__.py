@@ -18,6 +18,7 @@ Data source
    read_wordlist
    from_corpus
    from_wordlist
+   read_sqlite
 
 For instance, if the Brown corpus is available on
 your local drive (see :ref:`rawtext`):
@@ -34,6 +35,8 @@ if you have a wordlist text file instead
 Use ``from_corpus()`` or ``from_wordlist()``
 if your data is an in-memory Python object (either a corpus text or a wordlist).
 
+Use ``read_sqlite()`` for the results saved by ``Lexicon.to_sqlite()``.
+
 .. _parameters:
 
 Parameters
@@ -52,9 +55,9 @@ corpus:
    >>> import linguistica as lxa
    >>> lxa_object = lxa.read_corpus('path/to/english-brown.txt', max_word_tokens=500000)
 
-=====================  ====================================================  =========
+=====================  ====================================================  ===========
 Parameter              Meaning                                               Default
-=====================  ====================================================  =========
+=====================  ====================================================  ===========
 ``max_word_tokens``    maximum number of word tokens to be handled           0 (= all)
 ``max_word_types``     maximum number of word types to be handled            1000
 ``min_stem_length``    minimum stem length                                   4
@@ -63,9 +66,12 @@ Parameter              Meaning                                               Def
 ``min_context_count``  minimum number of occurrences for a valid context     3
 ``n_neighbors``        number of syntactic word neighbors                    9
 ``n_eigenvectors``     number of eigenvectors (in dimensionality reduction)  11
+``embedding_method``   eigenvectors: exact (0), randomized (1), Nystrom (2)  0 (= exact)
+``max_memory``         memory budget in MB for word neighbors (float32)      0 (= none)
+``neighbor_method``    neighbors: spectral (0), MinHash (1), cosine (2)      0 (= spectral)
 ``suffixing``          whether the language is suffixing                     1 (= yes)
 ``keep_case``          whether case distinctions ("the" vs "The") are kept   0 (= no)
-=====================  ====================================================  =========
+=====================  ====================================================  ===========
 
 The method ``parameters()`` returns the parameters and their values as a dict:
 
@@ -73,8 +79,10 @@ The method ``parameters()`` returns the parameters and their values as a dict:
 
    >>> from pprint import pprint
    >>> pprint(lxa_object.parameters())
-   {'keep_case': 0,
+   {'embedding_method': 0,
+    'keep_case': 0,
     'max_affix_length': 4,
+    'max_memory': 0,
     'max_word_tokens': 0,
     'max_word_types': 1000,
     'min_context_count': 3,
@@ -82,6 +90,7 @@ The method ``parameters()`` returns the parameters and their values as a dict:
     'min_stem_length': 4,
     'n_eigenvectors': 11,
     'n_neighbors': 9,
+    'neighbor_method': 0,
     'suffixing': 1}
 
 To change one or multiple parameters of a Linguistica object,
@@ -128,18 +137,22 @@ def read_corpus(file_path, encoding=ENCODING, **kwargs):
                    **kwargs)
 
 
-def read_wordlist(file_path, encoding=ENCODING, **kwargs):
+def read_wordlist(file_path, encoding=ENCODING, cache_dir=None, **kwargs):
     """
     Create a Linguistica object with a wordlist file.
 
     :param file_path: path of input wordlist file where each line contains
         one word type (and, optionally, a whitespace plus the token count
-        for that word).
+        for that word, and then the phones of that word).
     :param encoding: encoding of the file at *file_path*. Default: ``'utf8'``
+    :param cache_dir: directory where the parsed wordlist is cached in binary
+        form, so that it is read much faster next time, e.g.
+        ``linguistica.util.CACHE_DIR``; ``None`` for no caching.
+        Default: ``None``
     :param kwargs: keyword arguments for parameters and their values.
     """
     return Lexicon(file_path=file_path, wordlist_file=True, encoding=encoding,
-                   **kwargs)
+                   cache_dir=cache_dir, **kwargs)
 
 
 def from_corpus(corpus_object, **kwargs):
@@ -164,3 +177,13 @@ def from_wordlist(wordlist_object, **kwargs):
     """
     return Lexicon(wordlist_object=wordlist_object, wordlist_file=False,
                    **kwargs)
+
+
+def read_sqlite(file_path):
+    """
+    Create a Linguistica object with an SQLite database of results saved by
+    ``Lexicon.to_sqlite()``. The results are read from the database lazily.
+
+    :param file_path: path of the database file
+    """
+    return Lexicon.from_sqlite(file_path)
@@ -0,0 +1,429 @@
+# -*- encoding: utf8 -*-
+
+"""
+SQLite databases of Linguistica results.
+
+A database has one table per relation, with text columns and indexes for
+lookups in both directions, so that it can also be queried directly; e.g.,
+the stems in signatures with the affix "ing" and at least 20 stems::
+
+    SELECT stem FROM signature_stems
+    JOIN signatures USING (signature)
+    JOIN signature_affixes USING (signature)
+    WHERE affix = 'ing' AND stem_count >= 20;
+
+Signatures are stored as text, with affixes joined by ``SEP_SIG``.
+"""
+
+import os
+import sqlite3
+import tempfile
+from collections.abc import ItemsView, Mapping, Sequence, ValuesView
+from itertools import groupby
+from urllib.request import pathname2url
+
+from linguistica.util import SEP_SIG
+
+DATABASE_VERSION = 1
+
+SCHEMA = '''
+CREATE TABLE meta (key TEXT PRIMARY KEY, value);
+CREATE TABLE parameters (name TEXT PRIMARY KEY, value);
+CREATE TABLE words (rank INTEGER PRIMARY KEY, word TEXT NOT NULL,
+                    count INTEGER NOT NULL);
+CREATE TABLE word_bigrams (word1 TEXT, word2 TEXT, count INTEGER);
+CREATE TABLE word_trigrams (word1 TEXT, word2 TEXT, word3 TEXT,
+                            count INTEGER);
+CREATE TABLE signatures (signature TEXT PRIMARY KEY, affix_count INTEGER,
+                         stem_count INTEGER, word_count INTEGER);
+CREATE TABLE signature_affixes (signature TEXT, affix TEXT);
+CREATE TABLE signature_stems (signature TEXT, stem TEXT);
+CREATE TABLE stem_words (stem TEXT, word TEXT);
+CREATE TABLE word_signatures (word TEXT, signature TEXT);
+CREATE TABLE sigtransforms (word TEXT, signature TEXT, affix TEXT);
+CREATE TABLE successors (string TEXT, successor TEXT);
+CREATE TABLE predecessors (string TEXT, predecessor TEXT);
+CREATE TABLE neighbors (word TEXT, rank INTEGER, neighbor TEXT);
+'''
+
+# created after the bulk inserts, which is faster than updating them per row
+INDEXES = '''
+CREATE UNIQUE INDEX words_word ON words (word);
+CREATE INDEX word_bigrams_words ON word_bigrams (word1, word2);
+CREATE INDEX word_bigrams_word2 ON word_bigrams (word2);
+CREATE INDEX word_trigrams_words ON word_trigrams (word1, word2, word3);
+CREATE INDEX word_trigrams_word3 ON word_trigrams (word3);
+CREATE INDEX signatures_stem_count ON signatures (stem_count);
+CREATE INDEX signature_affixes_signature ON signature_affixes
+    (signature, affix);
+CREATE INDEX signature_affixes_affix ON signature_affixes (affix, signature);
+CREATE INDEX signature_stems_signature ON signature_stems (signature, stem);
+CREATE INDEX signature_stems_stem ON signature_stems (stem, signature);
+CREATE INDEX stem_words_stem ON stem_words (stem, word);
+CREATE INDEX stem_words_word ON stem_words (word, stem);
+CREATE INDEX word_signatures_word ON word_signatures (word, signature);
+CREATE INDEX word_signatures_signature ON word_signatures (signature, word);
+CREATE INDEX sigtransforms_word ON sigtransforms (word);
+CREATE INDEX successors_string ON successors (string);
+CREATE INDEX predecessors_string ON predecessors (string);
+CREATE INDEX neighbors_word ON neighbors (word, rank);
+'''
+
+
+def _signature_text(sig):
+    return SEP_SIG.join(sig)
+
+
+def _signature(text):
+    return tuple(text.split(SEP_SIG))
+
+
+def _pairs(dict_, key=lambda x: x, value=lambda x: x):
+    # (key, value) rows of a dict of sets; an empty set is a NULL value,
+    # so that its key is kept
+    for k, values in dict_.items():
+        if not values:
+            yield key(k), None
+        for v in values:
+            yield key(k), value(v)
+
+
+def write_database(file_path, meta, parameters, wordlist, word_counter,
+                   stems_to_words, signatures_to_stems, signatures_to_words,
+                   words_to_signatures, words_to_sigtransforms, successors,
+                   predecessors, word_bigram_counter=None,
+                   word_trigram_counter=None, words_to_neighbors=None):
+    """
+    Write Linguistica results to a new SQLite database at *file_path*,
+    replacing any existing file.
+
+    All rows are inserted with ``executemany()`` in one transaction into a
+    temporary file next to *file_path*, which then replaces it.
+
+    :param file_path: path of the database file
+    :param meta: dict of run information, such as the numbers of word types
+        and tokens
+    :param parameters: the parameter dict
+    :param wordlist: words in descending order of count
+    :param word_counter: dict of words to counts
+    :param stems_to_words: dict of stems to sets of words, and so on for
+        the other signature and trie dicts
+    :param word_bigram_counter: dict of word bigrams to counts, or None
+    :param word_trigram_counter: dict of word trigrams to counts, or None
+    :param words_to_neighbors: dict of words to lists of neighbors, or None
+    """
+    file_path = os.path.abspath(file_path)
+    fd, temp_path = tempfile.mkstemp(suffix='.tmp',
+                                     dir=os.path.dirname(file_path))
+    os.close(fd)
+    try:
+        connection = sqlite3.connect(temp_path)
+        try:
+            # a new file replaces the old one only when complete,
+            # so neither the journal nor syncing is needed
+            connection.execute('PRAGMA journal_mode = OFF')
+            connection.execute('PRAGMA synchronous = OFF')
+            with connection:
+                connection.executescript(SCHEMA)
+                insert = connection.executemany
+
+                insert('INSERT INTO meta VALUES (?, ?)',
+                       dict(meta, version=DATABASE_VERSION).items())
+                insert('INSERT INTO parameters VALUES (?, ?)',
+                       parameters.items())
+                insert('INSERT INTO words VALUES (?, ?, ?)',
+                       ((rank, word, int(word_counter[word]))
+                        for rank, word in enumerate(wordlist)))
+
+                if word_bigram_counter is not None:
+                    insert('INSERT INTO word_bigrams VALUES (?, ?, ?)',
+                           (bigram + (int(count),)
+                            for bigram, count in word_bigram_counter.items()))
+                if word_trigram_counter is not None:
+                    insert('INSERT INTO word_trigrams VALUES (?, ?, ?, ?)',
+                           (trigram + (int(count),)
+                            for trigram, count
+                            in word_trigram_counter.items()))
+
+                insert('INSERT INTO signatures VALUES (?, ?, ?, ?)',
+                       ((_signature_text(sig), len(sig), len(stems),
+                         len(signatures_to_words.get(sig, ())))
+                        for sig, stems in signatures_to_stems.items()))
+                insert('INSERT INTO signature_affixes VALUES (?, ?)',
+                       ((_signature_text(sig), affix)
+                        for sig in signatures_to_stems for affix in sig))
+                insert('INSERT INTO signature_stems VALUES (?, ?)',
+                       _pairs(signatures_to_stems, key=_signature_text))
+                insert('INSERT INTO stem_words VALUES (?, ?)',
+                       _pairs(stems_to_words))
+                insert('INSERT INTO word_signatures VALUES (?, ?)',
+                       _pairs(words_to_signatures, value=_signature_text))
+                insert('INSERT INTO sigtransforms VALUES (?, ?, ?)',
+                       ((word, None, None) if sigtransform is None else
+                        (word, _signature_text(sigtransform[0]),
+                         sigtransform[1])
+                        for word, sigtransform
+                        in _pairs(words_to_sigtransforms)))
+                insert('INSERT INTO successors VALUES (?, ?)',
+                       _pairs(successors))
+                insert('INSERT INTO predecessors VALUES (?, ?)',
+                       _pairs(predecessors))
+
+                if words_to_neighbors is not None:
+                    insert('INSERT INTO neighbors VALUES (?, ?, ?)',
+                           ((word, rank, neighbor)
+                            for word, neighbors in words_to_neighbors.items()
+                            for rank, neighbor in enumerate(neighbors)))
+
+                connection.executescript(INDEXES)
+        finally:
+            connection.close()
+        os.replace(temp_path, file_path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+def connect(file_path):
+    """
+    Open the SQLite database at *file_path* read-only.
+
+    :param file_path: path of the database file
+    :rtype: sqlite3.Connection
+    """
+    if not os.path.isfile(file_path):
+        raise FileNotFoundError(file_path)
+    uri = 'file:{}?mode=ro'.format(pathname2url(os.path.abspath(file_path)))
+    # the views may be read from a thread other than the one opening them
+    return sqlite3.connect(uri, uri=True, check_same_thread=False)
+
+
+def read_meta(connection):
+    """
+    Return the run information and the parameters in a database.
+
+    :param connection: a connection from ``connect()``
+    :rtype: tuple(dict, dict)
+    """
+    meta = dict(connection.execute('SELECT key, value FROM meta'))
+    if meta.get('version') != DATABASE_VERSION:
+        raise ValueError('unknown database version -- ' +
+                         str(meta.get('version')))
+    parameters = dict(connection.execute('SELECT name, value FROM parameters'))
+    return meta, parameters
+
+
+class _ItemsView(ItemsView):
+    # one ordered scan of the table instead of one query per key
+    def __iter__(self):
+        return self._mapping.iter_items()
+
+
+class _ValuesView(ValuesView):
+    def __iter__(self):
+        for _, value in self._mapping.iter_items():
+            yield value
+
+
+class ResultView(Mapping):
+    """
+    A read-only dict of a table in a database. Values are fetched when they
+    are looked up, and iterating over the keys or items reads the table in
+    pages, so that the table is never loaded as a whole.
+
+    :param connection: a connection from ``connect()``
+    :param table: table name
+    :param key_columns: columns of the keys; a key of several columns is
+        a tuple
+    :param value_columns: columns of the values
+    :param collect: how values of a key are collected: None for a single
+        value, ``set`` or ``list`` for several
+    :param order_by: column by which a list value is ordered
+    :param key_decoder: function from a key str to a key, e.g. for signatures
+    :param key_encoder: function from a key to a key str
+    :param value_decoder: function from the value columns to a value
+    """
+
+    def __init__(self, connection, table, key_columns, value_columns,
+                 collect=None, order_by=None, key_decoder=None,
+                 key_encoder=None, value_decoder=None):
+        self._connection = connection
+        self._n_keys = len(key_columns)
+        self._collect = collect
+        self._key_decoder = key_decoder
+        self._key_encoder = key_encoder
+        self._value_decoder = value_decoder
+
+        keys = ', '.join(key_columns)
+        values = ', '.join(value_columns)
+        where = ' AND '.join(column + ' = ?' for column in key_columns)
+        # a key column is NULL in the rows of an empty set of the other
+        # direction, e.g., the stem of a signature without stems
+        not_null = ' AND '.join(column + ' IS NOT NULL'
+                                for column in key_columns)
+        order = ' ORDER BY ' + order_by if order_by else ''
+        self._keys_sql = ('SELECT DISTINCT {} FROM {} WHERE {} '
+                          'ORDER BY {}'.format(keys, table, not_null, keys))
+        self._len_sql = 'SELECT COUNT(*) FROM ({})'.format(self._keys_sql)
+        self._value_sql = 'SELECT {} FROM {} WHERE {}{}'.format(
+            values, table, where, order)
+        self._items_sql = ('SELECT {}, {} FROM {} WHERE {} '
+                           'ORDER BY {}{}'.format(
+                               keys, values, table, not_null, keys,
+                               ', ' + order_by if order_by else ''))
+        self._len = None
+
+    def _key(self, row):
+        key = row[0] if self._n_keys == 1 else tuple(row)
+        if self._key_decoder is not None:
+            key = self._key_decoder(key)
+        return key
+
+    def _params(self, key):
+        if self._key_encoder is not None:
+            key = self._key_encoder(key)
+        return (key,) if self._n_keys == 1 else tuple(key)
+
+    def _value(self, rows):
+        decoder = self._value_decoder
+        if decoder is None:
+            elements = [row[0] if len(row) == 1 else tuple(row)
+                        for row in rows if row[0] is not None]
+        else:
+            elements = [decoder(*row) for row in rows if row[0] is not None]
+
+        if self._collect is None:
+            return elements[0]
+        return self._collect(elements)
+
+    def __getitem__(self, key):
+        try:
+            params = self._params(key)
+        except (TypeError, AttributeError):
+            raise KeyError(key)
+        rows = self._connection.execute(self._value_sql, params).fetchall()
+        if not rows:
+            raise KeyError(key)
+        return self._value(rows)
+
+    def __iter__(self):
+        for row in self._connection.execute(self._keys_sql):
+            yield self._key(row)
+
+    def __len__(self):
+        if self._len is None:
+            self._len = self._connection.execute(self._len_sql).fetchone()[0]
+        return self._len
+
+    def items(self):
+        return _ItemsView(self)
+
+    def values(self):
+        return _ValuesView(self)
+
+    def iter_items(self):
+        """
+        Yield the (key, value) pairs in one scan of the table.
+        """
+        rows = self._connection.execute(self._items_sql)
+        n = self._n_keys
+        for key, group in groupby(rows, key=lambda row: row[:n]):
+            yield self._key(key), self._value([row[n:] for row in group])
+
+
+class WordlistView(Sequence):
+    """
+    A read-only list of the words in a database in descending order of
+    count, fetched by rank when they are looked up.
+
+    :param connection: a connection from ``connect()``
+    """
+
+    def __init__(self, connection):
+        self._connection = connection
+        self._len = None
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            return [word for word, in self._connection.execute(
+                'SELECT word FROM words WHERE rank >= ? AND rank < ? '
+                'ORDER BY rank', (start, stop))]
+
+        if index < 0:
+            index += len(self)
+        row = self._connection.execute('SELECT word FROM words WHERE rank = ?',
+                                       (index,)).fetchone()
+        if row is None:
+            raise IndexError('wordlist index out of range')
+        return row[0]
+
+    def __iter__(self):
+        for word, in self._connection.execute(
+                'SELECT word FROM words ORDER BY rank'):
+            yield word
+
+    def __len__(self):
+        if self._len is None:
+            self._len = self._connection.execute(
+                'SELECT COUNT(*) FROM words').fetchone()[0]
+        return self._len
+
+
+def read_results(connection):
+    """
+    Return views of the results in a database, by the names of the
+    corresponding ``Lexicon`` methods. The n-gram and neighbor views are
+    None if the database has none.
+
+    :param connection: a connection from ``connect()``
+    :rtype: dict(str: ResultView or WordlistView)
+    """
+    def view(*args, **kwargs):
+        return ResultView(connection, *args, **kwargs)
+
+    def has_rows(table):
+        return connection.execute(
+            'SELECT 1 FROM {} LIMIT 1'.format(table)).fetchone() is not None
+
+    results = {
+        'wordlist': WordlistView(connection),
+        'word_unigram_counter': view('words', ['word'], ['count']),
+        'stems_to_words': view('stem_words', ['stem'], ['word'], set),
+        'signatures_to_stems': view('signature_stems', ['signature'], ['stem'],
+                                    set, key_decoder=_signature,
+                                    key_encoder=_signature_text),
+        'stems_to_signatures': view('signature_stems', ['stem'], ['signature'],
+                                    set, value_decoder=_signature),
+        'words_to_signatures': view('word_signatures', ['word'], ['signature'],
+                                    set, value_decoder=_signature),
+        'signatures_to_words': view('word_signatures', ['signature'], ['word'],
+                                    set, key_decoder=_signature,
+                                    key_encoder=_signature_text),
+        'words_to_sigtransforms': view('sigtransforms', ['word'],
+                                       ['signature', 'affix'], set,
+                                       value_decoder=lambda sig, affix:
+                                       (_signature(sig), affix)),
+        'affixes_to_signatures': view('signature_affixes', ['affix'],
+                                      ['signature'], set,
+                                      value_decoder=_signature),
+        'successors': view('successors', ['string'], ['successor'], set),
+        'predecessors': view('predecessors', ['string'], ['predecessor'], set),
+        'word_bigram_counter': None,
+        'word_trigram_counter': None,
+        'words_to_neighbors': None,
+    }
+
+    if has_rows('word_bigrams'):
+        results['word_bigram_counter'] = view(
+            'word_bigrams', ['word1', 'word2'], ['count'])
+    if has_rows('word_trigrams'):
+        results['word_trigram_counter'] = view(
+            'word_trigrams', ['word1', 'word2', 'word3'], ['count'])
+    if has_rows('neighbors'):
+        results['words_to_neighbors'] = view(
+            'neighbors', ['word'], ['neighbor'], list, order_by='rank')
+
+    return results
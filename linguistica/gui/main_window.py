@@ -10,6 +10,7 @@ from PyQt5.QtCore import (Qt, QUrl)
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QAction, QVBoxLayout,
                              QTreeWidget, QFileDialog, QLabel, QTreeWidgetItem,
                              QTableWidget, QTableWidgetItem, QSplitter,
+                             QTableView, QHeaderView,
                              QProgressDialog, QMessageBox, QDialog, QGridLayout,
                              QSpinBox, QSizePolicy, QHBoxLayout, QPushButton,
                              QShortcut)
@@ -20,9 +21,10 @@ from linguistica import (read_corpus, read_wordlist)
 
 from linguistica.util import (SEP_SIG, SEP_NGRAM,
                               PARAMETERS_RANGES, PARAMETERS_HINTS,
-                              double_sorted)
+                              ranked)
 
 from linguistica.gui.worker import LinguisticaWorker
+from linguistica.gui.table_model import ResultTableModel
 
 from linguistica.gui.util import (MAIN_WINDOW_WIDTH, MAIN_WINDOW_HEIGHT,
                                   TREEWIDGET_WIDTH_MIN, TREEWIDGET_WIDTH_MAX,
@@ -279,6 +281,8 @@ class MainWindow(QMainWindow):
         Update the progress dialog. This function is triggered by the
         "progress_signal" emitted from the linguistica component worker thread.
         """
+        if self.progressDialog.wasCanceled():
+            return
         self.progressDialog.setLabelText(progress_text)
         self.progressDialog.setValue(target_percentage)
         process_all_gui_events()
@@ -310,6 +314,7 @@ class MainWindow(QMainWindow):
 
         self.lxa_worker = LinguisticaWorker(self.lexicon)
         self.lxa_worker.progress_signal.connect(self.update_progress)
+        self.lxa_worker.finished.connect(self.run_file_finished)
 
         # set up progress dialog
 
@@ -320,26 +325,36 @@ class MainWindow(QMainWindow):
         self.progressDialog.setValue(0)  # initialize as 0 (= 0%)
         self.progressDialog.setWindowTitle(
             'Processing {}'.format(self.corpus_name))
-        self.progressDialog.setCancelButton(None)
         self.progressDialog.resize(400, 100)
         process_all_gui_events()
 
         self.progressDialog.show()
 
-        # We disable the "cancel" button
-        # Setting up a "cancel" mechanism may not be a good idea,
-        # since it would probably involve killing the linguistica component
-        # worker at *any* point of its processing.
-        # This may have undesirable effects (e.g., freezing the GUI) -- BAD!
+        # The "cancel" button does not kill the worker at some arbitrary point
+        # of its processing; the linguistica components check for
+        # cancellation at their checkpoints and stop there by themselves.
+        self.progressDialog.canceled.connect(self.lxa_worker.cancel)
 
         # make sure all GUI stuff up to this point has been processed before
         # doing the real work of running the Lxa components
         process_all_gui_events()
 
         # Now the real work begins here!
+        # The results are shown by run_file_finished() when the worker is done.
         self.lxa_worker.start()
 
-        process_all_gui_events()
+    def run_file_finished(self):
+        """
+        Show the results of the worker started by ``run_file()``. This function
+        is triggered by the "finished" signal of the worker thread.
+        """
+        self.progressDialog.reset()
+        if self.lxa_worker.cancelled:
+            print('\nCancelled', flush=True)
+            self.status.clearMessage()
+            self.status.showMessage('Processing {} cancelled'
+                                    .format(self.corpus_name))
+            return
 
         self.lexicon = self.lxa_worker.get_lexicon()
 
@@ -479,8 +494,8 @@ class MainWindow(QMainWindow):
 
         self.setCentralWidget(self.mainSplitter)
 
-    def sig_to_stems_clicked(self, row):
-        signature = self.sig_to_stems_major_table.item(row, 0).text()
+    def sig_to_stems_clicked(self, index):
+        signature = index.sibling(index.row(), 0).data()
         print(signature)
         signature = tuple(signature.split(SEP_SIG))
 
@@ -574,7 +589,8 @@ class MainWindow(QMainWindow):
                 key=lambda x: x[1].count, reverse=True,
                 headers=['Word', 'Count', 'Frequency', 'Phones',
                          'Unigram plog', 'Avg unigram plog',
-                         'Bigram plog', 'Avg bigram plog'],
+                         'Bigram plog', 'Avg bigram plog',
+                         'Trigram plog', 'Avg trigram plog'],
                 row_cell_functions=[
                     lambda x: x[0], lambda x: x[1].count,
                     lambda x: x[1].frequency,
@@ -582,8 +598,9 @@ class MainWindow(QMainWindow):
                     lambda x: x[1].unigram_plog,
                     lambda x: x[1].avg_unigram_plog,
                     lambda x: x[1].bigram_plog,
-                    lambda x: x[1].avg_bigram_plog],
-                cutoff=0)
+                    lambda x: x[1].avg_bigram_plog,
+                    lambda x: x[1].trigram_plog,
+                    lambda x: x[1].avg_trigram_plog])
 
         elif item_str == BIGRAMS:
             if self.lexicon.file_is_wordlist:
@@ -594,8 +611,7 @@ class MainWindow(QMainWindow):
                 key=lambda x: x[1], reverse=True,
                 headers=['Bigram', 'Count'],
                 row_cell_functions=[lambda x: SEP_NGRAM.join(x[0]),
-                                    lambda x: x[1]],
-                cutoff=2000)
+                                    lambda x: x[1]])
 
         elif item_str == TRIGRAMS:
             if self.lexicon.file_is_wordlist:
@@ -606,8 +622,7 @@ class MainWindow(QMainWindow):
                 key=lambda x: x[1], reverse=True,
                 headers=['Trigram', 'Count'],
                 row_cell_functions=[lambda x: SEP_NGRAM.join(x[0]),
-                                    lambda x: x[1]],
-                cutoff=2000)
+                                    lambda x: x[1]])
 
         elif item_str == SIGS_TO_STEMS:
             self.sig_to_stems_major_table = self.create_major_display_table(
@@ -616,11 +631,10 @@ class MainWindow(QMainWindow):
                 headers=['Signature', 'Stem count', 'A few stems'],
                 row_cell_functions=[lambda x: SEP_SIG.join(x[0]),
                                     lambda x: len(x[1]),
-                                    lambda x: ', '.join(sorted(x[1])[:2]) +
-                                              ', ...'],
-                cutoff=0)
+                                    lambda x: ', '.join(ranked(x[1], k=2)) +
+                                              ', ...'])
             # noinspection PyUnresolvedReferences
-            self.sig_to_stems_major_table.cellClicked.connect(
+            self.sig_to_stems_major_table.clicked.connect(
                 self.sig_to_stems_clicked)
             new_display = self.sig_to_stems_major_table
 
@@ -633,29 +647,22 @@ class MainWindow(QMainWindow):
                                     lambda x: len(x[1]),
                                     lambda x: ', '.join([SEP_SIG.join(sig)
                                                          for sig in
-                                                         sorted(x[1])])],
-                cutoff=2000)
+                                                         sorted(x[1])])])
 
         elif item_str == WORDS_AS_TRIES:
-            words = self.lexicon.broken_words_left_to_right().keys()
-            words_to_tries = dict()
-            # key: word (str)
-            # value: tuple of (str, str)
-            # for left-to-right and right-to-left tries
-
-            for word in words:
-                l_r = ' '.join(self.lexicon.broken_words_left_to_right()[word])
-                r_l = ' '.join(self.lexicon.broken_words_right_to_left()[word])
-                words_to_tries[word] = (l_r, r_l)  # left-right, right-left
+            # the tries are joined into strings only for the rows shown
+            l_r_tries = self.lexicon.broken_words_left_to_right()
+            r_l_tries = self.lexicon.broken_words_right_to_left()
 
             new_display = self.create_major_display_table(
-                words_to_tries.items(),
-                key=lambda x: x[0], reverse=False,
+                l_r_tries.keys(),
+                key=lambda x: x, reverse=False,
                 headers=['Word', 'Reversed word',
                          'Left-to-right trie', 'Right-to-left trie'],
-                row_cell_functions=[lambda x: x[0], lambda x: x[0][::-1],
-                                    lambda x: x[1][0], lambda x: x[1][1]],
-                cutoff=0, set_text_alignment=[(3, Qt.AlignRight)])
+                row_cell_functions=[lambda x: x, lambda x: x[::-1],
+                                    lambda x: ' '.join(l_r_tries[x]),
+                                    lambda x: ' '.join(r_l_tries[x])],
+                set_text_alignment=[(3, Qt.AlignRight)])
 
         elif item_str == SUCCESSORS:
             new_display = self.create_major_display_table(
@@ -664,8 +671,7 @@ class MainWindow(QMainWindow):
                 headers=['String', 'Successor count', 'Successors'],
                 row_cell_functions=[lambda x: x[0],
                                     lambda x: len(x[1]),
-                                    lambda x: ', '.join(sorted(x[1]))],
-                cutoff=0)
+                                    lambda x: ', '.join(sorted(x[1]))])
 
         elif item_str == PREDECESSORS:
             new_display = self.create_major_display_table(
@@ -674,8 +680,7 @@ class MainWindow(QMainWindow):
                 headers=['String', 'Predecessor count', 'Predecessors'],
                 row_cell_functions=[lambda x: x[0],
                                     lambda x: len(x[1]),
-                                    lambda x: ', '.join(sorted(x[1]))],
-                cutoff=0)
+                                    lambda x: ', '.join(sorted(x[1]))])
 
         elif item_str == PHONES:
             new_display = self.create_major_display_table(
@@ -685,8 +690,7 @@ class MainWindow(QMainWindow):
                 row_cell_functions=[lambda x: x[0],
                                     lambda x: x[1].count,
                                     lambda x: x[1].frequency,
-                                    lambda x: x[1].plog],
-                cutoff=0)
+                                    lambda x: x[1].plog])
 
         elif item_str == BIPHONES:
             new_display = self.create_major_display_table(
@@ -698,8 +702,7 @@ class MainWindow(QMainWindow):
                                     lambda x: x[1].count,
                                     lambda x: x[1].frequency,
                                     lambda x: x[1].MI,
-                                    lambda x: x[1].weighted_MI],
-                cutoff=0)
+                                    lambda x: x[1].weighted_MI])
 
         elif item_str == TRIPHONES:
             new_display = self.create_major_display_table(
@@ -707,8 +710,7 @@ class MainWindow(QMainWindow):
                 key=lambda x: x[1], reverse=True,
                 headers=['Triphone', 'Count'],
                 row_cell_functions=[lambda x: SEP_NGRAM.join(x[0]),
-                                    lambda x: x[1]],
-                cutoff=0)
+                                    lambda x: x[1]])
 
         elif item_str == WORD_NEIGHBORS:
             if self.lexicon.file_is_wordlist:
@@ -721,8 +723,7 @@ class MainWindow(QMainWindow):
                 headers=['Word', 'Word count', 'Neighbors'],
                 row_cell_functions=[lambda x: x[0],
                                     lambda x: word_to_freq[x[0]],
-                                    lambda x: ' '.join(x[1])],
-                cutoff=0)
+                                    lambda x: ' '.join(x[1])])
 
         elif item_str == VISUALIZED_GRAPH:
             if self.lexicon.file_is_wordlist:
@@ -766,11 +767,14 @@ class MainWindow(QMainWindow):
     def create_major_display_table(input_iterable,
                                    key=lambda x: x, reverse=False,
                                    headers=None, row_cell_functions=None,
-                                   cutoff=0,
                                    set_text_alignment=None):
         """
         This is a general function for creating a tabular display for the
         major display.
+
+        The display is a ``QTableView`` of a ``ResultTableModel``, so no
+        widget items are created per cell, and even tables with millions
+        of rows show up at once.
         """
 
         if not input_iterable:
@@ -788,49 +792,21 @@ class MainWindow(QMainWindow):
             print('headers and cell functions don\'t match', flush=True)
             return
 
-        len_input = len(input_iterable)
-
-        table_widget = QTableWidget()
-        table_widget.clear()
-        table_widget.setSortingEnabled(False)
-
-        # set up row count
-        if cutoff and cutoff < len_input:
-            actual_cutoff = cutoff
-        else:
-            actual_cutoff = len_input
-
-        table_widget.setRowCount(actual_cutoff)
-
-        # set up column count and table headers
-        table_widget.setColumnCount(number_of_headers)
-        table_widget.setHorizontalHeaderLabels(headers)
-
-        # fill in the table
-        for row, x in enumerate(double_sorted(input_iterable, key=key,
-                                              reverse=reverse)):
-            for col, fn in enumerate(row_cell_functions):
-                cell = fn(x)
-
-                if isinstance(cell, (int, float)):
-                    # cell is numeric
-                    item = QTableWidgetItem()
-                    item.setData(Qt.EditRole, cell)
-                else:
-                    # cell is not numeric
-                    item = QTableWidgetItem(cell)
-
-                if set_text_alignment:
-                    for align_col, alignment in set_text_alignment:
-                        if col == align_col:
-                            item.setTextAlignment(alignment)
-
-                table_widget.setItem(row, col, item)
+        table_view = QTableView()
 
-            if not row < actual_cutoff:
-                break
+        # the rows are only collected here; the model renders the cells
+        # shown and sorts by row indices
+        model = ResultTableModel(list(input_iterable), headers,
+                                 row_cell_functions,
+                                 key=key, reverse=reverse,
+                                 text_alignment=dict(set_text_alignment or ()),
+                                 parent=table_view)
+        table_view.setModel(model)
 
-        table_widget.setSortingEnabled(True)
-        table_widget.resizeColumnsToContents()
+        # no sort indicator, so that enabling sorting keeps the initial order
+        table_view.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        table_view.setSortingEnabled(True)
+        table_view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        table_view.resizeColumnsToContents()
 
-        return table_widget
+        return table_view
@@ -0,0 +1,157 @@
+# -*- encoding: utf8 -*-
+
+from itertools import groupby
+from numbers import Integral, Number, Real
+
+import numpy as np
+
+from PyQt5.QtCore import (Qt, QAbstractTableModel, QModelIndex)
+
+from linguistica.util import top_k_indices
+
+from linguistica.gui.util import TABLE_FETCH_SIZE
+
+
+def sort_indices(values, descending=False, tie_values=None):
+    """
+    Return the indices of *values* in sorted order, with ties in the order
+    of the indices. Numbers are sorted as a NumPy array.
+
+    :param values: a list of numbers or of other comparable objects
+    :param descending: whether the order is descending
+    :param tie_values: if given, a list by whose (ascending) order ties are
+        broken instead, as by the subkey of ``double_sorted()``
+    :rtype: numpy.ndarray
+    """
+    if all(isinstance(value, Number) for value in values):
+        order = top_k_indices(np.asarray(values, dtype=np.float64),
+                              reverse=descending)
+    else:
+        # sorted() is stable also when reversed
+        order = np.array(sorted(range(len(values)), key=values.__getitem__,
+                                reverse=descending), dtype=np.intp)
+    if tie_values is None:
+        return order
+
+    tied_order = list()
+    for _, group in groupby(order.tolist(), key=values.__getitem__):
+        group = list(group)
+        if len(group) > 1:
+            group.sort(key=tie_values.__getitem__)
+        tied_order.extend(group)
+    return np.array(tied_order, dtype=np.intp)
+
+
+class ResultTableModel(QAbstractTableModel):
+    """
+    A table model of result rows, such as the items of a Lexicon dict, for
+    a ``QTableView``.
+
+    Nothing is made per cell in advance: a cell is rendered by its
+    function in *row_cell_functions* only when the view shows it, and rows
+    are handed to the view in batches of ``TABLE_FETCH_SIZE`` as it
+    scrolls. The rows themselves never move; the displayed order is an
+    array of row indices, and sorting by a column replaces that array.
+
+    :param rows: a list of rows (each one passed to the cell functions)
+    :param headers: list of column headers
+    :param row_cell_functions: list of functions from a row to a cell
+    :param key: if given, the function of the initial sort key
+    :param reverse: whether the initial order is descending
+    :param text_alignment: dict of columns to Qt alignment flags
+    :param parent: the parent QObject, which keeps the model alive
+    """
+
+    def __init__(self, rows, headers, row_cell_functions, key=None,
+                 reverse=False, text_alignment=None, parent=None):
+        super(ResultTableModel, self).__init__(parent)
+        self.rows = rows
+        self.headers = headers
+        self.row_cell_functions = row_cell_functions
+        self.text_alignment = text_alignment or dict()
+
+        if key is None:
+            self.default_order = np.arange(len(rows))
+        else:
+            # ties by the rows themselves, as double_sorted() does
+            self.default_order = sort_indices([key(row) for row in rows],
+                                              descending=reverse,
+                                              tie_values=rows)
+        self.order = self.default_order
+
+        self._column_values = dict()  # column -> cells of all rows
+        self._n_fetched_rows = min(len(rows), TABLE_FETCH_SIZE)
+
+    def row(self, row):
+        """
+        Return the row object displayed at *row*.
+        """
+        return self.rows[self.order[row]]
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self._n_fetched_rows
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.headers)
+
+    def canFetchMore(self, parent):
+        if parent.isValid():
+            return False
+        return self._n_fetched_rows < len(self.rows)
+
+    def fetchMore(self, parent):
+        if parent.isValid():
+            return
+        n_rows = min(len(self.rows) - self._n_fetched_rows, TABLE_FETCH_SIZE)
+        if n_rows <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._n_fetched_rows,
+                             self._n_fetched_rows + n_rows - 1)
+        self._n_fetched_rows += n_rows
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        column = index.column()
+        if role == Qt.DisplayRole:
+            cell = self.row_cell_functions[column](self.row(index.row()))
+            # numbers stay numbers (e.g. for right alignment),
+            # as NumPy scalars are not accepted by Qt
+            if isinstance(cell, Integral):
+                return int(cell)
+            elif isinstance(cell, Real):
+                return float(cell)
+            return cell
+        elif role == Qt.TextAlignmentRole:
+            return self.text_alignment.get(column)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.headers[section]
+        return section + 1
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """
+        Sort the rows by *column*, or restore the initial order if *column*
+        is negative (as for no sort indicator).
+        """
+        self.beginResetModel()
+        if column < 0:
+            self.order = self.default_order
+        else:
+            if column not in self._column_values:
+                cell_function = self.row_cell_functions[column]
+                self._column_values[column] = [cell_function(row)
+                                               for row in self.rows]
+            self.order = sort_indices(self._column_values[column],
+                                      descending=order == Qt.DescendingOrder)
+        self.endResetModel()
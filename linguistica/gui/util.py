@@ -28,6 +28,9 @@ TREEWIDGET_HEIGHT_MIN = 600
 MAIN_WINDOW_WIDTH = 1024
 MAIN_WINDOW_HEIGHT = 768
 
+# number of rows a result table adds at a time as it is scrolled down
+TABLE_FETCH_SIZE = 1000
+
 # ------------------------------------------------------------------------------
 
 # string names of lexicon tree objects
@@ -1,6 +1,8 @@
 # -*- encoding: utf8 -*-
 
-from PyQt5.QtCore import (QThread, pyqtSignal)
+from PyQt5.QtCore import (QThread, pyqtSignal, pyqtSlot)
+
+from linguistica.util import (Cancelled, Progress)
 
 # We spawn another
 # thread to set up a "Linguistica component worker" using QThread.
@@ -8,6 +10,16 @@ from PyQt5.QtCore import (QThread, pyqtSignal)
 # separate thread that is not the main thread for the GUI, and therefore the GUI
 # stays responsive and (most probably) nothing freezes.
 
+# the stages of the worker: the progress label text, the Lexicon method,
+# and the progress percentage at the end of the stage
+WORKER_STAGES = [
+    ('Extracting word ngrams...', 'run_ngram_module', 20),
+    ('Computing morphological signatures...', 'run_signature_module', 40),
+    ('Computing tries...', 'run_trie_module', 55),
+    ('Computing phonology...', 'run_phon_module', 65),
+    ('Computing word neighbors...', 'run_manifold_module', 100),
+]
+
 
 class LinguisticaWorker(QThread):
 
@@ -16,14 +28,26 @@ class LinguisticaWorker(QThread):
 
     progress_signal = pyqtSignal(str, int)
     # str is for the progress label text
-    # int is the progress percentage target, for updating the progress bar
-    # bool (True or False) is whether the progress percentage increments
-    #   gradually or not
+    # int is the progress percentage, for updating the progress bar
 
     def __init__(self, lexicon, parent=None):
         QThread.__init__(self, parent)
 
         self.lexicon = lexicon
+        self.cancelled = False
+
+        # the library modules report their progress and check for
+        # cancellation at their checkpoints through this object
+        self.progress = Progress(self._emit_progress)
+
+    def _emit_progress(self, message, fraction):
+        self.progress_signal.emit(message, int(fraction * 100))
+
+    @pyqtSlot()
+    def cancel(self):
+        # (called from the GUI thread) the worker stops at the next
+        # checkpoint of the module it is running
+        self.progress.cancel()
 
     def run(self):
         # this "run" method is never explicitly called
@@ -31,25 +55,23 @@ class LinguisticaWorker(QThread):
 
         # What happens here:  Each of the Linguistica component
         # is run for the specified corpus file with the specified parameters.
-        # When a component is done, emit a signal with info to update the
-        # progress dialog label text and progress bar
-
-        self.progress_signal.emit("Extracting word ngrams...", 0)
-        self.lexicon.run_phon_module(verbose=True)
-
-        self.progress_signal.emit('Computing morphological signatures...', 20)
-        self.lexicon.run_signature_module(verbose=True)
-
-        self.progress_signal.emit('Computing tries...', 40)
-        self.lexicon.run_trie_module(verbose=True)
-
-        self.progress_signal.emit('Computing phonology...', 60)
-        self.lexicon.run_phon_module(verbose=True)
-
-        self.progress_signal.emit('Computing word neighbors...',  80)
-        self.lexicon.run_manifold_module(verbose=True)
-
-        self.progress_signal.emit('All done!',  100)
+        # Within each component, the progress is emitted as a signal to update
+        # the progress dialog label text and progress bar
+
+        start = 0
+        try:
+            for message, method_name, end in WORKER_STAGES:
+                progress = self.progress.stage(start / 100, end / 100, message)
+                getattr(self.lexicon, method_name)(verbose=True,
+                                                   progress=progress)
+                start = end
+        except Cancelled:
+            self.cancelled = True
+            # drop whatever has been computed so far
+            self.lexicon.reset()
+            return
+
+        self.progress_signal.emit('All done!', 100)
 
     def get_lexicon(self):
         return self.lexicon
@@ -60,7 +60,7 @@ Parameters: ``min_stem_length``, ``max_affix_length``, ``min_sig_count``, ``suff
 Word manifolds and syntactic word neighborhood
 ----------------------------------------------
 
-Parameters: ``max_word_types``, ``min_context_count``, ``n_neighbors``, ``n_eigenvectors``
+Parameters: ``max_word_types``, ``min_context_count``, ``n_neighbors``, ``n_eigenvectors``, ``embedding_method``, ``max_memory``, ``neighbor_method``
 
 .. currentmodule:: linguistica.lexicon.Lexicon
 
@@ -68,8 +68,14 @@ Parameters: ``max_word_types``, ``min_context_count``, ``n_neighbors``, ``n_eige
 
    words_to_neighbors
    neighbor_graph
+   sparse_neighbor_graph
    words_to_contexts
    contexts_to_words
+   eigenvalues
+   eigenvectors
+   nearest_words
+   nearest_words_batch
+   word_clusters
 
 Phonology
 ---------
@@ -81,6 +87,12 @@ Phonology
    phone_unigram_counter
    phone_bigram_counter
    phone_trigram_counter
+   phone_dict
+   biphone_dict
+   word_phonology_dict
+   phonology_tables
+   score_phonotactics
+   update_word_counts
 
 Tries
 -----
@@ -107,6 +119,9 @@ Other methods and attributes
    change_parameters
    use_default_parameters
    reset
+   export
+   to_sqlite
+   from_sqlite
 
 """
 
@@ -114,10 +129,13 @@ import sys
 import os
 from io import StringIO
 
-from linguistica import (ngram, signature, manifold, phon, trie)
-from linguistica.util import (ENCODING, PARAMETERS, SEP_SIG, SEP_SIGTRANSFORM,
-                              double_sorted, fix_punctuations,
-                              output_latex, vprint)
+from linguistica import (ngram, signature, manifold, phon, trie, database)
+from linguistica.util import (ENCODING, PARAMETERS, SEP_SIG,
+                              SEP_SIGTRANSFORM, EXPORT_FORMATS, double_sorted,
+                              ranked, ranked_items, fix_punctuations,
+                              output_header, output_latex, output_jsonl,
+                              output_npz, output_tsv, checkpoint, stage,
+                              vprint)
 
 
 class Lexicon:
@@ -128,7 +146,8 @@ class Lexicon:
     """
 
     def __init__(self, file_path=None, wordlist_file=False, corpus_object=None,
-                 wordlist_object=None, encoding=ENCODING, **kwargs):
+                 wordlist_object=None, encoding=ENCODING, cache_dir=None,
+                 **kwargs):
         self.file_abspath = self._check_file_path(file_path)
 
         if self.file_abspath is None:
@@ -138,9 +157,11 @@ class Lexicon:
 
         self.file_is_wordlist = wordlist_file
         self.encoding = encoding
+        self.cache_dir = cache_dir
         self.corpus_object = corpus_object
         self.wordlist_object = wordlist_object
         self.parameters_ = self._determine_parameters(**kwargs)
+        self._database = None  # see from_sqlite()
 
         self._initialize()
 
@@ -216,9 +237,11 @@ class Lexicon:
         self._word_unigram_counter = None
         self._word_bigram_counter = None
         self._word_trigram_counter = None
+        self._encoded_corpus = None  # see ngram.encode()
 
         # wordlist
         self._wordlist = None
+        self._wordlist_arrays = None  # see phon.load_wordlist
         if self.wordlist_object is not None:
             # self.wordlist_object is
             # either an iterable or a dict of word-count pairs
@@ -293,6 +316,13 @@ class Lexicon:
         self._words_to_contexts = None
         self._contexts_to_words = None
         self._neighbor_graph = None
+        self._sparse_neighbor_graph = None
+        self._eigenvalues = None
+        self._eigenvectors = None
+        self._word_index = None
+        self._word_clusters = dict()  # (n_clusters, method) -> clusters
+        self._manifold_cache = dict()  # intermediate results of manifold.run
+        self._counts_version = 0  # for the keys of self._manifold_cache
 
         # phon objects
         self._phone_unigram_counter = None
@@ -302,6 +332,8 @@ class Lexicon:
         self._phone_dict = None
         self._biphone_dict = None
         self._word_dict = None
+        self._phonology_tables = None
+        self._phonotactic_models = dict()  # (order, floor) -> model
         self._words_to_phones = None
 
         # trie objects
@@ -310,6 +342,18 @@ class Lexicon:
         self._successors = None
         self._predecessors = None
 
+        if self._database is not None:
+            self._read_database_results()
+
+    def _has_corpus_results(self):
+        """
+        Return whether there are word ngrams and neighbors, i.e., the input
+        is a corpus, or a database with the stored results of one.
+        """
+        if self._database is not None:
+            return self._corpus_results_stored
+        return bool(self.corpus_file_object)
+
     def reset(self):
         """
         Reset the Linguistica object. While the file path information is
@@ -318,22 +362,33 @@ class Lexicon:
         """
         self._initialize()
 
-    def run_all_modules(self, verbose=False):
+    def run_all_modules(self, verbose=False, progress=None):
         """
         Run all modules.
+
+        :param progress: a ``linguistica.util.Progress``, updated from within
+            the modules; once it is cancelled, ``linguistica.util.Cancelled``
+            is raised at the next checkpoint, and the objects of the module
+            being run are left as if they had not been computed
         """
-        self.run_ngram_module(verbose=verbose)
-        self.run_phon_module(verbose=verbose)
-        self.run_signature_module(verbose=verbose)
-        self.run_trie_module(verbose=verbose)
+        self.run_ngram_module(verbose, stage(progress, 0, 0.2, 'Ngrams'))
+        self.run_phon_module(verbose, stage(progress, 0.2, 0.3, 'Phonology'))
+        self.run_signature_module(verbose, stage(progress, 0.3, 0.5,
+                                                 'Morphological signatures'))
+        self.run_trie_module(verbose, stage(progress, 0.5, 0.65, 'Tries'))
 
         if self.corpus_file_object:
-            self.run_manifold_module(verbose=verbose)
+            self.run_manifold_module(verbose, stage(
+                progress, 0.65, 1, 'Syntactic word neighbors'))
 
     def output_all_results(self, directory=None, verbose=False, test=False):
         """
         Output all Linguistica results to *directory*.
 
+        The results are all computed first, and then the files are written
+        one after another, each streamed row by row with the same header
+        block.
+
         :param directory: output directory. If not specified, it defaults to
             the current directory given by ``os.getcwd()``.
         """
@@ -342,147 +397,105 @@ class Lexicon:
         else:
             output_dir = os.path.abspath(directory)
 
+        # output_latex() arguments by file path; a later file of the same path
+        # replaces an earlier one, as it would overwrite it
+        outputs = dict()
+
+        def defer_output(obj_, f_path_, **kwargs):
+            outputs[f_path_] = (section, fname, obj_, kwargs)
+
         # ----------------------------------------------------------------------
-        if self.corpus_file_object:
-            vprint('ngram objects', verbose=verbose)
+        if self._has_corpus_results():
+            section = 'ngram'
 
             fname = 'word_bigrams.txt'
-            obj = double_sorted(self.word_bigram_counter().items(),
-                                key=lambda x: x[1], reverse=True)
+            obj = ranked_items(self.word_bigram_counter(), reverse=True)
             f_path = os.path.join(output_dir, fname)
-            output_latex(obj, f_path,
+            defer_output(obj, f_path,
                          title='Word bigrams',
                          headers=['Word bigram', 'Count'],
                          row_functions=[lambda x: ' '.join(x[0]),
                                         lambda x: x[1]],
-                         column_widths=[50, 10],
-                         lxa_parameters=self.parameters(),
-                         test=test, encoding=self.encoding,
-                         number_of_word_types=self.number_of_word_types(),
-                         number_of_word_tokens=self.number_of_word_tokens(),
-                         input_file_path=self.file_abspath)
-            vprint('\t' + fname, verbose=verbose)
+                         column_widths=[50, 10])
 
             fname = 'word_trigrams.txt'
-            obj = double_sorted(self.word_trigram_counter().items(),
-                                key=lambda x: x[1], reverse=True)
+            obj = ranked_items(self.word_trigram_counter(), reverse=True)
             f_path = os.path.join(output_dir, fname)
-            output_latex(obj, f_path,
+            defer_output(obj, f_path,
                          title='Word trigrams',
                          headers=['Word trigram', 'Count'],
                          row_functions=[lambda x: ' '.join(x[0]),
                                         lambda x: x[1]],
-                         column_widths=[75, 10],
-                         lxa_parameters=self.parameters(),
-                         test=test, encoding=self.encoding,
-                         number_of_word_types=self.number_of_word_types(),
-                         number_of_word_tokens=self.number_of_word_tokens(),
-                         input_file_path=self.file_abspath)
-            vprint('\t' + fname, verbose=verbose)
+                         column_widths=[75, 10])
 
         # ----------------------------------------------------------------------
-        vprint('morphological signature objects', verbose=verbose)
+        section = 'morphological signature'
 
         fname = 'stems_to_words.txt'
-        obj = double_sorted(self.stems_to_words().items(),
-                            key=lambda x: len(x[1]), reverse=True)
+        obj = ranked_items(self.stems_to_words(), key=len, reverse=True)
         f_path = os.path.join(output_dir, fname)
-        output_latex(obj, f_path,
+        defer_output(obj, f_path,
                      title='Stems to words '
                            '(descending order of word count)',
                      headers=['Stem', 'Word count', 'Words'],
                      row_functions=[lambda x: x[0],
                                     lambda x: len(x[1]),
                                     lambda x: ', '.join(sorted(x[1]))],
-                     column_widths=[15, 15, 0],
-                     lxa_parameters=self.parameters(),
-                     test=test, encoding=self.encoding,
-                     number_of_word_types=self.number_of_word_types(),
-                     number_of_word_tokens=self.number_of_word_tokens(),
-                     input_file_path=self.file_abspath)
-        vprint('\t' + fname, verbose=verbose)
+                     column_widths=[15, 15, 0])
 
         fname = 'stems_to_words.txt'
-        obj = double_sorted(self.stems_to_words().items(),
-                            key=lambda x: x[0], reverse=False)
+        stems_to_words = self.stems_to_words()
+        obj = ((stem, stems_to_words[stem]) for stem in sorted(stems_to_words))
         f_path = os.path.join(output_dir, fname)
-        output_latex(obj, f_path,
+        defer_output(obj, f_path,
                      title='Stems to words '
                            '(alphabetical order of stems)',
                      headers=['Stem', 'Word count', '1st 10 words'],
                      row_functions=[lambda x: x[0],
                                     lambda x: len(x[1]),
                                     lambda x: ', '.join(sorted(x[1]))],
-                     column_widths=[15, 15, 0],
-                     lxa_parameters=self.parameters(),
-                     test=test, encoding=self.encoding,
-                     number_of_word_types=self.number_of_word_types(),
-                     number_of_word_tokens=self.number_of_word_tokens(),
-                     input_file_path=self.file_abspath)
-        vprint('\t' + fname, verbose=verbose)
+                     column_widths=[15, 15, 0])
 
         fname = 'signatures_to_stems.txt'
-        obj = double_sorted(self.signatures_to_stems().items(),
-                            key=lambda x: len(x[1]), reverse=True)
+        obj = ranked_items(self.signatures_to_stems(), key=len, reverse=True)
         f_path = os.path.join(output_dir, fname)
-        output_latex(obj, f_path,
+        defer_output(obj, f_path,
                      title='Signatures to stems',
                      headers=['Signature', 'Stem count', 'Stems'],
                      row_functions=[lambda x: SEP_SIG.join(x[0]),
                                     lambda x: len(x[1]),
                                     lambda x: ', '.join(sorted(x[1]))],
-                     column_widths=[30, 15, 0],
-                     lxa_parameters=self.parameters(),
-                     test=test, encoding=self.encoding,
-                     number_of_word_types=self.number_of_word_types(),
-                     number_of_word_tokens=self.number_of_word_tokens(),
-                     input_file_path=self.file_abspath)
-        vprint('\t' + fname, verbose=verbose)
+                     column_widths=[30, 15, 0])
 
         fname = 'signatures_to_stems_truncated.txt'
-        obj = double_sorted(self.signatures_to_stems().items(),
-                            key=lambda x: len(x[1]), reverse=True)
+        obj = ranked_items(self.signatures_to_stems(), key=len, reverse=True)
         f_path = os.path.join(output_dir, fname)
-        output_latex(obj, f_path,
+        defer_output(obj, f_path,
                      title='Signatures to stems '
                            '(first 10 stems for each sig)',
                      headers=['Signature', 'Stem count', '1st 10 stems'],
                      row_functions=[lambda x: SEP_SIG.join(x[0]),
                                     lambda x: len(x[1]),
                                     lambda x:
-                                    ' '.join(sorted(x[1])[:10])],
-                     column_widths=[30, 15, 0],
-                     lxa_parameters=self.parameters(),
-                     test=test, encoding=self.encoding,
-                     number_of_word_types=self.number_of_word_types(),
-                     number_of_word_tokens=self.number_of_word_tokens(),
-                     input_file_path=self.file_abspath)
-        vprint('\t' + fname, verbose=verbose)
+                                    ' '.join(ranked(x[1], k=10))],
+                     column_widths=[30, 15, 0])
 
         fname = 'stems_to_signatures.txt'
-        obj = double_sorted(self.stems_to_signatures().items(),
-                            key=lambda x: len(x[1]), reverse=True)
+        obj = ranked_items(self.stems_to_signatures(), key=len, reverse=True)
         f_path = os.path.join(output_dir, fname)
-        output_latex(obj, f_path,
+        defer_output(obj, f_path,
                      title='Stems to signatures',
                      headers=['Stems', 'Signatures'],
                      row_functions=[lambda x: x[0],
                                     lambda x:
                                     ', '.join(SEP_SIG.join(sig)
                                               for sig in sorted(x[1]))],
-                     column_widths=[15, 0],
-                     lxa_parameters=self.parameters(),
-                     test=test, encoding=self.encoding,
-                     number_of_word_types=self.number_of_word_types(),
-                     number_of_word_tokens=self.number_of_word_tokens(),
-                     input_file_path=self.file_abspath)
-        vprint('\t' + fname, verbose=verbose)
+                     column_widths=[15, 0])
 
         fname = 'words_to_signatures.txt'
-        obj = double_sorted(self.words_to_signatures().items(),
-                            key=lambda x: len(x[1]), reverse=True)
+        obj = ranked_items(self.words_to_signatures(), key=len, reverse=True)
         f_path = os.path.join(output_dir, fname)
-        output_latex(obj, f_path,
+        defer_output(obj, f_path,
                      title='Words to signatures',
                      headers=['Word', 'Sig count', 'Signatures'],
                      row_functions=[lambda x: x[0],
@@ -490,57 +503,37 @@ class Lexicon:
                                     lambda x:
                                     ', '.join(SEP_SIG.join(sig)
                                               for sig in sorted(x[1]))],
-                     column_widths=[25, 15, 0],
-                     lxa_parameters=self.parameters(),
-                     test=test, encoding=self.encoding,
-                     number_of_word_types=self.number_of_word_types(),
-                     number_of_word_tokens=self.number_of_word_tokens(),
-                     input_file_path=self.file_abspath)
-        vprint('\t' + fname, verbose=verbose)
+                     column_widths=[25, 15, 0])
 
         fname = 'signatures_to_words.txt'
-        obj = double_sorted(self.signatures_to_words().items(),
-                            key=lambda x: len(x[1]), reverse=True)
+        obj = ranked_items(self.signatures_to_words(), key=len, reverse=True)
         f_path = os.path.join(output_dir, fname)
-        output_latex(obj, f_path,
+        defer_output(obj, f_path,
                      title='Signatures to words',
                      headers=['Signature', 'Word count', 'Words'],
                      row_functions=[lambda x: SEP_SIG.join(x[0]),
                                     lambda x: len(x[1]),
                                     lambda x: ', '.join(sorted(x[1]))],
-                     column_widths=[20, 15, 0],
-                     lxa_parameters=self.parameters(),
-                     test=test, encoding=self.encoding,
-                     number_of_word_types=self.number_of_word_types(),
-                     number_of_word_tokens=self.number_of_word_tokens(),
-                     input_file_path=self.file_abspath)
-        vprint('\t' + fname, verbose=verbose)
+                     column_widths=[20, 15, 0])
 
         fname = 'signatures_to_words_truncated.txt'
-        obj = double_sorted(self.signatures_to_words().items(),
-                            key=lambda x: len(x[1]), reverse=True)
+        obj = ranked_items(self.signatures_to_words(), key=len, reverse=True)
         f_path = os.path.join(output_dir, fname)
-        output_latex(obj, f_path,
+        defer_output(obj, f_path,
                      title='Signatures to words '
                            '(first 10 words for each sig)',
                      headers=['Signature', 'Word count', '1st 10 words'],
                      row_functions=[lambda x: SEP_SIG.join(x[0]),
                                     lambda x: len(x[1]),
                                     lambda x:
-                                    ', '.join(sorted(x[1])[:10])],
-                     column_widths=[20, 15, 0],
-                     lxa_parameters=self.parameters(),
-                     test=test, encoding=self.encoding,
-                     number_of_word_types=self.number_of_word_types(),
-                     number_of_word_tokens=self.number_of_word_tokens(),
-                     input_file_path=self.file_abspath)
-        vprint('\t' + fname, verbose=verbose)
+                                    ', '.join(ranked(x[1], k=10))],
+                     column_widths=[20, 15, 0])
 
         fname = 'words_to_sigtransforms.txt'
-        obj = double_sorted(self.words_to_sigtransforms().items(),
-                            key=lambda x: len(x[1]), reverse=True)
+        obj = ranked_items(self.words_to_sigtransforms(), key=len,
+                           reverse=True)
         f_path = os.path.join(output_dir, fname)
-        output_latex(obj, f_path,
+        defer_output(obj, f_path,
                      title='Words to sigtransforms',
                      headers=['Word', 'Signature transforms'],
                      row_functions=[lambda x: x[0],
@@ -548,19 +541,12 @@ class Lexicon:
                                     ', '.join(SEP_SIG.join(sig) +
                                               SEP_SIGTRANSFORM + affix
                                               for sig, affix in sorted(x[1]))],
-                     column_widths=[20, 0],
-                     lxa_parameters=self.parameters(),
-                     test=test, encoding=self.encoding,
-                     number_of_word_types=self.number_of_word_types(),
-                     number_of_word_tokens=self.number_of_word_tokens(),
-                     input_file_path=self.file_abspath)
-        vprint('\t' + fname, verbose=verbose)
+                     column_widths=[20, 0])
 
         fname = 'affixes_to_signatures.txt'
-        obj = double_sorted(self.affixes_to_signatures().items(),
-                            key=lambda x: len(x[1]), reverse=True)
+        obj = ranked_items(self.affixes_to_signatures(), key=len, reverse=True)
         f_path = os.path.join(output_dir, fname)
-        output_latex(obj, f_path,
+        defer_output(obj, f_path,
                      title='Affixes to signatures',
                      headers=['Affix', 'Sig count', 'Signatures'],
                      row_functions=[lambda x: x[0],
@@ -568,114 +554,83 @@ class Lexicon:
                                     lambda x:
                                     ', '.join(SEP_SIG.join(sig)
                                               for sig in sorted(x[1]))],
-                     column_widths=[15, 15, 0],
-                     lxa_parameters=self.parameters(),
-                     test=test, encoding=self.encoding,
-                     number_of_word_types=self.number_of_word_types(),
-                     number_of_word_tokens=self.number_of_word_tokens(),
-                     input_file_path=self.file_abspath)
-        vprint('\t' + fname, verbose=verbose)
+                     column_widths=[15, 15, 0])
 
         # ----------------------------------------------------------------------
-        if self.corpus_file_object:
-            vprint('manifold objects', verbose=verbose)
+        if self._has_corpus_results():
+            section = 'manifold'
 
             fname = 'words_to_neighbors.txt'
-            obj = list()  # list of tuple(word, list of neighbor words)
-            for word in self.wordlist()[: self.parameters()['max_word_types']]:
-                obj.append((word, self.words_to_neighbors()[word]))
+            words_to_neighbors = self.words_to_neighbors()
+            obj = ((word, words_to_neighbors[word])
+                   for word in
+                   self.wordlist()[: self.parameters()['max_word_types']])
             f_path = os.path.join(output_dir, fname)
-            output_latex(obj, f_path,
+            defer_output(obj, f_path,
                          title='Words to neighbors',
                          headers=['Word', 'Neighbors'],
                          row_functions=[lambda x: x[0],
                                         lambda x: ' '.join(x[1])],
-                         column_widths=[25, 0],
-                         lxa_parameters=self.parameters(),
-                         test=test, encoding=self.encoding,
-                         number_of_word_types=self.number_of_word_types(),
-                         number_of_word_tokens=self.number_of_word_tokens(),
-                         input_file_path=self.file_abspath)
-            vprint('\t' + fname, verbose=verbose)
+                         column_widths=[25, 0])
 
         # ----------------------------------------------------------------------
-        vprint('phon objects', verbose=verbose)
-
-        def output_latex_for_phon_words(obj_, f_path_, title_, lxa_parameters_,
-                                        test_, encoding_, number_of_word_types_,
-                                        number_of_word_tokens_,
-                                        input_file_path_):
-            output_latex(obj_, f_path_,
-                         title=title_,
-                         headers=['Word', 'Count', 'Frequency', 'Phones',
-                                  'Unigram plog', 'Avg unigram plog',
-                                  'Bigram plog', 'Avg bigram plog'],
-                         row_functions=[lambda x: x[0],
-                                        lambda x: x[1].count,
-                                        lambda x:
-                                        '%.6f' % x[1].frequency,
-                                        lambda x:
-                                        ' '.join(x[1].phones),
-                                        lambda x:
-                                        '%8.3f' % x[1].unigram_plog,
-                                        lambda x:
-                                        '%8.3f' % x[1].avg_unigram_plog,
-                                        lambda x:
-                                        '%8.3f' % x[1].bigram_plog,
-                                        lambda x:
-                                        '%8.3f' % x[1].avg_bigram_plog,
-                                        ],
-                         column_widths=[35, 10, 15, 60, 15, 15, 15, 15],
-                         lxa_parameters=lxa_parameters_,
-                         test=test_, encoding=encoding_,
-                         number_of_word_types=number_of_word_types_,
-                         number_of_word_tokens=number_of_word_tokens_,
-                         input_file_path=input_file_path_)
+        section = 'phon'
+
+        phon_words_kwargs = dict(
+            headers=['Word', 'Count', 'Frequency', 'Phones',
+                     'Unigram plog', 'Avg unigram plog',
+                     'Bigram plog', 'Avg bigram plog',
+                     'Trigram plog', 'Avg trigram plog'],
+            row_functions=[lambda x: x[0],
+                           lambda x: x[1].count,
+                           lambda x: '%.6f' % x[1].frequency,
+                           lambda x: ' '.join(x[1].phones),
+                           lambda x: '%8.3f' % x[1].unigram_plog,
+                           lambda x: '%8.3f' % x[1].avg_unigram_plog,
+                           lambda x: '%8.3f' % x[1].bigram_plog,
+                           lambda x: '%8.3f' % x[1].avg_bigram_plog,
+                           lambda x: '%8.3f' % x[1].trigram_plog,
+                           lambda x: '%8.3f' % x[1].avg_trigram_plog,
+                           ],
+            column_widths=[35, 10, 15, 60, 15, 15, 15, 15, 15, 15])
 
         fname = 'wordlist.txt'
-        obj_word_phon = list()  # list of tuple(word, list of neighbor words)
-        for word in self.wordlist():
-            obj_word_phon.append((word, self.word_phonology_dict()[word]))
-        f_path = os.path.join(output_dir, 'wordlist.txt')
-        output_latex_for_phon_words(obj_word_phon, f_path,
-                                    'Wordlist sorted by word count',
-                                    self.parameters(), test, self.encoding,
-                                    self.number_of_word_types(),
-                                    self.number_of_word_tokens(),
-                                    self.file_abspath)
-        vprint('\t' + fname, verbose=verbose)
+        word_phonology_dict = self.word_phonology_dict()
+        obj = ((word, word_phonology_dict[word]) for word in self.wordlist())
+        f_path = os.path.join(output_dir, fname)
+        defer_output(obj, f_path,
+                     title='Wordlist sorted by word count',
+                     **phon_words_kwargs)
 
         fname = 'wordlist_by_avg_unigram_plog.txt'
-        obj_unigram_plog = double_sorted(obj_word_phon,
-                                         key=lambda x: x[1].avg_unigram_plog,
-                                         reverse=False)
+        obj = ranked_items(word_phonology_dict,
+                           key=lambda x: x.avg_unigram_plog)
         f_path = os.path.join(output_dir, fname)
-        output_latex_for_phon_words(obj_unigram_plog, f_path,
-                                    'Wordlist sorted by avg unigram plog',
-                                    self.parameters(), test, self.encoding,
-                                    self.number_of_word_types(),
-                                    self.number_of_word_tokens(),
-                                    self.file_abspath)
-        vprint('\t' + fname, verbose=verbose)
+        defer_output(obj, f_path,
+                     title='Wordlist sorted by avg unigram plog',
+                     **phon_words_kwargs)
 
         fname = 'wordlist_by_avg_bigram_plog.txt'
-        obj_bigram_plog = double_sorted(obj_word_phon,
-                                        key=lambda x: x[1].avg_bigram_plog,
-                                        reverse=False)
+        obj = ranked_items(word_phonology_dict,
+                           key=lambda x: x.avg_bigram_plog)
+        f_path = os.path.join(output_dir, fname)
+        defer_output(obj, f_path,
+                     title='Wordlist sorted by avg bigram plog',
+                     **phon_words_kwargs)
+
+        fname = 'wordlist_by_avg_trigram_plog.txt'
+        obj = ranked_items(word_phonology_dict,
+                           key=lambda x: x.avg_trigram_plog)
         f_path = os.path.join(output_dir, fname)
-        output_latex_for_phon_words(obj_bigram_plog, f_path,
-                                    'Wordlist sorted by avg bigram plog',
-                                    self.parameters(), test, self.encoding,
-                                    self.number_of_word_types(),
-                                    self.number_of_word_tokens(),
-                                    self.file_abspath)
-        vprint('\t' + fname, verbose=verbose)
+        defer_output(obj, f_path,
+                     title='Wordlist sorted by avg trigram plog',
+                     **phon_words_kwargs)
 
         fname = 'phones.txt'
-        obj = double_sorted(self.phone_dict().items(),
-                            key=lambda x: x[1].count, reverse=True)
+        obj = ranked_items(self.phone_dict(), key=lambda x: x.count,
+                           reverse=True)
         f_path = os.path.join(output_dir, fname)
-        output_latex(obj, f_path,
+        defer_output(obj, f_path,
                      title='Phones',
                      headers=['Phone', 'Count', 'Frequency', 'Plog'],
                      row_functions=[lambda x: x[0],
@@ -683,19 +638,13 @@ class Lexicon:
                                     lambda x: '%.6f' % x[1].frequency,
                                     lambda x: '%8.3f' % x[1].plog,
                                     ],
-                     column_widths=[10, 10, 15, 15],
-                     lxa_parameters=self.parameters(),
-                     test=test, encoding=self.encoding,
-                     number_of_word_types=self.number_of_word_types(),
-                     number_of_word_tokens=self.number_of_word_tokens(),
-                     input_file_path=self.file_abspath)
-        vprint('\t' + fname, verbose=verbose)
+                     column_widths=[10, 10, 15, 15])
 
         fname = 'biphones.txt'
-        obj = double_sorted(self.biphone_dict().items(),
-                            key=lambda x: x[1].count, reverse=True)
+        obj = ranked_items(self.biphone_dict(), key=lambda x: x.count,
+                           reverse=True)
         f_path = os.path.join(output_dir, fname)
-        output_latex(obj, f_path,
+        defer_output(obj, f_path,
                      title='Biphones',
                      headers=['Biphone', 'Count', 'Frequency',
                               'MI', 'Weighted MI'],
@@ -708,43 +657,31 @@ class Lexicon:
                                     lambda x:
                                     '%8.3f' % x[1].weighted_MI,
                                     ],
-                     column_widths=[10, 10, 15, 15, 15],
-                     lxa_parameters=self.parameters(),
-                     test=test, encoding=self.encoding,
-                     number_of_word_types=self.number_of_word_types(),
-                     number_of_word_tokens=self.number_of_word_tokens(),
-                     input_file_path=self.file_abspath)
-        vprint('\t' + fname, verbose=verbose)
+                     column_widths=[10, 10, 15, 15, 15])
 
         fname = 'triphones.txt'
-        obj = double_sorted(self.phone_trigram_counter().items(),
-                            key=lambda x: x[1], reverse=True)
+        obj = ranked_items(self.phone_trigram_counter(), reverse=True)
         f_path = os.path.join(output_dir, fname)
-        output_latex(obj, f_path,
+        defer_output(obj, f_path,
                      title='Triphones',
                      headers=['Triphone', 'Count'],
                      row_functions=[lambda x: ' '.join(x[0]),
                                     lambda x: x[1],
                                     ],
-                     column_widths=[15, 10],
-                     lxa_parameters=self.parameters(),
-                     test=test, encoding=self.encoding,
-                     number_of_word_types=self.number_of_word_types(),
-                     number_of_word_tokens=self.number_of_word_tokens(),
-                     input_file_path=self.file_abspath)
-        vprint('\t' + fname, verbose=verbose)
+                     column_widths=[15, 10])
 
         # ----------------------------------------------------------------------
-        vprint('trie objects', verbose=verbose)
+        section = 'trie'
 
         fname = 'words_as_tries.txt'
-        obj = list()
-        for word in self.wordlist():
-            obj.append((word,
-                        self.broken_words_left_to_right()[word],
-                        self.broken_words_right_to_left()[word]))
+        broken_words_left_to_right = self.broken_words_left_to_right()
+        broken_words_right_to_left = self.broken_words_right_to_left()
+        obj = ((word,
+                broken_words_left_to_right[word],
+                broken_words_right_to_left[word])
+               for word in self.wordlist())
         f_path = os.path.join(output_dir, fname)
-        output_latex(obj, f_path,
+        defer_output(obj, f_path,
                      title='Words as tries',
                      headers=['Word', 'Left-to-right trie',
                               'Right-to-left trie'],
@@ -752,49 +689,248 @@ class Lexicon:
                                     lambda x: ' '.join(x[1]),
                                     lambda x: ' '.join(x[2]),
                                     ],
-                     column_widths=[35, 50, 50],
-                     lxa_parameters=self.parameters(),
-                     test=test, encoding=self.encoding,
-                     number_of_word_types=self.number_of_word_types(),
-                     number_of_word_tokens=self.number_of_word_tokens(),
-                     input_file_path=self.file_abspath)
-        vprint('\t' + fname, verbose=verbose)
+                     column_widths=[35, 50, 50])
 
         fname = 'successors.txt'
-        obj = double_sorted(self.successors().items(),
-                            key=lambda x: len(x[1]), reverse=False)
+        obj = ranked_items(self.successors(), key=len)
         f_path = os.path.join(output_dir, fname)
-        output_latex(obj, f_path,
+        defer_output(obj, f_path,
                      title='Successors',
                      headers=['String', 'Successors'],
                      row_functions=[lambda x: x[0],
                                     lambda x: ' '.join(sorted(x[1])),
                                     ],
-                     column_widths=[35, 0],
-                     lxa_parameters=self.parameters(),
-                     test=test, encoding=self.encoding,
-                     number_of_word_types=self.number_of_word_types(),
-                     number_of_word_tokens=self.number_of_word_tokens(),
-                     input_file_path=self.file_abspath)
-        vprint('\t' + fname, verbose=verbose)
+                     column_widths=[35, 0])
 
         fname = 'predecessors.txt'
-        obj = double_sorted(self.predecessors().items(),
-                            key=lambda x: len(x[1]), reverse=False)
+        obj = ranked_items(self.predecessors(), key=len)
         f_path = os.path.join(output_dir, fname)
-        output_latex(obj, f_path,
+        defer_output(obj, f_path,
                      title='Predecessors',
                      headers=['String', 'Predecessors'],
                      row_functions=[lambda x: x[0],
                                     lambda x: ' '.join(sorted(x[1])),
                                     ],
-                     column_widths=[35, 0],
-                     lxa_parameters=self.parameters(),
-                     test=test, encoding=self.encoding,
-                     number_of_word_types=self.number_of_word_types(),
-                     number_of_word_tokens=self.number_of_word_tokens(),
-                     input_file_path=self.file_abspath)
-        vprint('\t' + fname, verbose=verbose)
+                     column_widths=[35, 0])
+
+        # ----------------------------------------------------------------------
+        # The rows are rendered as each file is written, so the generators
+        # above only read results that have been computed.
+        header = output_header(self.parameters(),
+                               self.number_of_word_types(),
+                               self.number_of_word_tokens(),
+                               self.file_abspath)
+        last_section = None
+        for f_path, (section, fname, obj, kwargs) in outputs.items():
+            output_latex(obj, f_path, header=header, test=test,
+                         encoding=self.encoding, **kwargs)
+            if section != last_section:
+                vprint(section + ' objects', verbose=verbose)
+                last_section = section
+            vprint('\t' + fname, verbose=verbose)
+
+    def export(self, directory=None, format='tsv', verbose=False):
+        """
+        Export all Linguistica results to *directory* in a machine-readable
+        format, one file per table (e.g., "word_bigrams.tsv").
+
+        The formats are "tsv" (tab-separated values with a header line,
+        list cells joined by spaces), "jsonl" (JSON Lines, one object per
+        row), and "npz" (NumPy arrays by column; see ``util.read_npz()``).
+        Rows are streamed to the files without being collected first.
+
+        :param directory: output directory. If not specified, it defaults to
+            the current directory given by ``os.getcwd()``.
+        :param format: one of "tsv", "jsonl", and "npz"
+        :return: paths of the files written
+        :rtype: list(str)
+        """
+        if format not in EXPORT_FORMATS:
+            raise ValueError('unknown export format -- ' + str(format))
+
+        if not directory:
+            output_dir = os.getcwd()
+        else:
+            output_dir = os.path.abspath(directory)
+
+        file_paths = list()
+        for name, columns, rows in self._export_tables():
+            f_path = os.path.join(output_dir, name + '.' + format)
+            if format == 'tsv':
+                output_tsv(rows, f_path, columns, encoding=self.encoding)
+            elif format == 'jsonl':
+                output_jsonl(rows, f_path, columns, encoding=self.encoding)
+            else:
+                output_npz(rows, f_path, columns)
+            file_paths.append(f_path)
+            vprint('\t' + os.path.basename(f_path), verbose=verbose)
+
+        return file_paths
+
+    def _export_tables(self):
+        """
+        Yield the (name, columns, rows) of each table for ``export()``,
+        with the rows as a generator over the results.
+        """
+        yield ('word_unigrams', [('word', str), ('count', int)],
+               ((word, self.word_unigram_counter()[word])
+                for word in self.wordlist()))
+
+        if self._has_corpus_results():
+            yield ('word_bigrams', [('words', list), ('count', int)],
+                   self.word_bigram_counter().items())
+            yield ('word_trigrams', [('words', list), ('count', int)],
+                   self.word_trigram_counter().items())
+
+        yield ('stems_to_words', [('stem', str), ('words', list)],
+               self.stems_to_words().items())
+        yield ('signatures_to_stems', [('signature', str), ('stems', list)],
+               ((SEP_SIG.join(sig), stems)
+                for sig, stems in self.signatures_to_stems().items()))
+        yield ('stems_to_signatures', [('stem', str), ('signatures', list)],
+               ((stem, sorted(SEP_SIG.join(sig) for sig in sigs))
+                for stem, sigs in self.stems_to_signatures().items()))
+        yield ('words_to_signatures', [('word', str), ('signatures', list)],
+               ((word, sorted(SEP_SIG.join(sig) for sig in sigs))
+                for word, sigs in self.words_to_signatures().items()))
+        yield ('signatures_to_words', [('signature', str), ('words', list)],
+               ((SEP_SIG.join(sig), words)
+                for sig, words in self.signatures_to_words().items()))
+        yield ('words_to_sigtransforms',
+               [('word', str), ('sigtransforms', list)],
+               ((word, sorted(SEP_SIG.join(sig) + SEP_SIGTRANSFORM + affix
+                              for sig, affix in sigtransforms))
+                for word, sigtransforms
+                in self.words_to_sigtransforms().items()))
+        yield ('affixes_to_signatures', [('affix', str), ('signatures', list)],
+               ((affix, sorted(SEP_SIG.join(sig) for sig in sigs))
+                for affix, sigs in self.affixes_to_signatures().items()))
+
+        if self._has_corpus_results():
+            yield ('words_to_neighbors', [('word', str), ('neighbors', list)],
+                   self.words_to_neighbors().items())
+
+        yield ('phones',
+               [('phone', str), ('count', int), ('frequency', float),
+                ('plog', float)],
+               ((phone, x.count, x.frequency, x.plog)
+                for phone, x in self.phone_dict().items()))
+        yield ('biphones',
+               [('biphone', list), ('count', int), ('frequency', float),
+                ('MI', float), ('weighted_MI', float)],
+               ((biphone, x.count, x.frequency, x.MI, x.weighted_MI)
+                for biphone, x in self.biphone_dict().items()))
+        yield ('triphones', [('triphone', list), ('count', int)],
+               self.phone_trigram_counter().items())
+        yield ('word_phonology',
+               [('word', str), ('count', int), ('frequency', float),
+                ('phones', list), ('unigram_plog', float),
+                ('avg_unigram_plog', float), ('bigram_plog', float),
+                ('avg_bigram_plog', float), ('trigram_plog', float),
+                ('avg_trigram_plog', float)],
+               ((word, x.count, x.frequency, x.phones, x.unigram_plog,
+                 x.avg_unigram_plog, x.bigram_plog, x.avg_bigram_plog,
+                 x.trigram_plog, x.avg_trigram_plog)
+                for word, x in self.word_phonology_dict().items()))
+
+        yield ('words_as_tries',
+               [('word', str), ('left_to_right', list),
+                ('right_to_left', list)],
+               ((word, self.broken_words_left_to_right()[word],
+                 self.broken_words_right_to_left()[word])
+                for word in self.wordlist()))
+        yield ('successors', [('string', str), ('successors', list)],
+               self.successors().items())
+        yield ('predecessors', [('string', str), ('predecessors', list)],
+               self.predecessors().items())
+
+    def to_sqlite(self, file_path):
+        """
+        Write the results to an SQLite database at *file_path*, which can be
+        queried directly (see ``linguistica.database``) or read back by
+        ``from_sqlite()``. An existing file is replaced.
+
+        The database has the words, the word ngrams and word neighbors (for
+        corpus data), signatures with their affixes, stems, and words,
+        sigtransforms, and successors and predecessors.
+
+        :param file_path: path of the database file
+        """
+        if self._has_corpus_results():
+            word_bigram_counter = self.word_bigram_counter()
+            word_trigram_counter = self.word_trigram_counter()
+            words_to_neighbors = self.words_to_neighbors()
+        else:
+            word_bigram_counter = word_trigram_counter = None
+            words_to_neighbors = None
+
+        meta = {'number_of_word_types': self.number_of_word_types(),
+                'number_of_word_tokens': self.number_of_word_tokens(),
+                'input_file_path': self.file_abspath}
+
+        database.write_database(
+            file_path, meta, self.parameters(), self.wordlist(),
+            self.word_unigram_counter(), self.stems_to_words(),
+            self.signatures_to_stems(), self.signatures_to_words(),
+            self.words_to_signatures(), self.words_to_sigtransforms(),
+            self.successors(), self.predecessors(),
+            word_bigram_counter=word_bigram_counter,
+            word_trigram_counter=word_trigram_counter,
+            words_to_neighbors=words_to_neighbors)
+
+    @classmethod
+    def from_sqlite(cls, file_path):
+        """
+        Create a Linguistica object from a database by ``to_sqlite()``.
+
+        The stored results are read lazily: the dicts returned by the
+        methods are views that query the database when they are used.
+        The neighbor graph is built from the stored neighbors, and results
+        not stored (e.g., phonology) are computed from the stored words as
+        usual, so that ``output_all_results()``, ``export()``, and
+        ``to_sqlite()`` write the stored ngrams and neighbors as well.
+
+        :param file_path: path of the database file
+        :rtype: Lexicon
+        """
+        connection = database.connect(file_path)
+        _, parameters = database.read_meta(connection)
+        lexicon = cls(**{parameter: value
+                         for parameter, value in parameters.items()
+                         if parameter in PARAMETERS})
+        lexicon._database = connection
+        lexicon._initialize()
+        return lexicon
+
+    def _read_database_results(self):
+        meta, _ = database.read_meta(self._database)
+        self._number_of_word_types = meta['number_of_word_types']
+        self._number_of_word_tokens = meta['number_of_word_tokens']
+
+        results = database.read_results(self._database)
+        self._wordlist = results['wordlist']
+        self._word_unigram_counter = results['word_unigram_counter']
+        self._corpus_results_stored = \
+            results['word_bigram_counter'] is not None
+        self._word_bigram_counter = results['word_bigram_counter'] or dict()
+        self._word_trigram_counter = results['word_trigram_counter'] or dict()
+
+        self._stems_to_words = results['stems_to_words']
+        self._signatures_to_stems = results['signatures_to_stems']
+        self._stems_to_signatures = results['stems_to_signatures']
+        self._words_to_signatures = results['words_to_signatures']
+        self._signatures_to_words = results['signatures_to_words']
+        self._words_to_sigtransforms = results['words_to_sigtransforms']
+        self._affixes_to_signatures = results['affixes_to_signatures']
+        self._signatures = self._signatures_to_stems.keys()
+        self._words_in_signatures = self._words_to_signatures.keys()
+        self._affixes = self._affixes_to_signatures.keys()
+        self._stems = self._stems_to_words.keys()
+
+        self._words_to_neighbors = results['words_to_neighbors']
+
+        self._successors = results['successors']
+        self._predecessors = results['predecessors']
 
     # --------------------------------------------------------------------------
     # for number of word types and tokens
@@ -879,54 +1015,53 @@ class Lexicon:
         return self._wordlist
 
     def _read_from_wordlist_file_object(self):
-        word_freq_dict = dict()
-        words_to_phones = dict()
-
-        for line in self.wordlist_file_object:
-            line = line.strip()
-            if not line or line.startswith('#'):
-                continue
-
-            word, *rest = line.split()
-
-            if not self.parameters_['keep_case']:
-                word = word.lower()
-
-            try:
-                freq = int(rest[0])
-            except (ValueError, IndexError):
-                freq = 1
-
-            phones = rest[1:]
-            if not phones:
-                phones = list(word)
-
-            word_freq_dict[word] = freq
-            words_to_phones[word] = phones
+        if not self.file_is_wordlist:
+            self._word_unigram_counter = dict()
+            self._words_to_phones = dict()
+            return
 
-        self._word_unigram_counter = word_freq_dict
-        self._words_to_phones = words_to_phones
+        self._wordlist_arrays = phon.load_wordlist(
+            self.file_abspath, encoding=self.encoding,
+            keep_case=self.parameters_['keep_case'], cache_dir=self.cache_dir)
+        words, counts = self._wordlist_arrays[:2]
+        self._word_unigram_counter = dict(zip(words, counts.tolist()))
 
-    def _make_word_ngrams_from_corpus_file_object(self):
+    def _make_word_ngrams_from_corpus_file_object(self, progress=None):
         if self.corpus_file_object is None:
             self._word_bigram_counter = dict()
             self._word_trigram_counter = dict()
             return
 
-        unigrams, bigrams, trigrams = ngram.run(
+        # the corpus is read only if the manifold module has not read it
+        if self._encoded_corpus is None:
+            self._encode_corpus(progress)
+        checkpoint(progress)
+
+        word_types, codes = self._encoded_corpus
+        self._word_unigram_counter, self._word_bigram_counter, \
+            self._word_trigram_counter = [
+                ngram.count_encoded(word_types, codes, n) for n in (1, 2, 3)]
+        # the manifold module uses the ngrams from now on
+        self._encoded_corpus = None
+        checkpoint(progress, 1.0)
+
+    def _encode_corpus(self, progress=None):
+        # one pass over the corpus (see ngram.encode()) for both the word
+        # ngrams and the contexts of the manifold module
+        self.corpus_file_object.seek(0)
+        self._encoded_corpus = ngram.encode(
             corpus_file_object=self.corpus_file_object,
             keep_case=self.parameters_['keep_case'],
-            max_word_tokens=self.parameters_['max_word_tokens'])
-
-        self._word_unigram_counter = unigrams
-        self._word_bigram_counter = bigrams
-        self._word_trigram_counter = trigrams
+            max_word_tokens=self.parameters_['max_word_tokens'],
+            progress=progress)
 
-    def run_ngram_module(self, verbose=False):
+    def run_ngram_module(self, verbose=False, progress=None):
         """
         Run the ngram module.
         """
         vprint('Extracting word ngrams...', verbose=verbose)
+        if self._word_unigram_counter is None and self.corpus_file_object:
+            self._make_word_ngrams_from_corpus_file_object(progress)
         if self._wordlist is None:
             self._make_wordlist()
 
@@ -1043,15 +1178,22 @@ class Lexicon:
             self._make_all_signature_objects()
         return self._stems
 
-    def _make_all_signature_objects(self):
-        self._stems_to_words = signature.make_stems_to_words(
+    def _make_all_signature_objects(self, progress=None):
+        # (the objects are all set at the end, so that a cancelled run leaves
+        # none of them behind)
+        stems_to_words = signature.make_stems_to_words(
             self.wordlist(), self.parameters_['min_stem_length'],
             self.parameters_['max_affix_length'], self.parameters_['suffixing'],
-            self.parameters_['min_sig_count'])
+            self.parameters_['min_sig_count'], stage(progress, 0, 0.7))
 
-        self._signatures_to_stems = signature.make_signatures_to_stems(
-            self._stems_to_words, self.parameters_['max_affix_length'],
-            self.parameters_['min_sig_count'], self.parameters_['suffixing'])
+        signatures_to_stems = signature.make_signatures_to_stems(
+            stems_to_words, self.parameters_['max_affix_length'],
+            self.parameters_['min_sig_count'], self.parameters_['suffixing'],
+            stage(progress, 0.7, 0.9))
+        checkpoint(progress, 0.9)
+
+        self._stems_to_words = stems_to_words
+        self._signatures_to_stems = signatures_to_stems
 
         self._stems_to_signatures = signature.make_stems_to_signatures(
             self._signatures_to_stems)
@@ -1074,12 +1216,12 @@ class Lexicon:
         self._affixes = set(self._affixes_to_signatures.keys())
         self._stems = set(self._stems_to_words.keys())
 
-    def run_signature_module(self, verbose=False):
+    def run_signature_module(self, verbose=False, progress=None):
         """
         Run the signature module.
         """
         vprint('Morphological signatures...', verbose=verbose)
-        self._make_all_signature_objects()
+        self._make_all_signature_objects(progress)
 
     # --------------------------------------------------------------------------
     # for the "manifold" module
@@ -1098,6 +1240,10 @@ class Lexicon:
         """
         Return a dict of words to contexts with counts.
 
+        The returned object is a read-only dict-like view backed by the
+        sparse word-by-context matrix. For each word, ``most_common(k)``
+        gives the *k* contexts with the highest counts.
+
         :rtype: dict(str: dict(tuple(str): int))
         """
         if self._words_to_contexts is None:
@@ -1108,6 +1254,10 @@ class Lexicon:
         """
         Return a dict of contexts to words with counts.
 
+        The returned object is a read-only dict-like view backed by the
+        sparse word-by-context matrix. For each context, ``most_common(k)``
+        gives the *k* words with the highest counts.
+
         :rtype: dict(tuple(str): dict(str: int))
         """
         if self._contexts_to_words is None:
@@ -1118,31 +1268,187 @@ class Lexicon:
         """
         Return the syntactic word neighborhood graph.
 
+        The NetworkX graph is built from ``sparse_neighbor_graph()``
+        the first time it is requested.
+
         :rtype: networkx undirected graph
         """
         if self._neighbor_graph is None:
-            self._make_all_manifold_objects()
+            self._neighbor_graph = self.sparse_neighbor_graph().to_networkx()
         return self._neighbor_graph
 
-    def _make_all_manifold_objects(self):
+    def sparse_neighbor_graph(self):
+        """
+        Return the syntactic word neighborhood graph as a sparse adjacency
+        matrix plus the word table. The graph object has methods for the
+        connected components and for writing the graph as an edge list,
+        in GraphML, or in the Matrix Market format, all without NetworkX.
+
+        :rtype: linguistica.manifold.NeighborGraph
+        """
+        if self._sparse_neighbor_graph is None:
+            if self._database is not None and \
+                    self._words_to_neighbors is not None:
+                # the graph of the stored neighbors of the top words
+                self._sparse_neighbor_graph = \
+                    manifold.neighbor_graph_from_dict(
+                        self._words_to_neighbors,
+                        self.wordlist()[: len(self._words_to_neighbors)])
+            else:
+                self._make_all_manifold_objects()
+        return self._sparse_neighbor_graph
+
+    def eigenvalues(self):
+        """
+        Return the eigenvalues (in descending order) of the normalized
+        word-context graph Laplacian, one for each of the eigenvectors.
+        ``None`` if the ``neighbor_method`` parameter is not spectral.
+
+        :rtype: numpy array
+        """
+        if self._words_to_neighbors is None:
+            self._make_all_manifold_objects()
+        return self._eigenvalues
+
+    def eigenvectors(self):
+        """
+        Return the eigenvectors of the normalized word-context graph Laplacian
+        as the columns of an array. Each row gives the coordinates of a word,
+        where the rows follow the order of ``wordlist()``.
+        ``None`` if the ``neighbor_method`` parameter is not spectral.
+
+        :rtype: numpy array
+        """
+        if self._words_to_neighbors is None:
+            self._make_all_manifold_objects()
+        return self._eigenvectors
+
+    def _get_word_index(self):
+        if self._word_index is None:
+            if self.eigenvectors() is None:
+                raise ValueError('nearest words need the spectral '
+                                 'word neighbors (neighbor_method = 0)')
+            self._word_index = manifold.WordIndex(
+                self.eigenvectors(), self.sparse_neighbor_graph().words)
+        return self._word_index
+
+    def nearest_words(self, word, k=None, subset=None):
+        """
+        Return the *k* nearest words of *word* in the word manifold,
+        from the nearest to the farthest.
+
+        :param word: a word, or a vector of coordinates as in a row of
+            ``eigenvectors()``
+        :param k: number of nearest words;
+            defaults to the ``n_neighbors`` parameter
+        :param subset: if given, only these words are considered
+        :rtype: list(str)
+        """
+        if k is None:
+            k = self.parameters_['n_neighbors']
+        return self._get_word_index().nearest(word, k, subset=subset)
+
+    def nearest_words_batch(self, words, k=None):
+        """
+        Return a dict of each of *words* to its *k* nearest words
+        in the word manifold; see ``nearest_words()``.
+
+        :rtype: dict(str: list(str))
+        """
+        if k is None:
+            k = self.parameters_['n_neighbors']
+        return self._get_word_index().nearest_batch(words, k)
+
+    def _corpus_sentences(self):
+        # the word tokens of the corpus, line by line, as read once
+        return ngram.decode(*self._encoded_corpus)
+
+    def word_clusters(self, n_clusters=10, method='kmeans'):
+        """
+        Return word classes as sets of words, from the largest to the
+        smallest. The results are kept until the word manifold
+        is re-computed.
+
+        :param n_clusters: number of word classes (``'kmeans'`` only)
+        :param method: ``'kmeans'`` (mini-batch k-means over the rows of
+            ``eigenvectors()``) or ``'label_propagation'`` (communities
+            of ``sparse_neighbor_graph()``, whose number is determined
+            by the graph)
+        :rtype: list(set(str))
+        """
+        if self._words_to_neighbors is None:
+            self._make_all_manifold_objects()
+
+        key = (n_clusters, method)
+        if key not in self._word_clusters:
+            words = self.sparse_neighbor_graph().words
+
+            if method == 'kmeans':
+                if self.eigenvectors() is None:
+                    raise ValueError('k-means needs the spectral '
+                                     'word neighbors (neighbor_method = 0)')
+                labels, _ = manifold.minibatch_kmeans(self.eigenvectors(),
+                                                      n_clusters)
+            elif method == 'label_propagation':
+                labels = manifold.label_propagation(
+                    self.sparse_neighbor_graph().adjacency)
+            else:
+                raise ValueError('unknown clustering method -- ' +
+                                 str(method))
+
+            self._word_clusters[key] = manifold.group_by_label(labels, words)
+
+        return self._word_clusters[key]
+
+    def _make_all_manifold_objects(self, progress=None):
+        if self.corpus_file_object and self._word_bigram_counter is None:
+            # without the word bigrams and trigrams at hand, count only the
+            # contexts of the most frequent words directly from the corpus,
+            # which is kept encoded for the word ngrams if they are needed
+            if self._encoded_corpus is None:
+                self._encode_corpus(stage(progress, 0, 0.2))
+                progress = stage(progress, 0.2, 1)
+            if self._word_unigram_counter is None:
+                word_types, codes = self._encoded_corpus
+                self._word_unigram_counter = ngram.count_encoded(
+                    word_types, codes, 1)
+            bigram_counter = trigram_counter = None
+            sentences = self._corpus_sentences
+        else:
+            bigram_counter = self.word_bigram_counter()
+            trigram_counter = self.word_trigram_counter()
+            sentences = None
+
         self._words_to_neighbors, self._words_to_contexts, \
-        self._contexts_to_words = manifold.run(
+        self._contexts_to_words, self._eigenvalues, \
+        self._eigenvectors, self._sparse_neighbor_graph = manifold.run(
             self.word_unigram_counter(),
-            self.word_bigram_counter(),
-            self.word_trigram_counter(),
+            bigram_counter,
+            trigram_counter,
             self.parameters_['max_word_types'],
             self.parameters_['n_neighbors'],
             self.parameters_['n_eigenvectors'],
-            self.parameters_['min_context_count'])
-        self._neighbor_graph = manifold.compute_graph(self._words_to_neighbors)
+            self.parameters_['min_context_count'],
+            embedding_method=manifold.EMBEDDING_METHODS[
+                self.parameters_['embedding_method']],
+            cache=self._manifold_cache,
+            input_version=self._counts_version,
+            max_memory=self.parameters_['max_memory'],
+            sentences=sentences,
+            neighbor_method=manifold.NEIGHBOR_METHODS[
+                self.parameters_['neighbor_method']],
+            progress=progress)
+        self._neighbor_graph = None
+        self._word_index = None
+        self._word_clusters = dict()
 
-    def run_manifold_module(self, verbose=False):
+    def run_manifold_module(self, verbose=False, progress=None):
         """
-        Run the phon module.
+        Run the manifold module.
         """
         vprint('Syntactic word neighbors...', verbose=verbose)
         if self.corpus_file_object:
-            self._make_all_manifold_objects()
+            self._make_all_manifold_objects(progress)
 
     # --------------------------------------------------------------------------
     # for the "phon" module
@@ -1204,48 +1510,159 @@ class Lexicon:
 
     def word_phonology_dict(self):
         """
-        Return a dict of words to Word objects.
-        A Word instance has the methods
-        ``spelling()``, ``phones()``, ``count()``, ``frequency()``,
-        ``unigram_plog()``, ``avg_unigram_plog()``,
-        ``bigram_plog()``, and ``avg_bigram_plog()``.
+        Return a dict of words to WordPhonology objects.
+        A WordPhonology instance has the attributes
+        ``spelling``, ``phones``, ``count``, ``frequency``,
+        ``unigram_plog``, ``avg_unigram_plog``,
+        ``bigram_plog``, ``avg_bigram_plog``,
+        ``trigram_plog``, and ``avg_trigram_plog``.
+        The dict is a read-only view of ``phonology_tables()``.
 
-        :rtype: dict(str: Word instance)
+        :rtype: dict(str: WordPhonology instance)
         """
         if self._word_dict is None:
             self._make_all_phon_objects()
         return self._word_dict
 
+    def phonology_tables(self):
+        """
+        Return the array-based phonology of the wordlist, with phone IDs of
+        all words in one flat array and the phone plogs, biphone MI, and
+        word plogs as NumPy arrays.
+
+        :rtype: PhonologyTables instance
+        """
+        if self._phonology_tables is None:
+            self._make_all_phon_objects()
+        return self._phonology_tables
+
+    def score_phonotactics(self, words, floor=None, average=True, order=2):
+        """
+        Return the phonotactic scores of *words*, which need not be in
+        the wordlist. Lower scores are more likely. With ``order=2``, a score
+        is the bigram plog of a word under the biphone model of the wordlist
+        (see ``word_phonology_dict()``); higher orders use a phone n-gram
+        model with interpolated absolute discounting, as for the trigram
+        plogs of ``word_phonology_dict()``.
+
+        :param words: list of words, each either a string (its characters
+            are its phones) or a list of phones
+        :param floor: frequency given to unseen phones (and biphones, for
+            ``order=2``); by default, half a count
+        :param average: if True, average the score over the phones of each
+            word, as ``avg_bigram_plog``
+        :param order: phone n-gram order
+        :rtype: numpy.ndarray
+        """
+        if order == 2:
+            return phon.score_phonotactics(self.phonology_tables(), words,
+                                           floor=floor, average=average)
+
+        tables = self.phonology_tables()
+        if order == 3 and floor is None:
+            model = tables.trigram_model
+        elif (order, floor) in self._phonotactic_models:
+            model = self._phonotactic_models[(order, floor)]
+        else:
+            model = phon.PhonotacticModel(tables, order=order, floor=floor)
+            self._phonotactic_models[(order, floor)] = model
+        return model.score(words, average=average)
+
     def words_to_phones(self):
         """
         Return a dict of words with their phones.
 
         :rtype: dict(str: list(str))
         """
+        if self._words_to_phones is None and self.file_is_wordlist:
+            self.word_unigram_counter()
+            words, _, phones, offsets, sequence = self._wordlist_arrays
+            offsets = offsets.tolist()
+            sequence = sequence.tolist()
+            self._words_to_phones = {
+                word: [phones[j] for j in sequence[offsets[i] + 1:
+                                                   offsets[i + 1]]]
+                for i, word in enumerate(words)}
         return self._words_to_phones
 
     def _make_all_phon_objects(self):
-        word_unigram_counter = self.word_unigram_counter()
-        words_to_phones = self.words_to_phones()
+        self.word_unigram_counter()
+        if self._wordlist_arrays is not None:
+            # a wordlist file, already in the form of the tables
+            tables = phon.PhonologyTables(*self._wordlist_arrays)
+        else:
+            tables = phon.make_phonology_tables(self.word_unigram_counter(),
+                                                self.words_to_phones())
+        self._phonology_tables = tables
 
-        self._phone_unigram_counter, self._phone_bigram_counter, \
-        self._phone_trigram_counter = phon.make_word_ngrams(
-            word_unigram_counter, words_to_phones)
+        self._phone_unigram_counter = tables.phone_unigram_counter()
+        self._phone_bigram_counter = tables.phone_bigram_counter()
+        self._phone_trigram_counter = tables.phone_trigram_counter()
 
         self._phone_dict = phon.make_phone_dict(self._phone_unigram_counter)
         self._biphone_dict = phon.make_biphone_dict(self._phone_bigram_counter,
                                                     self._phone_dict)
-        self._word_dict = phon.make_word_dict(self.word_unigram_counter(),
-                                              self.phone_dict(),
-                                              self.biphone_dict(),
-                                              self.words_to_phones())
+        self._word_dict = phon.WordPhonologyView(tables)
+        self._phonotactic_models = dict()
+
+    def update_word_counts(self, word_counts, words_to_phones=None):
+        """
+        Add words or change word counts. The phonology objects, if already
+        computed, are updated incrementally from the phones of the affected
+        words instead of being recomputed. Objects of the other modules
+        (signatures, tries, word neighbors) are left as they are; running
+        these modules again uses the new counts.
+
+        :param word_counts: dict of words to their new counts
+        :param words_to_phones: dict of new words to lists of phones, for
+            a wordlist file with phones; by default, the phones of a new word
+            are its characters
+        """
+        word_unigram_counter = self.word_unigram_counter()
+        if not isinstance(word_unigram_counter, dict):
+            # a read-only view of the database by from_sqlite()
+            word_unigram_counter = dict(word_unigram_counter.items())
+            self._word_unigram_counter = word_unigram_counter
+        if self.file_is_wordlist:
+            all_words_to_phones = self.words_to_phones()
+            for word in word_counts:
+                if word in all_words_to_phones:
+                    continue
+                if words_to_phones and word in words_to_phones:
+                    all_words_to_phones[word] = list(words_to_phones[word])
+                else:
+                    all_words_to_phones[word] = list(word)
+            # the wordlist file no longer matches the wordlist
+            self._wordlist_arrays = None
+        elif words_to_phones:
+            raise ValueError('phones are only available for wordlist files')
+
+        word_unigram_counter.update(word_counts)
+        self._counts_version += 1
+        self._wordlist = None
+        self._number_of_word_types = None
+        self._number_of_word_tokens = None
+
+        tables = self._phonology_tables
+        if tables is None:
+            return
+        tables.update(word_counts, self.words_to_phones())
+        self._phone_unigram_counter = tables.phone_unigram_counter()
+        self._phone_bigram_counter = tables.phone_bigram_counter()
+        self._phone_trigram_counter = tables.phone_trigram_counter()
+        self._phone_dict = phon.make_phone_dict(self._phone_unigram_counter)
+        self._biphone_dict = phon.make_biphone_dict(self._phone_bigram_counter,
+                                                    self._phone_dict)
+        self._phonotactic_models = dict()
 
-    def run_phon_module(self, verbose=False):
+    def run_phon_module(self, verbose=False, progress=None):
         """
         Run the phon module.
         """
         vprint('Phonology...', verbose=verbose)
+        checkpoint(progress, 0.0)
         self._make_all_phon_objects()
+        checkpoint(progress, 1.0)
 
     # --------------------------------------------------------------------------
     # for the "trie" module
@@ -1290,14 +1707,14 @@ class Lexicon:
             self._make_all_trie_objects()
         return self._predecessors
 
-    def _make_all_trie_objects(self):
+    def _make_all_trie_objects(self, progress=None):
         self._broken_words_left_to_right, self._broken_words_right_to_left, \
         self._successors, self._predecessors = trie.run(
-            self.wordlist(), self.parameters_['min_stem_length'])
+            self.wordlist(), self.parameters_['min_stem_length'], progress)
 
-    def run_trie_module(self, verbose=False):
+    def run_trie_module(self, verbose=False, progress=None):
         """
         Run the trie module.
         """
         vprint('Tries...', verbose=verbose)
-        self._make_all_trie_objects()
+        self._make_all_trie_objects(progress)
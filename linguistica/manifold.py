@@ -1,122 +1,482 @@
 # -*- encoding: utf8 -*-
 
+import os
 from collections import defaultdict
+from collections.abc import (Mapping, Sequence)
+from concurrent.futures import (ThreadPoolExecutor, as_completed)
+from xml.sax.saxutils import quoteattr
 
-from scipy import (sparse, spatial)
-from scipy.sparse import linalg
+from scipy import (io, sparse, spatial)
+from scipy.sparse import (csgraph, linalg)
 import numpy as np
-import networkx as nx
-
-from linguistica.util import double_sorted
-
-
-def get_array(wordlist, bigram_to_freq, trigram_to_freq,
-              min_context_count):
-    worddict = {word: wordlist.index(word) for word in wordlist}
-
-    # convert the bigram and trigram counter dicts into list and sort them
-    # throw away bi/trigrams whose frequency is below min_context_count
-
-    bigram_to_freq_sorted = [(bigram, freq) for bigram, freq in
-                             double_sorted(bigram_to_freq.items(),
-                                           key=lambda x: x[1],
-                                           reverse=True) if
-                             freq >= min_context_count]
-
-    trigram_to_freq_sorted = [(trigram, freq) for trigram, freq in
-                              double_sorted(trigram_to_freq.items(),
-                                            key=lambda x: x[1],
-                                            reverse=True) if
-                              freq >= min_context_count]
-
-    # This is necessary so we can reference variables from inner functions
-    class Namespace:
-        pass
-
-    ns = Namespace()
-    ns.n_contexts = 0
-
-    # We use "n_contexts" to keep track of how many unique contexts there are.
-    # Conveniently, n_contexts also serves to provide a unique context
-    # index whenever the program encounters a new context. The dummy class
-    # Namespace is to make it possible that we can refer to and update
-    # n_contexts within inner functions
-    # (both "contexts_increment" and "add_word")
-    # inside this "GetContextArray" function.
-
-    def contexts_increment():
-        tmp = ns.n_contexts
-        ns.n_contexts += 1
-        return tmp
-
-    contextdict = defaultdict(contexts_increment)
-    # key: context (e.g., tuple ('of', '_', 'cat') as a 3-gram context for 'the'
-    # value: context index (int)
-    # This dict is analogous to worddict, where each key is a word (str)
-    # and each value is a word index (int).
-
-    # entries for sparse matrix
-    rows = []  # row numbers are word indices
-    cols = []  # column numbers are context indices
-    values = []
-
-    words_to_contexts = dict()
-    contexts_to_words = dict()
-
-    for word in worddict.keys():
-        words_to_contexts[word] = dict()
-
-    def add_word(current_word, current_context, occurrence_count):
-        word_no = worddict[current_word]
-        context_no = contextdict[current_context]
-        rows.append(word_no)
-        cols.append(context_no)
-
-        # if we use 1, we assume "type" counts.
-        # What if we use occurrence_count (--> "token" counts)?
-        values.append(1)
-
-        # update words_to_contexts and contexts_to_words
-        if current_context not in words_to_contexts[current_word]:
-            words_to_contexts[current_word][current_context] = 0
-
-        if current_context not in contexts_to_words:
-            contexts_to_words[current_context] = dict()
-        if current_word not in contexts_to_words[current_context]:
-            contexts_to_words[current_context][current_word] = 0
-
-        words_to_contexts[current_word][current_context] += occurrence_count
-        contexts_to_words[current_context][current_word] += occurrence_count
-
-    for trigram, freq in trigram_to_freq_sorted:
-        word1, word2, word3 = trigram
-
-        context1 = ('_', word2, word3)
-        context2 = (word1, '_', word3)
-        context3 = (word1, word2, '_')
-
-        if word1 in words_to_contexts:
-            add_word(word1, context1, freq)
-        if word2 in words_to_contexts:
-            add_word(word2, context2, freq)
-        if word3 in words_to_contexts:
-            add_word(word3, context3, freq)
-
-    for bigram, freq in bigram_to_freq_sorted:
-        word1, word2 = bigram
-
-        context1 = ('_', word2)
-        context2 = (word1, '_')
-
-        if word1 in words_to_contexts:
-            add_word(word1, context1, freq)
-        if word2 in words_to_contexts:
-            add_word(word2, context2, freq)
-
-    # csr_matrix in scipy.sparse means compressed matrix
-    context_array = sparse.csr_matrix((values, (rows, cols)),
-                                      shape=(len(worddict), ns.n_contexts + 1),
-                                      dtype=np.int64)
+
+from linguistica.util import (double_sorted, top_k_indices, unique_rows,
+                              checkpoint, stage, track)
+
+# for manifold.run() and the "embedding_method" parameter
+EMBEDDING_METHODS = ('exact', 'randomized', 'nystrom')
+
+# for manifold.run() and the "neighbor_method" parameter
+NEIGHBOR_METHODS = ('spectral', 'minhash', 'cosine')
+
+# the MinHash functions are (a * x + b) mod this prime
+MINHASH_PRIME = 2 ** 31 - 1
+
+# above this number of dimensions, cKDTree tends to lose its edge over
+# the blocked brute-force search in compute_nearest_neighbors()
+KDTREE_MAX_DIMENSIONS = 16
+
+# choose_stages() keeps the Laplacian dense only if at least this fraction
+# of the shared context matrix is (estimated to be) non-zero
+DENSE_MIN_DENSITY = 0.5
+
+
+# Each context type gets a code; the context words are given by their
+# positions in the ngram: (code, position of the word, positions of the
+# context words), e.g., ('_', 'of', 'cat') as a context for 'the' in the
+# trigram ('the', 'of', 'cat') has code 0.
+TRIGRAM_CONTEXT_TYPES = [(0, 0, (1, 2)), (1, 1, (0, 2)), (2, 2, (0, 1))]
+BIGRAM_CONTEXT_TYPES = [(3, 0, (1,)), (4, 1, (0,))]
+
+
+def encode_ngrams(ngram_to_freq, word_to_index, n=None):
+    """
+    Convert a dict of ngrams to counts into integer-coded arrays.
+
+    :param ngram_to_freq: dict of ngrams (tuples of words) to their counts
+    :param word_to_index: dict of words to their integer codes
+    :param n: the "n" of the ngrams; determined from the data if not given
+    :return: an m-by-n array of word codes and an array of the m counts
+    """
+    if n is None:
+        n = len(next(iter(ngram_to_freq), ()))
+    ngrams = np.fromiter((word_to_index[word] for ngram in ngram_to_freq
+                          for word in ngram), dtype=np.int64,
+                         count=len(ngram_to_freq) * n)
+    counts = np.fromiter(ngram_to_freq.values(), dtype=np.int64,
+                         count=len(ngram_to_freq))
+    return ngrams.reshape(len(ngram_to_freq), n), counts
+
+
+def make_context_matrix(n_words, vocabulary_size, bigrams, bigram_counts,
+                        trigrams, trigram_counts, min_context_count,
+                        dtype=np.int64):
+    """
+    Build the word-by-context count matrix from integer-coded ngrams
+    in one shot.
+
+    Words are coded by their rank in the wordlist (sorted by word frequency
+    in descending order), so that the rows of the matrix are
+    the *n_words* most frequent words.
+
+    :param n_words: number of words (rows) in the output matrix
+    :param vocabulary_size: number of distinct word codes
+    :param bigrams: m-by-2 array of word codes, see ``encode_ngrams()``
+    :param bigram_counts: array of the m bigram counts
+    :param trigrams: m-by-3 array of word codes
+    :param trigram_counts: array of the m trigram counts
+    :param min_context_count: ngrams with lower counts are ignored
+    :param dtype: data type of the counts
+    :return: the sparse matrix of counts (in CSR format) and the array of
+        context keys, one for each column; see ``decode_context()``
+    """
+    rows = list()
+    keys = list()
+    counts = list()
+
+    for ngrams, ngram_counts, context_types in \
+            [(trigrams, trigram_counts, TRIGRAM_CONTEXT_TYPES),
+             (bigrams, bigram_counts, BIGRAM_CONTEXT_TYPES)]:
+        frequent = ngram_counts >= min_context_count
+        ngrams = ngrams[frequent]
+        ngram_counts = ngram_counts[frequent]
+
+        for code, position, context_positions in context_types:
+            words = ngrams[:, position]
+            in_wordlist = words < n_words
+
+            rows.append(words[in_wordlist])
+            keys.append(_context_keys(ngrams[in_wordlist], code,
+                                      context_positions, vocabulary_size))
+            counts.append(ngram_counts[in_wordlist])
+
+    # np.unique sorts the context keys and gives the column numbers
+    context_keys, cols = np.unique(np.concatenate(keys), return_inverse=True)
+
+    context_matrix = sparse.csr_matrix(
+        (np.concatenate(counts), (np.concatenate(rows), cols.ravel())),
+        shape=(n_words, len(context_keys)), dtype=dtype)
+
+    return context_matrix, context_keys
+
+
+def _context_keys(ngrams, code, context_positions, vocabulary_size):
+    # hash each context into a single integer key
+    key = np.full(len(ngrams), code, dtype=np.int64)
+    for context_position in context_positions:
+        key = key * vocabulary_size + ngrams[:, context_position]
+    if len(context_positions) == 1:
+        key = key * vocabulary_size
+    return key
+
+
+def _sum_duplicates(pairs, counts):
+    # sum the counts of identical pairs, which come out sorted
+    if not len(pairs):
+        return pairs, counts
+    order = np.argsort(pairs, kind='mergesort')
+    pairs, counts = pairs[order], counts[order]
+    starts = np.flatnonzero(np.concatenate(([True],
+                                            pairs[1:] != pairs[:-1])))
+    return pairs[starts], np.add.reduceat(counts, starts)
+
+
+def _count_chunk_contexts(codes, line_numbers, n_words, vocabulary_size):
+    # the contexts of the first n_words words in a chunk of word tokens,
+    # as (word, context) pairs coded as key * n_words + word with counts;
+    # ngrams do not cross line boundaries, and ngrams with unknown words
+    # (code -1) are ignored
+    pairs = list()
+
+    for n, context_types in [(3, TRIGRAM_CONTEXT_TYPES),
+                             (2, BIGRAM_CONTEXT_TYPES)]:
+        m = len(codes) - n + 1
+        if m <= 0:
+            continue
+        ngrams = np.column_stack([codes[i: i + m] for i in range(n)])
+        valid = (line_numbers[: m] == line_numbers[n - 1:]) & \
+            (ngrams >= 0).all(axis=1)
+        ngrams = ngrams[valid]
+
+        for code, position, context_positions in context_types:
+            in_wordlist = ngrams[:, position] < n_words
+            keys = _context_keys(ngrams[in_wordlist], code,
+                                 context_positions, vocabulary_size)
+            pairs.append(keys * n_words + ngrams[in_wordlist, position])
+
+    pairs = np.concatenate(pairs) if pairs else np.empty(0, dtype=np.int64)
+    return _sum_duplicates(pairs, np.ones(len(pairs), dtype=np.int64))
+
+
+def count_contexts(sentences, wordlist, n_words, min_context_count,
+                   dtype=np.int64, chunk_size=2 ** 18):
+    """
+    Streaming version of ``make_context_matrix()``: count the contexts of the
+    *n_words* most frequent words directly from the word tokens, without
+    the bigram and trigram counts of the whole corpus.
+    Only the counts of the contexts of these words are kept in memory.
+
+    :param sentences: iterable of lists of words, e.g., from
+        ``linguistica.ngram.tokenize()``; ngrams do not cross sentences
+    :param wordlist: all words, sorted by word frequency in descending order
+    :param n_words: number of words (rows) in the output matrix
+    :param min_context_count: contexts with lower counts are ignored
+    :param dtype: data type of the counts
+    :param chunk_size: number of word tokens processed at a time
+    :return: same as ``make_context_matrix()``
+    :raise ValueError: if the (word, context) pairs do not fit
+        in 64-bit integers
+    """
+    word_to_index = {word: i for i, word in enumerate(wordlist)}
+    vocabulary_size = len(wordlist)
+
+    # each (word, context) pair is coded as a single 64-bit integer
+    if 5 * vocabulary_size ** 2 * max(n_words, 1) >= 2 ** 63:
+        raise ValueError('vocabulary too large for count_contexts()')
+
+    pairs = np.empty(0, dtype=np.int64)
+    counts = np.empty(0, dtype=np.int64)
+    codes = list()
+    line_numbers = list()
+
+    def add_chunk():
+        chunk_pairs, chunk_counts = _count_chunk_contexts(
+            np.array(codes, dtype=np.int64),
+            np.array(line_numbers, dtype=np.int64),
+            n_words, vocabulary_size)
+        del codes[:], line_numbers[:]
+        return _sum_duplicates(np.concatenate((pairs, chunk_pairs)),
+                               np.concatenate((counts, chunk_counts)))
+
+    for line_number, words in enumerate(sentences):
+        codes.extend(word_to_index.get(word, -1) for word in words)
+        line_numbers.extend([line_number] * len(words))
+        if len(codes) >= chunk_size:
+            pairs, counts = add_chunk()
+
+    if codes:
+        pairs, counts = add_chunk()
+
+    frequent = counts >= min_context_count
+    pairs = pairs[frequent]
+    keys = pairs // max(n_words, 1)
+    rows = pairs % max(n_words, 1)
+    context_keys, cols = np.unique(keys, return_inverse=True)
+
+    context_matrix = sparse.csr_matrix(
+        (counts[frequent], (rows, cols.ravel())),
+        shape=(n_words, len(context_keys)), dtype=dtype)
+
+    return context_matrix, context_keys
+
+
+def decode_context(context_key, wordlist, vocabulary_size):
+    """
+    Return the context (e.g., ('of', '_', 'cat')) of a context key
+    from ``make_context_matrix()``.
+    """
+    code, words = divmod(int(context_key), vocabulary_size ** 2)
+    word1, word2 = divmod(words, vocabulary_size)
+
+    if code == 0:
+        return '_', wordlist[word1], wordlist[word2]
+    elif code == 1:
+        return wordlist[word1], '_', wordlist[word2]
+    elif code == 2:
+        return wordlist[word1], wordlist[word2], '_'
+    elif code == 3:
+        return '_', wordlist[word1]
+    else:
+        return wordlist[word1], '_'
+
+
+def encode_context(context, word_to_index, vocabulary_size):
+    """
+    Return the possible context keys (see ``make_context_matrix()``)
+    of a context such as ('of', '_', 'cat'). There is more than one
+    only if some word in the corpus is itself "_".
+    """
+    if len(context) == 3:
+        context_types = TRIGRAM_CONTEXT_TYPES
+    elif len(context) == 2:
+        context_types = BIGRAM_CONTEXT_TYPES
+    else:
+        return []
+
+    keys = list()
+
+    for code, position, context_positions in context_types:
+        if context[position] != '_':
+            continue
+        key = code
+        try:
+            for context_position in context_positions:
+                key = key * vocabulary_size + \
+                    word_to_index[context[context_position]]
+        except KeyError:
+            continue
+        if len(context_positions) == 1:
+            key = key * vocabulary_size
+        keys.append(key)
+
+    return keys
+
+
+class ContextTable(Sequence):
+    """
+    A sequence of contexts (e.g., ('of', '_', 'cat')), one for each column
+    of the word-by-context matrix. Contexts are stored as integer keys and
+    decoded only when asked for.
+    """
+
+    def __init__(self, context_keys, wordlist, word_to_index):
+        self.context_keys = context_keys
+        self.wordlist = wordlist
+        self.word_to_index = word_to_index
+        self.vocabulary_size = len(wordlist)
+
+    def __len__(self):
+        return len(self.context_keys)
+
+    def __getitem__(self, i):
+        return decode_context(self.context_keys[i], self.wordlist,
+                              self.vocabulary_size)
+
+    def index(self, context, *args):
+        """
+        Return the column number of *context*.
+        """
+        # context_keys are sorted, thanks to np.unique
+        for key in encode_context(context, self.word_to_index,
+                                  self.vocabulary_size):
+            i = np.searchsorted(self.context_keys, key)
+            if i < len(self.context_keys) and self.context_keys[i] == key:
+                return int(i)
+        raise ValueError('unknown context -- {}'.format(context))
+
+
+class SparseVectorView(Mapping):
+    """
+    A read-only dict-like view of one row (or column) of a sparse matrix,
+    mapping labels (words or contexts) to counts.
+    """
+
+    def __init__(self, indices, data, labels, label_to_index):
+        self.indices = indices
+        self.data = data
+        self.labels = labels
+        self.label_to_index = label_to_index
+
+    def __getitem__(self, label):
+        try:
+            index = self.label_to_index(label)
+        except (KeyError, ValueError, TypeError):
+            raise KeyError(label)
+        # the indices of a sparse matrix row are sorted
+        i = np.searchsorted(self.indices, index)
+        if i < len(self.indices) and self.indices[i] == index:
+            return int(self.data[i])
+        raise KeyError(label)
+
+    def __iter__(self):
+        for index in self.indices:
+            yield self.labels[index]
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+    def most_common(self, k=None):
+        """
+        Return a list of the *k* labels with the highest counts, together with
+        their counts, from the highest to the lowest (as
+        ``collections.Counter.most_common()`` does).
+        If *k* is ``None``, return all labels.
+        """
+        # by count (descending) and then by label index, as the indices are
+        # sorted; ties at the k-th count are broken the same way
+        top = top_k_indices(self.data, k, reverse=True)
+        return [(self.labels[self.indices[i]], int(self.data[i]))
+                for i in top]
+
+
+class WordsToContexts(Mapping):
+    """
+    A read-only dict-like view of words to their contexts with counts,
+    backed by the word-by-context count matrix (in CSR format).
+    """
+
+    def __init__(self, context_matrix, words, contexts, word_to_row=None):
+        self.matrix = context_matrix.tocsr()
+        self.matrix.sort_indices()
+        self.words = words
+        self.contexts = contexts
+        if word_to_row is None:
+            word_to_row = {word: i for i, word in enumerate(words)}
+        self.word_to_row = word_to_row
+
+    def __getitem__(self, word):
+        row = self.word_to_row[word]
+        start, end = self.matrix.indptr[row], self.matrix.indptr[row + 1]
+        return SparseVectorView(self.matrix.indices[start: end],
+                                self.matrix.data[start: end],
+                                self.contexts, self.contexts.index)
+
+    def __iter__(self):
+        return iter(self.words)
+
+    def __len__(self):
+        return len(self.words)
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+
+class ContextsToWords(Mapping):
+    """
+    A read-only dict-like view of contexts to their words with counts,
+    backed by the word-by-context count matrix (in CSC format).
+    """
+
+    def __init__(self, context_matrix, words, contexts, word_to_row=None):
+        self._csr_matrix = context_matrix
+        self._csc_matrix = None
+        self.words = words
+        self.contexts = contexts
+        if word_to_row is None:
+            word_to_row = {word: i for i, word in enumerate(words)}
+        self.word_to_row = word_to_row
+
+    @property
+    def matrix(self):
+        # the CSC copy is only made when it is needed
+        if self._csc_matrix is None:
+            self._csc_matrix = self._csr_matrix.tocsc()
+            self._csc_matrix.sort_indices()
+            self._csr_matrix = None
+        return self._csc_matrix
+
+    def __getitem__(self, context):
+        try:
+            col = self.contexts.index(context)
+        except (ValueError, TypeError):
+            raise KeyError(context)
+        matrix = self.matrix
+        start, end = matrix.indptr[col], matrix.indptr[col + 1]
+        return SparseVectorView(matrix.indices[start: end],
+                                matrix.data[start: end],
+                                self.words, self.word_to_row.__getitem__)
+
+    def __iter__(self):
+        return iter(self.contexts)
+
+    def __len__(self):
+        return len(self.contexts)
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+
+def get_context_array(wordlist, n_words, bigram_to_freq, trigram_to_freq,
+                      min_context_count, dtype=np.int64, sentences=None):
+    """
+    Compute the word-by-context matrix of the *n_words* most frequent words.
+    The contexts of a word are the trigrams (e.g., ``('of', '_', 'cat')``)
+    and bigrams (e.g., ``('_', 'cat')``) around it whose counts are at least
+    *min_context_count*.
+
+    :param wordlist: all words, sorted by word frequency in descending order
+    :param n_words: number of the most frequent words to use
+    :param dtype: data type of the word-by-context matrix; ``numpy.int32``
+        halves its memory use
+    :param sentences: if given, the contexts are counted from these
+        sentences by ``count_contexts()``, and *bigram_to_freq* and
+        *trigram_to_freq* are not used
+    :return: the binary word-by-context matrix,
+        plus the words_to_contexts and contexts_to_words mappings as
+        ``WordsToContexts`` and ``ContextsToWords`` views
+    """
+    word_to_index = {word: i for i, word in enumerate(wordlist)}
+    vocabulary_size = len(wordlist)
+
+    if sentences is not None:
+        context_matrix, context_keys = count_contexts(
+            sentences, wordlist, n_words, min_context_count, dtype)
+    else:
+        bigrams, bigram_counts = encode_ngrams(bigram_to_freq,
+                                               word_to_index, 2)
+        trigrams, trigram_counts = encode_ngrams(trigram_to_freq,
+                                                 word_to_index, 3)
+
+        context_matrix, context_keys = make_context_matrix(
+            n_words, vocabulary_size, bigrams, bigram_counts,
+            trigrams, trigram_counts, min_context_count, dtype)
+        del bigrams, bigram_counts, trigrams, trigram_counts
+
+    contexts = ContextTable(context_keys, wordlist, word_to_index)
+    words = wordlist[: n_words]
+    word_to_row = {word: i for i, word in enumerate(words)}
+
+    words_to_contexts = WordsToContexts(context_matrix, words, contexts,
+                                        word_to_row)
+    contexts_to_words = ContextsToWords(context_matrix, words, contexts,
+                                        word_to_row)
+
+    # if we use 1, we assume "type" counts.
+    context_array = context_matrix.copy()
+    context_array.data[:] = 1
 
     return context_array, words_to_contexts, contexts_to_words
 
@@ -147,14 +507,221 @@ def compute_laplacian(diameter, incidence_graph):
     return laplacian
 
 
-def compute_eigenvectors(laplacian):
-    # csr_matrix in scipy means compressed matrix
-    laplacian_sparse = sparse.csr_matrix(laplacian)
+def compute_shared_context_matrix(context_array):
+    # shared_context_matrix[i, j] is the number of contexts
+    # that word i and word j have in common; kept in CSR format
+    return context_array.dot(context_array.T).tocsr()
+
+
+def normalize_sparse(shared_context_matrix):
+    # same as normalize(), i.e., the row sums minus the diagonal,
+    # but without looping over (or densifying) the rows
+    row_sums = np.asarray(shared_context_matrix.sum(axis=1)).ravel()
+    return row_sums - shared_context_matrix.diagonal()
+
+
+def compute_incidence_graph_sparse(diameter, shared_context_matrix):
+    # replace the diagonal of the shared context matrix by the diameter
+    dtype = shared_context_matrix.dtype
+    incidence_graph = shared_context_matrix - \
+        sparse.diags(shared_context_matrix.diagonal(), dtype=dtype) + \
+        sparse.diags(diameter, dtype=dtype)
+    incidence_graph = incidence_graph.tocsr()
+    incidence_graph.eliminate_zeros()
+    return incidence_graph
+
+
+def compute_laplacian_sparse(diameter, incidence_graph, dtype=np.float64):
+    # same as compute_laplacian(), but with sparse diagonal scaling:
+    # laplacian = D^(-1/2) * incidence_graph * D^(-1/2),
+    # where D is the diagonal matrix of the diameter
+    d = np.sqrt(np.asarray(diameter, dtype=np.float64))
+    # as in compute_laplacian(), zeros are replaced by ones
+    # to avoid div-by-zero errors
+    d[d == 0] = 1
+    scaling = sparse.diags(1 / d, dtype=dtype)
+    # (an integer incidence graph would upcast float32 to float64)
+    laplacian = scaling.dot(incidence_graph.astype(dtype)).dot(scaling)
+    return laplacian.tocsr()
+
+
+def starting_vectors(n_rows, n_columns=1, random_state=0):
+    """
+    Return an *n_rows* by *n_columns* array of pseudo-random starting vectors
+    for the iterative eigensolvers. A fixed *random_state* makes the
+    eigen-solve (and therefore the word neighbors) reproducible.
+    """
+    return np.random.RandomState(random_state).uniform(
+        -1, 1, (n_rows, n_columns))
+
+
+def compute_eigenvectors(laplacian, n_eigenvectors=6, tol=0, solver='eigsh',
+                         initial_vectors=None):
+    """
+    Compute the *n_eigenvectors* largest eigenvalues and their eigenvectors
+    of the symmetric matrix *laplacian*.
+
+    :param laplacian: symmetric matrix, either sparse or dense
+    :param n_eigenvectors: number of eigenvectors to compute
+    :param tol: relative accuracy for the eigenvalues;
+        0 means machine precision
+    :param solver: ``'eigsh'`` (Lanczos) or ``'lobpcg'``
+    :param initial_vectors: eigenvectors (as columns) from a previous run,
+        used as a warm start; defaults to ``None`` for a deterministic
+        pseudo-random start
+    :return: eigenvalues in descending order, and the real
+        eigenvectors as the columns of an n-by-*n_eigenvectors* array
+    """
+    if sparse.issparse(laplacian):
+        # csr_matrix in scipy means compressed matrix
+        laplacian = laplacian.tocsr()
+    else:
+        laplacian = np.asarray(laplacian)
+
+    n_words = laplacian.shape[0]
+    k = min(n_eigenvectors, n_words)
+
+    if initial_vectors is not None and \
+            initial_vectors.shape[0] != n_words:
+        raise ValueError('initial vectors must have {} rows'.format(n_words))
+
+    if k >= n_words - 1 or (solver == 'lobpcg' and n_words < 5 * k):
+        # too small for the iterative solvers; solve the dense problem
+        if sparse.issparse(laplacian):
+            laplacian = laplacian.toarray()
+        eigenvalues, eigenvectors = np.linalg.eigh(laplacian)
+        eigenvalues = eigenvalues[n_words - k:]
+        eigenvectors = eigenvectors[:, n_words - k:]
+
+    elif solver == 'eigsh':
+        # linalg is the linear algebra module in scipy.sparse
+        # eigsh is for real symmetric matrices
+        if initial_vectors is None:
+            v0 = starting_vectors(n_words)[:, 0]
+        else:
+            # the previous eigenvectors span (nearly) the space we want
+            v0 = np.asarray(initial_vectors[:, :k]).sum(axis=1)
+        v0 = v0.astype(laplacian.dtype)
+        eigenvalues, eigenvectors = linalg.eigsh(laplacian, k=k, which='LA',
+                                                 tol=tol, v0=v0)
+
+    elif solver == 'lobpcg':
+        x = starting_vectors(n_words, k).astype(laplacian.dtype)
+        if initial_vectors is not None:
+            m = min(k, initial_vectors.shape[1])
+            x[:, :m] = initial_vectors[:, :m]
+        eigenvalues, eigenvectors = linalg.lobpcg(laplacian, x,
+                                                  tol=tol or None,
+                                                  maxiter=500, largest=True)
+
+    else:
+        raise ValueError('unknown eigensolver -- ' + str(solver))
+
+    return _sort_eigenpairs(eigenvalues, eigenvectors, k)
+
+
+def compute_approximate_eigenvectors(laplacian, n_eigenvectors=6,
+                                     method='randomized', oversampling=10,
+                                     n_iter=4, n_landmarks=None,
+                                     random_state=0):
+    """
+    Approximate the *n_eigenvectors* largest eigenvalues and their
+    eigenvectors of the symmetric positive semi-definite matrix *laplacian*,
+    for vocabularies too large for ``compute_eigenvectors()``.
+
+    :param laplacian: symmetric matrix, either sparse or dense
+    :param n_eigenvectors: number of eigenvectors to compute
+    :param method: ``'randomized'`` (randomized block Krylov range finder)
+        or ``'nystrom'`` (Nystrom approximation over landmark words)
+    :param oversampling: number of extra dimensions for the random
+        projection, for better accuracy
+    :param n_iter: number of Krylov blocks after the random one
+        (``'randomized'`` only); more blocks mean better accuracy but more
+        time and an n-by-(*n_iter* + 1)(*n_eigenvectors* + *oversampling*)
+        basis in memory
+    :param n_landmarks: number of landmark words (``'nystrom'`` only);
+        the landmarks are the most frequent words, i.e., the first rows.
+        Defaults to 10 times *n_eigenvectors* + *oversampling*.
+    :param random_state: seed for the random projection
+    :return: same as ``compute_eigenvectors()``
+    """
+    n_words = laplacian.shape[0]
+    k = min(n_eigenvectors, n_words)
+    n_components = k + oversampling
+
+    if method == 'randomized':
+        if n_components >= n_words:
+            return compute_eigenvectors(laplacian, k)
+
+        # randomized block Krylov range finder: the blocks q, Lq, L^2 q, ...
+        # (each orthonormalized) together span the top eigenvectors much
+        # better than the last block alone, as in plain power iterations.
+        # The Krylov space is the same for L minus any multiple of the
+        # identity, so no shift of the spectrum is needed (or possible).
+        q = starting_vectors(n_words, n_components, random_state)
+        q, _ = np.linalg.qr(q.astype(laplacian.dtype))
+        blocks = [q]
+        for _ in range(n_iter):
+            q, _ = np.linalg.qr(laplacian.dot(q))
+            blocks.append(q)
+        q, _ = np.linalg.qr(np.hstack(blocks))
+        del blocks
 
-    # linalg is the linear algebra module in scipy.sparse
-    # eigs takes a matrix and
-    # returns (array of eigenvalues, array of eigenvectors)
-    return linalg.eigs(laplacian_sparse)
+        # solve the small projected problem
+        b = q.T.dot(laplacian.dot(q))
+        eigenvalues, eigenvectors = np.linalg.eigh((b + b.T) / 2)
+        eigenvectors = q.dot(eigenvectors)
+
+    elif method == 'nystrom':
+        if n_landmarks is None:
+            n_landmarks = 10 * n_components
+        n_landmarks = max(n_landmarks, k)
+        if n_landmarks >= n_words:
+            return compute_eigenvectors(laplacian, k)
+
+        # laplacian is approximated by c * w^(-1) * c^T,
+        # where c has the columns of the landmarks
+        # and w is the landmark-by-landmark block
+        c = laplacian[:, : n_landmarks]
+        if sparse.issparse(c):
+            c = c.toarray()
+        c = np.asarray(c)
+        w_values, w_vectors = np.linalg.eigh(c[: n_landmarks])
+
+        # pseudo-inverse square root of w
+        keep = w_values > w_values.max() * 1e-10
+        c = c.dot(w_vectors[:, keep] / np.sqrt(w_values[keep]))
+
+        # laplacian ~= c * c^T, whose eigenvectors are
+        # the left singular vectors of c
+        q, r = np.linalg.qr(c)
+        u, singular_values, _ = np.linalg.svd(r)
+        eigenvalues = singular_values ** 2
+        eigenvectors = q.dot(u)
+
+    else:
+        raise ValueError('unknown embedding method -- ' + str(method))
+
+    return _sort_eigenpairs(eigenvalues, eigenvectors, k)
+
+
+def _sort_eigenpairs(eigenvalues, eigenvectors, k):
+    """
+    Return the *k* largest eigenvalues in descending order and
+    the corresponding real, sign-normalized eigenvectors.
+    """
+    order = np.argsort(eigenvalues)[::-1][:k]
+    eigenvalues = np.real(eigenvalues[order])
+    eigenvectors = np.real(eigenvectors[:, order])
+
+    # eigenvectors are unique only up to their signs;
+    # make the largest component of each eigenvector positive
+    largest = np.abs(eigenvectors).argmax(axis=0)
+    signs = np.sign(eigenvectors[largest, np.arange(eigenvectors.shape[1])])
+    signs[signs == 0] = 1
+    eigenvectors = eigenvectors * signs
+
+    return eigenvalues, eigenvectors
 
 
 def compute_words_distance(coordinates):
@@ -172,7 +739,407 @@ def compute_closest_neighbors(word_distances, n_neighbors):
     return nearest_neighbors
 
 
+def compute_nearest_neighbors(coordinates, n_neighbors, method='auto',
+                              block_size=None, progress=None):
+    """
+    Compute the nearest neighbors of each row of *coordinates*
+    without computing the full n-by-n distance matrix.
+
+    :param coordinates: n-by-d array, one row per word
+    :param n_neighbors: number of neighbors per word
+    :param method: ``'kdtree'`` (``scipy.spatial.cKDTree``; good for a low
+        number of dimensions), ``'partition'`` (blocks of rows with
+        ``numpy.argpartition``; good for higher dimensions),
+        ``'full'`` (the full distance matrix, as in
+        ``compute_words_distance()`` and ``compute_closest_neighbors()``),
+        or ``'auto'`` (the default) to choose by the number of dimensions
+    :param block_size: number of rows per block for ``'partition'``
+    :param progress: a ``linguistica.util.Progress``, updated by the blocks
+    :return: n-by-(*n_neighbors* + 1) array of row indices, where the first
+        column is the word itself and the others are its neighbors
+        from the nearest to the farthest
+    """
+    coordinates = np.asarray(coordinates)
+    n_words, n_dimensions = coordinates.shape
+    k = min(n_neighbors + 1, n_words)
+
+    if method == 'auto':
+        if n_dimensions <= KDTREE_MAX_DIMENSIONS:
+            method = 'kdtree'
+        else:
+            method = 'partition'
+
+    if method == 'kdtree':
+        tree = spatial.cKDTree(coordinates)
+        _, nearest_neighbors = tree.query(coordinates, k=k)
+        nearest_neighbors = nearest_neighbors.reshape(n_words, k)
+
+    elif method == 'partition':
+        if block_size is None:
+            # about 8 MB worth of distances per block
+            block_size = max(1, 2 ** 20 // max(n_words, 1))
+        squared_norms = np.einsum('ij,ij->i', coordinates, coordinates)
+        nearest_neighbors = np.empty((n_words, k), dtype=np.intp)
+
+        for start in track(range(0, n_words, block_size), progress, every=1):
+            end = min(start + block_size, n_words)
+            block = coordinates[start: end]
+            distances = squared_norms[start: end, np.newaxis] - \
+                2 * block.dot(coordinates.T) + squared_norms[np.newaxis, :]
+
+            if k < n_words:
+                candidates = np.argpartition(distances, k - 1, axis=1)[:, :k]
+            else:
+                candidates = np.tile(np.arange(n_words), (end - start, 1))
+
+            # sort the k candidates by distance (and then by index)
+            rows = np.arange(end - start)[:, np.newaxis]
+            order = np.lexsort((candidates, distances[rows, candidates]),
+                               axis=1)
+            nearest_neighbors[start: end] = candidates[rows, order]
+
+    elif method == 'full':
+        word_distances = compute_words_distance(coordinates)
+        nearest_neighbors = compute_closest_neighbors(word_distances,
+                                                      k - 1)
+
+    else:
+        raise ValueError('unknown nearest neighbor method -- ' + str(method))
+
+    return _put_self_first(nearest_neighbors)
+
+
+def _put_self_first(nearest_neighbors):
+    """
+    Make sure that the first column of *nearest_neighbors* is the word itself,
+    which may not be the case for words with identical coordinates.
+    """
+    n_words, k = nearest_neighbors.shape
+    word_indices = np.arange(n_words)
+    misplaced = nearest_neighbors[:, 0] != word_indices
+
+    for i in np.flatnonzero(misplaced):
+        others = [j for j in nearest_neighbors[i] if j != i][: k - 1]
+        nearest_neighbors[i] = [i] + others
+
+    return nearest_neighbors
+
+
+def minhash_signatures(context_array, n_hashes=64, random_state=0):
+    """
+    Compute the MinHash signatures of the context sets of the words.
+
+    :param context_array: the word-by-context matrix; the context set of
+        a word is given by the non-zero entries of its row
+    :param n_hashes: number of hash functions
+    :param random_state: seed for the hash functions
+    :return: n-by-*n_hashes* array; the rows of words without contexts
+        are all ``MINHASH_PRIME``
+    """
+    context_array = sparse.csr_matrix(context_array)
+    n_words = context_array.shape[0]
+    random = np.random.RandomState(random_state)
+    a = random.randint(1, MINHASH_PRIME, n_hashes).astype(np.int64)
+    b = random.randint(0, MINHASH_PRIME, n_hashes).astype(np.int64)
+
+    contexts = context_array.indices.astype(np.int64)
+    has_contexts = np.diff(context_array.indptr) > 0
+    starts = context_array.indptr[:-1][has_contexts]
+
+    signatures = np.full((n_words, n_hashes), MINHASH_PRIME, dtype=np.int64)
+    if not len(starts):
+        return signatures
+
+    for h in range(n_hashes):
+        hashes = (a[h] * contexts + b[h]) % MINHASH_PRIME
+        signatures[has_contexts, h] = np.minimum.reduceat(hashes, starts)
+
+    return signatures
+
+
+def lsh_candidate_pairs(signatures, n_bands=16, max_bucket_size=100):
+    """
+    Find the candidate pairs of similar words by locality-sensitive hashing:
+    two words are candidates if their MinHash signatures agree on all rows
+    of at least one band.
+
+    :param signatures: array from ``minhash_signatures()``
+    :param n_bands: number of bands; the number of hash functions
+        must be a multiple of it
+    :param max_bucket_size: buckets with more words are ignored,
+        which keeps the number of pairs (almost) linear
+    :return: two arrays *left* and *right* of word indices, with
+        *left* < *right* for each pair
+    """
+    n_words, n_hashes = signatures.shape
+    if n_hashes % n_bands:
+        raise ValueError('n_bands must divide the number of hash functions')
+    rows_per_band = n_hashes // n_bands
+
+    # words without contexts are similar to no words
+    words = np.flatnonzero((signatures != MINHASH_PRIME).any(axis=1))
+    pairs = [np.empty(0, dtype=np.int64)]
+
+    for band in range(n_bands):
+        band_signatures = signatures[
+            words, band * rows_per_band: (band + 1) * rows_per_band]
+        _, buckets, _ = unique_rows(band_signatures)
+
+        order = np.argsort(buckets, kind='mergesort')
+        buckets = buckets[order]
+        members = words[order]
+        small = np.bincount(buckets)[buckets] <= max_bucket_size
+        buckets = buckets[small]
+        members = members[small]
+
+        # the members of a bucket are next to each other
+        for offset in range(1, min(max_bucket_size, len(members))):
+            same = buckets[offset:] == buckets[: -offset]
+            if not same.any():
+                break
+            left = members[: -offset][same]
+            right = members[offset:][same]
+            pairs.append(np.minimum(left, right).astype(np.int64) * n_words +
+                         np.maximum(left, right))
+
+    pair_codes = np.unique(np.concatenate(pairs))
+    return pair_codes // n_words, pair_codes % n_words
+
+
+def _row_norms(matrix, similarity):
+    if similarity == 'jaccard':
+        # the sizes of the context sets
+        return np.diff(matrix.indptr).astype(np.float64)
+    elif similarity == 'cosine':
+        return np.sqrt(np.asarray(
+            matrix.multiply(matrix).sum(axis=1), dtype=np.float64).ravel())
+    else:
+        raise ValueError('unknown similarity -- ' + str(similarity))
+
+
+def _similarities(dot_products, norms1, norms2, similarity):
+    # Jaccard or cosine similarities from the dot products
+    # (for Jaccard, of binary rows) and the row norms from _row_norms()
+    if similarity == 'jaccard':
+        denominators = norms1 + norms2 - dot_products
+    else:
+        denominators = norms1 * norms2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = dot_products / denominators
+    result[denominators == 0] = 0
+    return result
+
+
+def _top_k(similarities, k):
+    # the column indices of the k highest similarities of each row
+    # (ties broken by the column indices), from the highest
+    if k < similarities.shape[1]:
+        top = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+    else:
+        top = np.tile(np.arange(similarities.shape[1]),
+                      (similarities.shape[0], 1))
+    rows = np.arange(similarities.shape[0])[:, np.newaxis]
+    order = np.lexsort((top, -similarities[rows, top]), axis=1)
+    return top[rows, order]
+
+
+def _rank_pairs(n_rows, rows, cols, similarities, k):
+    # the k cols with the highest similarities (ties broken by the cols)
+    # for each row, from the highest; -1 for rows with fewer pairs
+    order = np.lexsort((cols, -similarities, rows))
+    rows = rows[order]
+    cols = cols[order]
+    ranks = np.arange(len(rows)) - np.searchsorted(rows, rows)
+    top = ranks < k
+
+    nearest = np.full((n_rows, k), -1, dtype=np.intp)
+    nearest[rows[top], ranks[top]] = cols[top]
+    return nearest
+
+
+def _pad_neighbors(nearest, words):
+    # words with fewer than k neighbors of a non-zero similarity are
+    # equally (not) similar to all other words, and get the first words
+    k = nearest.shape[1]
+    for i in np.flatnonzero((nearest < 0).any(axis=1)):
+        found = nearest[i][nearest[i] >= 0]
+        exclude = set(found.tolist()) | {words[i]}
+        nearest[i, len(found):] = [j for j in range(len(exclude) + k)
+                                   if j not in exclude][: k - len(found)]
+    return nearest
+
+
+def _exact_neighbors(matrix, words, k, similarity, block_size=None,
+                     n_jobs=1, progress=None):
+    # the k most similar words (other than themselves) of the given words,
+    # from the sparse dot products with all words in blocks of rows,
+    # which are independent of each other and run in n_jobs threads
+    n_words = matrix.shape[0]
+    norms = _row_norms(matrix, similarity)
+    transposed = matrix.T.tocsr()
+    nearest = np.empty((len(words), k), dtype=np.intp)
+    if block_size is None:
+        # at most about 8 MB worth of dot products per block
+        block_size = max(1, 2 ** 20 // max(n_words, 1))
+
+    def search(start):
+        block = words[start: start + block_size]
+        dot_products = matrix[block].dot(transposed)
+
+        if dot_products.nnz * 8 > len(block) * n_words:
+            # dense enough for the top k of the full rows
+            similarities = _similarities(dot_products.toarray(),
+                                         norms[block][:, np.newaxis],
+                                         norms[np.newaxis, :], similarity)
+            similarities[np.arange(len(block)), block] = -np.inf
+            nearest[start: start + len(block)] = _top_k(similarities, k)
+            return
+
+        dot_products = dot_products.tocoo()
+        rows = dot_products.row
+        cols = dot_products.col
+        not_self = cols != block[rows]
+        rows = rows[not_self]
+        cols = cols[not_self]
+        similarities = _similarities(dot_products.data[not_self],
+                                     norms[block][rows], norms[cols],
+                                     similarity)
+        nearest[start: start + len(block)] = _rank_pairs(
+            len(block), rows, cols, similarities, k)
+
+    starts = range(0, len(words), block_size)
+    if n_jobs == 1:
+        for start in starts:
+            checkpoint(progress, start / len(words))
+            search(start)
+    else:
+        with ThreadPoolExecutor(n_jobs) as executor:
+            futures = [executor.submit(search, start) for start in starts]
+            try:
+                # the progress is reported from this thread only, by the
+                # number of blocks done, so that it never moves backwards
+                for n_done, future in enumerate(as_completed(futures), 1):
+                    future.result()  # for any exceptions from the threads
+                    checkpoint(progress, n_done / len(futures))
+            except BaseException:
+                # e.g. when cancelled, the blocks not started are dropped
+                for future in futures:
+                    future.cancel()
+                raise
+
+    return _pad_neighbors(nearest, words)
+
+
+def compute_cosine_neighbors(context_array, n_neighbors, block_size=None,
+                             n_jobs=None, progress=None):
+    """
+    Compute the nearest neighbors of the words by the cosine similarity of
+    their rows of *context_array*, without the eigenvectors.
+
+    The similarities are computed as the sparse dot products of a block of
+    rows with all rows, and only the top *n_neighbors* of each row are kept,
+    so that the full n-by-n similarity matrix is never built.
+
+    :param context_array: the word-by-context matrix
+    :param n_neighbors: number of neighbors per word
+    :param block_size: number of rows per block; by default, a dense block
+        of similarities takes about 8 MB
+    :param n_jobs: number of threads for the blocks;
+        defaults to the number of CPUs
+    :param progress: a ``linguistica.util.Progress``, updated by the blocks
+    :return: same as ``compute_nearest_neighbors()``
+    """
+    matrix = sparse.csr_matrix(context_array, dtype=np.float64)
+    n_words = matrix.shape[0]
+    k = min(n_neighbors, n_words - 1)
+    if k <= 0:
+        return np.arange(n_words).reshape(n_words, 1)
+    if n_jobs is None:
+        n_jobs = os.cpu_count() or 1
+
+    nearest = _exact_neighbors(matrix, np.arange(n_words), k, 'cosine',
+                               block_size, n_jobs, progress)
+    return np.column_stack((np.arange(n_words), nearest))
+
+
+def compute_minhash_neighbors(context_array, n_neighbors, n_hashes=64,
+                              n_bands=16, max_bucket_size=100,
+                              similarity='jaccard', random_state=0,
+                              progress=None):
+    """
+    Compute the nearest neighbors of the words by the similarity of their
+    context sets, without the eigenvectors: MinHash and locality-sensitive
+    hashing give the candidate pairs of words, which are then ranked by
+    their exact similarity. Words with fewer than *n_neighbors* candidates
+    (typically rare words with few contexts) get their neighbors by the
+    exact similarity against the words that share contexts with them.
+
+    :param context_array: the word-by-context matrix
+    :param n_neighbors: number of neighbors per word
+    :param n_hashes: number of MinHash functions
+    :param n_bands: number of LSH bands, see ``lsh_candidate_pairs()``
+    :param max_bucket_size: see ``lsh_candidate_pairs()``
+    :param similarity: ``'jaccard'`` (of the context sets) or ``'cosine'``
+        (of the rows of *context_array*)
+    :param random_state: seed for the hash functions
+    :param progress: a ``linguistica.util.Progress``, updated by the chunks
+        of candidate pairs
+    :return: same as ``compute_nearest_neighbors()``
+    """
+    matrix = sparse.csr_matrix(context_array, dtype=np.float64)
+    if similarity == 'jaccard':
+        matrix.data[:] = 1
+    n_words = matrix.shape[0]
+    k = min(n_neighbors, n_words - 1)
+    if k <= 0:
+        return np.arange(n_words).reshape(n_words, 1)
+
+    signatures = minhash_signatures(matrix, n_hashes, random_state)
+    left, right = lsh_candidate_pairs(signatures, n_bands, max_bucket_size)
+    del signatures
+
+    # the exact similarities of the candidate pairs
+    norms = _row_norms(matrix, similarity)
+    pair_similarities = np.empty(len(left))
+    chunk_size = 2 ** 16
+    for start in track(range(0, len(left), chunk_size),
+                       stage(progress, 0, 0.8), every=1):
+        chunk_left = left[start: start + chunk_size]
+        chunk_right = right[start: start + chunk_size]
+        dot_products = np.asarray(matrix[chunk_left].multiply(
+            matrix[chunk_right]).sum(axis=1)).ravel()
+        pair_similarities[start: start + chunk_size] = _similarities(
+            dot_products, norms[chunk_left], norms[chunk_right], similarity)
+
+    # each pair counts for both words; rank the candidates of each word
+    nearest = _rank_pairs(n_words, np.concatenate((left, right)),
+                          np.concatenate((right, left)),
+                          np.concatenate((pair_similarities,
+                                          pair_similarities)), k)
+
+    missing = np.flatnonzero((nearest < 0).any(axis=1))
+    if len(missing):
+        nearest[missing] = _exact_neighbors(matrix, missing, k, similarity,
+                                            progress=stage(progress, 0.8, 1))
+
+    return np.column_stack((np.arange(n_words), nearest))
+
+
+def neighbor_overlap(words_to_neighbors1, words_to_neighbors2):
+    """
+    Return the average proportion of shared neighbors of the words
+    in both *words_to_neighbors1* and *words_to_neighbors2*, e.g., for
+    comparing the neighbors from two methods.
+    """
+    overlaps = [len(set(neighbors) & set(words_to_neighbors2[word])) /
+                max(len(neighbors), 1)
+                for word, neighbors in words_to_neighbors1.items()
+                if word in words_to_neighbors2]
+    return sum(overlaps) / len(overlaps) if overlaps else 0.0
+
+
 def compute_graph(words_to_neighbors):
+    import networkx as nx
     graph = nx.Graph()
     for word in words_to_neighbors.keys():
         neighbors = words_to_neighbors[word]
@@ -181,63 +1148,670 @@ def compute_graph(words_to_neighbors):
     return graph
 
 
+class NeighborGraph(object):
+    """
+    The syntactic word neighborhood graph as a symmetric sparse adjacency
+    matrix plus the word table, without NetworkX.
+
+    :param adjacency: n-by-n symmetric sparse matrix; word *i* and word *j*
+        are neighbors if ``adjacency[i, j]`` is non-zero
+    :param words: the n words, one for each row of *adjacency*
+    """
+
+    def __init__(self, adjacency, words):
+        self.adjacency = sparse.csr_matrix(adjacency)
+        self.words = list(words)
+        self._word_to_index = None
+
+    def index(self, word):
+        if self._word_to_index is None:
+            self._word_to_index = {w: i for i, w in enumerate(self.words)}
+        return self._word_to_index[word]
+
+    def __contains__(self, word):
+        try:
+            self.index(word)
+        except KeyError:
+            return False
+        return True
+
+    def __len__(self):
+        return len(self.words)
+
+    def number_of_edges(self):
+        return (self.adjacency.nnz + self.adjacency.diagonal().astype(
+            bool).sum()) // 2
+
+    def neighbors(self, word):
+        """
+        Return the neighbors of *word* in the graph, i.e., its own nearest
+        neighbors plus the words that have *word* as a nearest neighbor.
+        """
+        i = self.index(word)
+        start, end = self.adjacency.indptr[i: i + 2]
+        return [self.words[j] for j in self.adjacency.indices[start: end]]
+
+    def edges(self):
+        """
+        Iterate over the edges as pairs of words, each edge once.
+        """
+        upper = sparse.triu(self.adjacency).tocoo()
+        for i, j in zip(upper.row, upper.col):
+            yield self.words[i], self.words[j]
+
+    def connected_components(self):
+        """
+        Return the connected components as sets of words,
+        from the largest to the smallest.
+        """
+        _, labels = csgraph.connected_components(self.adjacency,
+                                                 directed=False)
+        return group_by_label(labels, self.words)
+
+    def to_networkx(self):
+        """
+        Return the graph as a ``networkx.Graph``.
+        """
+        import networkx as nx
+        graph = nx.Graph()
+        graph.add_nodes_from(self.words)
+        graph.add_edges_from(self.edges())
+        return graph
+
+    def write_edgelist(self, path):
+        """
+        Write the edges to *path*, one edge (two words
+        separated by a space) per line.
+        """
+        with open(path, 'w', encoding='utf8') as f:
+            for word1, word2 in self.edges():
+                print(word1, word2, file=f)
+
+    def write_graphml(self, path):
+        """
+        Write the graph to *path* in the GraphML format, with the words
+        as the node IDs.
+        """
+        with open(path, 'w', encoding='utf8') as f:
+            print('<?xml version="1.0" encoding="UTF-8"?>', file=f)
+            print('<graphml xmlns="http://graphml.graphdrawing.org/xmlns">',
+                  file=f)
+            print('  <graph edgedefault="undirected">', file=f)
+            for word in self.words:
+                print('    <node id={} />'.format(quoteattr(word)), file=f)
+            for word1, word2 in self.edges():
+                print('    <edge source={} target={} />'.format(
+                    quoteattr(word1), quoteattr(word2)), file=f)
+            print('  </graph>', file=f)
+            print('</graphml>', file=f)
+
+    def write_matrix_market(self, path):
+        """
+        Write the adjacency matrix to *path* in the Matrix Market format;
+        the rows and columns follow the order of the word table.
+        """
+        io.mmwrite(path, self.adjacency, symmetry='symmetric')
+
+
+def compute_neighbor_graph(nearest_neighbors, words):
+    """
+    Build the neighbor graph from the nearest neighbors, with an edge between
+    each word and each of its neighbors.
+
+    :param nearest_neighbors: array from ``compute_nearest_neighbors()``
+    :param words: the words, one for each row of *nearest_neighbors*
+    :rtype: NeighborGraph
+    """
+    n_words, k = nearest_neighbors.shape
+    rows = np.repeat(np.arange(n_words), k - 1)
+    cols = nearest_neighbors[:, 1:].ravel()
+    return NeighborGraph(_symmetric_adjacency(rows, cols, n_words), words)
+
+
+def neighbor_graph_from_dict(words_to_neighbors, words):
+    """
+    Build the neighbor graph from a dict of words to their nearest neighbors,
+    such as the one stored by ``Lexicon.to_sqlite()``.
+
+    :param words_to_neighbors: dict of words to lists of neighbors
+    :param words: the words of the graph, each a key of *words_to_neighbors*
+    :rtype: NeighborGraph
+    """
+    word_to_index = {word: i for i, word in enumerate(words)}
+    rows = list()
+    cols = list()
+    for word, neighbors in words_to_neighbors.items():
+        i = word_to_index[word]
+        for neighbor in neighbors:
+            rows.append(i)
+            cols.append(word_to_index[neighbor])
+    return NeighborGraph(_symmetric_adjacency(rows, cols, len(words)), words)
+
+
+def _symmetric_adjacency(rows, cols, n):
+    adjacency = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.int8), (rows, cols)), shape=(n, n))
+    adjacency = adjacency + adjacency.T
+    adjacency.data[:] = 1
+    return adjacency
+
+
+class WordIndex(object):
+    """
+    Spatial index over the word coordinates (the eigenvectors) for
+    nearest neighbor queries after ``run()``.
+
+    :param coordinates: n-by-d array, one row per word
+    :param words: the n words, one for each row of *coordinates*
+    """
+
+    def __init__(self, coordinates, words):
+        self.coordinates = np.asarray(coordinates, dtype=np.float64)
+        self.words = list(words)
+        self._word_to_index = {word: i for i, word in enumerate(self.words)}
+        self._squared_norms = np.einsum('ij,ij->i', self.coordinates,
+                                        self.coordinates)
+
+        if self.coordinates.shape[1] <= KDTREE_MAX_DIMENSIONS:
+            self._tree = spatial.cKDTree(self.coordinates)
+        else:
+            self._tree = None
+
+    def _search(self, vectors, k, candidates=None):
+        # indices of the k nearest rows (among the candidate rows, if given)
+        # of each of the m vectors, as an m-by-k array
+        m = vectors.shape[0]
+
+        if candidates is None and self._tree is not None:
+            k = min(k, len(self.words))
+            if not k:
+                return np.empty((m, 0), dtype=np.intp)
+            _, indices = self._tree.query(vectors, k=k)
+            return indices.reshape(m, k)
+
+        if candidates is None:
+            candidates = np.arange(len(self.words))
+        k = min(k, len(candidates))
+        candidate_coordinates = self.coordinates[candidates]
+        candidate_norms = self._squared_norms[candidates]
+        result = np.empty((m, k), dtype=np.intp)
+
+        # about 8 MB worth of distances per block of vectors
+        block_size = max(1, 2 ** 20 // max(len(candidates), 1))
+        for start in range(0, m, block_size):
+            block = vectors[start: start + block_size]
+            # squared distances, up to the squared norms of the vectors
+            distances = candidate_norms[np.newaxis, :] - \
+                2 * block.dot(candidate_coordinates.T)
+
+            if k < len(candidates):
+                nearest = np.argpartition(distances, k - 1, axis=1)[:, :k]
+            else:
+                nearest = np.tile(np.arange(len(candidates)),
+                                  (len(block), 1))
+            rows = np.arange(len(block))[:, np.newaxis]
+            order = np.argsort(distances[rows, nearest], axis=1,
+                               kind='mergesort')
+            result[start: start + len(block)] = \
+                candidates[nearest[rows, order]]
+
+        return result
+
+    def nearest(self, query, k, subset=None):
+        """
+        Return the *k* nearest words of *query*, from the nearest
+        to the farthest.
+
+        :param query: a word (which is not among its own nearest words)
+            or a vector of coordinates
+        :param k: number of nearest words
+        :param subset: if given, only these words are considered;
+            words without coordinates are ignored
+        :rtype: list(str)
+        """
+        if isinstance(query, str):
+            exclude = self._word_to_index[query]
+            vector = self.coordinates[exclude]
+        else:
+            exclude = None
+            vector = np.asarray(query, dtype=np.float64)
+
+        if subset is not None:
+            candidates = np.array([self._word_to_index[word]
+                                   for word in subset
+                                   if word in self._word_to_index],
+                                  dtype=np.intp)
+            candidates = candidates[candidates != exclude]
+            indices = self._search(vector[np.newaxis], k, candidates)[0]
+        else:
+            indices = self._search(vector[np.newaxis],
+                                   k + (exclude is not None))[0]
+            indices = [i for i in indices if i != exclude][: k]
+
+        return [self.words[i] for i in indices]
+
+    def nearest_batch(self, words, k):
+        """
+        Return a dict of each of *words* to its *k* nearest words.
+        """
+        words = list(words)
+        word_indices = np.array([self._word_to_index[word] for word in words],
+                                dtype=np.intp)
+        nearest = self._search(self.coordinates[word_indices], k + 1)
+
+        result = dict()
+        for word, i, indices in zip(words, word_indices, nearest):
+            result[word] = [self.words[j] for j in indices if j != i][: k]
+        return result
+
+
+def _closest_centers(points, centers, block_size=None):
+    # the index of the closest center of each point, in blocks of points
+    labels = np.empty(len(points), dtype=np.intp)
+    center_norms = np.einsum('ij,ij->i', centers, centers)
+    if block_size is None:
+        # about 8 MB worth of distances per block
+        block_size = max(1, 2 ** 20 // max(len(centers), 1))
+
+    for start in range(0, len(points), block_size):
+        block = points[start: start + block_size]
+        # squared distances, up to the squared norms of the points
+        distances = center_norms[np.newaxis, :] - 2 * block.dot(centers.T)
+        labels[start: start + block_size] = distances.argmin(axis=1)
+
+    return labels
+
+
+def minibatch_kmeans(coordinates, n_clusters, batch_size=1024, n_iter=100,
+                     random_state=0):
+    """
+    Cluster the rows of *coordinates* by mini-batch k-means, i.e., each
+    iteration moves the centers towards the points of a random batch,
+    with the k-means++ initialization.
+
+    :param coordinates: n-by-d array, one row per word
+    :param n_clusters: number of clusters
+    :param batch_size: number of points per iteration
+    :param n_iter: number of iterations
+    :param random_state: seed for the initialization and the batches
+    :return: the cluster labels (an array of n integers), and the centers
+        as the rows of an array
+    """
+    points = np.asarray(coordinates, dtype=np.float64)
+    n_points = len(points)
+    k = min(n_clusters, n_points)
+    random = np.random.RandomState(random_state)
+
+    # k-means++: each new center is a point drawn with a probability
+    # proportional to its squared distance to the closest center so far
+    centers = np.empty((k, points.shape[1]))
+    centers[0] = points[random.randint(n_points)]
+    distances = np.square(points - centers[0]).sum(axis=1)
+    for i in range(1, k):
+        total = distances.sum()
+        if total > 0:
+            centers[i] = points[random.choice(n_points, p=distances / total)]
+        else:
+            centers[i] = points[random.randint(n_points)]
+        distances = np.minimum(distances,
+                               np.square(points - centers[i]).sum(axis=1))
+
+    # each center moves to the running mean of the points assigned to it
+    counts = np.zeros(k)
+    for _ in range(n_iter):
+        batch = points[random.randint(0, n_points, min(batch_size,
+                                                         n_points))]
+        labels = _closest_centers(batch, centers)
+        batch_counts = np.bincount(labels, minlength=k)
+        sums = np.zeros_like(centers)
+        np.add.at(sums, labels, batch)
+
+        counts += batch_counts
+        updated = batch_counts > 0
+        centers[updated] += (sums[updated] -
+                             batch_counts[updated, np.newaxis] *
+                             centers[updated]) / counts[updated, np.newaxis]
+
+    return _closest_centers(points, centers), centers
+
+
+def label_propagation(adjacency, max_iter=100, random_state=0):
+    """
+    Find the communities of a graph by label propagation: each node starts
+    with its own label and repeatedly takes the most frequent label among
+    its neighbors (ties are broken at random), until each node has one of
+    the most frequent labels among its neighbors.
+    In each iteration, a random half of the nodes is updated, which keeps
+    the labels from oscillating.
+
+    :param adjacency: n-by-n symmetric sparse adjacency matrix
+    :param max_iter: maximum number of iterations
+    :param random_state: seed for the tie breaking and the updates
+    :return: the community labels, an array of n integers
+    """
+    adjacency = sparse.csr_matrix(adjacency)
+    n_nodes = adjacency.shape[0]
+    random = np.random.RandomState(random_state)
+
+    graph = adjacency.tocoo()
+    not_loop = graph.row != graph.col
+    rows = graph.row[not_loop].astype(np.int64)
+    cols = graph.col[not_loop]
+    labels = np.arange(n_nodes)
+
+    for _ in range(max_iter):
+        # the number of times each label occurs among the neighbors of
+        # each node (nodes without neighbors do not occur)
+        node_labels, label_counts = np.unique(rows * n_nodes + labels[cols],
+                                              return_counts=True)
+        nodes = node_labels // n_nodes
+        node_labels = node_labels % n_nodes
+        if not len(nodes):
+            break
+
+        # done if the label of each node is (one of) the most frequent
+        starts = np.flatnonzero(np.concatenate(([True],
+                                                nodes[1:] != nodes[:-1])))
+        max_counts = np.zeros(n_nodes, dtype=np.int64)
+        max_counts[nodes[starts]] = np.maximum.reduceat(label_counts, starts)
+        current = node_labels == labels[nodes]
+        current_counts = np.zeros(n_nodes, dtype=np.int64)
+        current_counts[nodes[current]] = label_counts[current]
+        if (current_counts == max_counts).all():
+            break
+
+        # otherwise, the most frequent label of each node, with ties
+        # broken at random by the fractional parts of the scores
+        scores = label_counts + 0.5 * random.random_sample(len(nodes))
+        max_scores = np.maximum.reduceat(scores, starts)
+        best = scores == np.repeat(max_scores, np.diff(np.append(
+            starts, len(nodes))))
+        best_labels = labels.copy()
+        best_labels[nodes[best]] = node_labels[best]
+
+        update = random.random_sample(n_nodes) < 0.5
+        labels = np.where(update, best_labels, labels)
+
+    return labels
+
+
+def group_by_label(labels, words):
+    """
+    Return the groups of *words* with the same labels as sets of words,
+    from the largest group to the smallest.
+    """
+    groups = defaultdict(set)
+    for word, label in zip(words, labels):
+        groups[label].add(word)
+    return sorted(groups.values(), key=len, reverse=True)
+
+
+def compute_laplacian_matrix(context_array, use_sparse=True,
+                             dtype=np.float64):
+    """
+    Compute the normalized graph Laplacian of the words
+    from the word-by-context array.
+
+    :param context_array: the word-by-context matrix, see
+        ``get_context_array()``
+    :param use_sparse: whether all n-by-n matrices are kept sparse;
+        defaults to True
+    :param dtype: data type of the Laplacian; ``numpy.float32`` halves
+        its memory use
+    """
+    n_words = context_array.shape[0]
+
+    if use_sparse:
+        # everything up to the eigenvectors stays as n-by-n sparse matrices
+
+        # computing shared context master matrix
+        shared_context_matrix = compute_shared_context_matrix(context_array)
+
+        # computing diameter
+        diameter = normalize_sparse(shared_context_matrix)
+
+        # computing incidence graph
+        incidence_graph = compute_incidence_graph_sparse(
+            diameter, shared_context_matrix)
+        del shared_context_matrix
+
+        # computing laplacian matrix
+        return compute_laplacian_sparse(diameter, incidence_graph, dtype)
+    else:
+        # computing shared context master matrix
+        shared_context_matrix = context_array.dot(context_array.T).todense()
+
+        # computing diameter
+        diameter = normalize(n_words, shared_context_matrix)
+
+        # computing incidence graph
+        incidence_graph = compute_incidence_graph(n_words, diameter,
+                                                  shared_context_matrix)
+        del shared_context_matrix
+
+        # computing laplacian matrix
+        laplacian = compute_laplacian(diameter, incidence_graph)
+        return np.asarray(laplacian, dtype=dtype)
+
+
+def choose_stages(context_array, n_eigenvectors, max_memory,
+                  dtype=np.float32, embedding_method='exact'):
+    """
+    Choose between the dense and the sparse Laplacian, and between the exact
+    and the approximate eigenvectors, so that the manifold computation stays
+    within *max_memory* megabytes as far as possible.
+
+    The number of non-zero entries of the shared context matrix is estimated
+    by its upper bound, the sum of the squared column counts
+    of *context_array*. The dense Laplacian never takes less memory than
+    the sparse one, but it is faster for a (nearly) full shared context
+    matrix; it is chosen only if it fits and the estimated density is at
+    least ``DENSE_MIN_DENSITY``. The exact eigenvectors are
+    replaced by the randomized approximation if the Lanczos vectors do not
+    fit; an approximate *embedding_method* is always kept.
+
+    :param context_array: the word-by-context matrix, see
+        ``get_context_array()``
+    :param n_eigenvectors: number of eigenvectors to compute
+    :param max_memory: memory budget in megabytes
+    :param dtype: data type of the Laplacian and the eigenvectors
+    :param embedding_method: the requested embedding method
+    :return: *use_sparse* and *embedding_method* for ``run()``
+    """
+    budget = max_memory * 2 ** 20
+    itemsize = np.dtype(dtype).itemsize
+    n_words = context_array.shape[0]
+
+    column_counts = np.bincount(sparse.csr_matrix(context_array).indices,
+                                minlength=context_array.shape[1])
+    nnz = min(float(np.square(column_counts, dtype=np.float64).sum()),
+              float(n_words) ** 2)
+
+    # the shared context matrix, the incidence graph, and the Laplacian
+    # exist at the same time (with 4-byte indices in the sparse format);
+    # the dense path also has two n-by-n float64 matrices of diameters
+    sparse_bytes = 3 * nnz * (itemsize + 4)
+    dense_bytes = float(n_words) ** 2 * (3 * 8 + 2 * 8)
+    use_sparse = not (dense_bytes <= budget and
+                      nnz >= DENSE_MIN_DENSITY * float(n_words) ** 2)
+    laplacian_bytes = sparse_bytes if use_sparse else dense_bytes
+
+    if embedding_method == 'exact':
+        # eigsh keeps max(2k + 1, 20) Lanczos vectors
+        n_vectors = max(2 * n_eigenvectors + 1, 20)
+        if laplacian_bytes + n_words * n_vectors * itemsize > budget:
+            embedding_method = 'randomized'
+
+    return use_sparse, embedding_method
+
+
+def _cached(cache, stage, key, compute):
+    """
+    Return the result of *compute()* for *stage*, from *cache* if it has
+    the result for the same *key* (the parameters that the stage depends on).
+    Only the latest result of each stage is kept.
+    """
+    if cache is not None and stage in cache and cache[stage][0] == key:
+        return cache[stage][1]
+
+    result = compute()
+    if cache is not None:
+        cache[stage] = (key, result)
+    return result
+
+
 def run(unigram_counter=None, bigram_counter=None, trigram_counter=None,
         max_word_types=1000, n_neighbors=9, n_eigenvectors=11,
-        min_context_count=3):
+        min_context_count=3, use_sparse=True, eigen_solver='eigsh',
+        eigen_tol=0, initial_vectors=None, knn_method='auto',
+        embedding_method='exact', cache=None, max_memory=0, dtype=None,
+        sentences=None, neighbor_method='spectral', n_jobs=None,
+        progress=None, input_version=None):
+    """
+    Compute the syntactic word neighbors.
 
-    word_freq_pairs = double_sorted(unigram_counter.items(),
-                                    key=lambda x: x[1], reverse=True)
+    The *neighbor_method* is either ``'spectral'`` (the nearest neighbors
+    in the space of the eigenvectors of the word Laplacian),
+    ``'minhash'`` (see ``compute_minhash_neighbors()``), or ``'cosine'``
+    (see ``compute_cosine_neighbors()``, which runs in *n_jobs* threads).
+    The latter two do not compute the eigenvectors, and ``None`` is returned
+    for the eigenvalues and the eigenvectors.
 
-    if len(word_freq_pairs) > max_word_types:
-        wordlist = [word for word, _ in word_freq_pairs[: max_word_types]]
-    else:
-        wordlist = [word for word, _ in word_freq_pairs]
+    If *sentences* (a function that returns an iterable of lists of words,
+    such as ``linguistica.ngram.tokenize()`` over the corpus) is given,
+    the contexts are counted from the sentences by ``count_contexts()``,
+    and *bigram_counter* and *trigram_counter* are not needed.
+
+    If *max_memory* (in megabytes) is positive, the context array uses int32
+    counts, the Laplacian and the eigenvectors use float32 values, and
+    *use_sparse* and *embedding_method* are chosen by ``choose_stages()``
+    to fit the memory budget. *dtype* overrides float32 (or float64 if
+    there is no memory budget).
+
+    If *cache* is a dict, the intermediate results (the context array,
+    the Laplacian, and the eigenvectors) are kept in it, keyed by the
+    parameters they depend on. Calling ``run()`` again with the same
+    ngram counters and the same *cache* re-runs only the stages whose
+    parameters have changed; for instance, a new *n_neighbors* value only
+    re-computes the nearest neighbors, and a smaller *n_eigenvectors* value
+    re-uses the eigenvectors already computed. The counters themselves are
+    not compared: *input_version* is part of every key, and a caller that
+    changes the counts (or the sentences) must pass a new value for it.
 
-    n_words = len(wordlist)
+    If *progress* (a ``linguistica.util.Progress``) is given, it is updated
+    between the stages and within the loops over the sentences and over the
+    blocks of words, and ``linguistica.util.Cancelled`` is raised there once
+    it is cancelled. The eigensolvers have no checkpoints of their own.
+    """
+    def make_wordlist():
+        word_freq_pairs = double_sorted(unigram_counter.items(),
+                                        key=lambda x: x[1], reverse=True)
+        return [word for word, _ in word_freq_pairs]
+
+    wordlist = _cached(cache, 'wordlist', input_version, make_wordlist)
+    n_words = min(len(wordlist), max_word_types)
+
+    if dtype is None:
+        dtype = np.float32 if max_memory else np.float64
+    dtype = np.dtype(dtype)
+    count_dtype = np.int32 if dtype.itemsize < 8 else np.int64
 
     # computing the context array
-    # also words_to_contexts and contexts_to_words dicts
-    context_array, words_to_contexts, contexts_to_words = get_array(
-        wordlist, bigram_counter, trigram_counter, min_context_count)
+    # also words_to_contexts and contexts_to_words
+    context_key = (input_version, n_words, min_context_count, count_dtype)
+    context_array, words_to_contexts, contexts_to_words = _cached(
+        cache, 'context_array', context_key,
+        lambda: get_context_array(
+            wordlist, n_words, bigram_counter, trigram_counter,
+            min_context_count, count_dtype,
+            track(sentences(), stage(progress, 0, 0.3))
+            if sentences is not None else None))
+
+    if neighbor_method == 'minhash':
+        nearest_neighbors = _cached(
+            cache, 'neighbors', context_key + (neighbor_method, n_neighbors),
+            lambda: compute_minhash_neighbors(
+                context_array, n_neighbors,
+                progress=stage(progress, 0.3, 0.95)))
+        eigenvalues, eigenvectors = None, None
+
+    elif neighbor_method == 'cosine':
+        nearest_neighbors = _cached(
+            cache, 'neighbors', context_key + (neighbor_method, n_neighbors),
+            lambda: compute_cosine_neighbors(
+                context_array, n_neighbors, n_jobs=n_jobs,
+                progress=stage(progress, 0.3, 0.95)))
+        eigenvalues, eigenvectors = None, None
+
+    elif neighbor_method == 'spectral':
+        if max_memory:
+            use_sparse, embedding_method = choose_stages(
+                context_array, n_eigenvectors, max_memory, dtype,
+                embedding_method)
 
-    # computing shared context master matrix
-    shared_context_matrix = context_array.dot(context_array.T).todense()
-    del context_array
+        # computing laplacian matrix
+        checkpoint(progress, 0.3)
+        laplacian_key = context_key + (use_sparse, dtype)
+        laplacian_matrix = _cached(
+            cache, 'laplacian', laplacian_key,
+            lambda: compute_laplacian_matrix(context_array, use_sparse, dtype))
 
-    # computing diameter
-    diameter = normalize(n_words, shared_context_matrix)
+        # computing eigenvectors and eigenvalues
+        eigen_key = laplacian_key + (embedding_method, eigen_solver, eigen_tol)
+        if cache is not None and 'eigenvectors' in cache:
+            cached_key, (eigenvalues, eigenvectors) = cache['eigenvectors']
+        else:
+            cached_key, eigenvalues, eigenvectors = None, None, None
 
-    # computing incidence graph
-    incidence_graph = compute_incidence_graph(n_words, diameter,
-                                              shared_context_matrix)
-    del shared_context_matrix
+        checkpoint(progress, 0.4)
+        if cached_key != eigen_key or \
+                eigenvectors.shape[1] < min(n_eigenvectors, n_words):
+            # (if the eigenvectors of a previous run are available,
+            # they are used as a warm start)
+            if cached_key is not None and eigenvectors.shape[0] == n_words:
+                initial_vectors = eigenvectors
+            if initial_vectors is not None and \
+                    initial_vectors.shape[0] != n_words:
+                initial_vectors = None
 
-    # computing laplacian matrix
-    laplacian_matrix = compute_laplacian(diameter, incidence_graph)
-    del diameter
-    del incidence_graph
+            if embedding_method == 'exact':
+                eigenvalues, eigenvectors = compute_eigenvectors(
+                    laplacian_matrix, n_eigenvectors, tol=eigen_tol,
+                    solver=eigen_solver, initial_vectors=initial_vectors)
+            else:
+                eigenvalues, eigenvectors = compute_approximate_eigenvectors(
+                    laplacian_matrix, n_eigenvectors, method=embedding_method)
 
-    # computing eigenvectors and eigenvalues
-    eigenvalues, eigenvectors = compute_eigenvectors(laplacian_matrix)
-    del laplacian_matrix
+            if cache is not None:
+                cache['eigenvectors'] = (eigen_key,
+                                         (eigenvalues, eigenvectors))
 
-    # computing distances between words
-    # take first N columns of eigenvector matrix
-    coordinates = eigenvectors[:, : n_eigenvectors]
-    word_distances = compute_words_distance(coordinates)
-    del coordinates
-    del eigenvalues
+        del laplacian_matrix
 
-    # computing nearest neighbors now
-    nearest_neighbors = compute_closest_neighbors(word_distances, n_neighbors)
+        # the N eigenvectors (of the largest N eigenvalues) are
+        # the coordinates of the words
+        eigenvalues = eigenvalues[: n_eigenvectors]
+        eigenvectors = eigenvectors[:, : n_eigenvectors]
+
+        # computing nearest neighbors now
+        nearest_neighbors = compute_nearest_neighbors(
+            eigenvectors, n_neighbors, method=knn_method,
+            progress=stage(progress, 0.8, 0.95))
+
+    else:
+        raise ValueError('unknown neighbor method -- ' + str(neighbor_method))
 
     words_to_neighbors = dict()
 
-    for i in range(len(wordlist)):
+    for i in track(range(n_words), stage(progress, 0.95, 1)):
         line = nearest_neighbors[i]
         word_idx, neighbors_idx = line[0], line[1:]
         word = wordlist[word_idx]
         neighbors = [wordlist[idx] for idx in neighbors_idx]
         words_to_neighbors[word] = neighbors
 
-    return words_to_neighbors, words_to_contexts, contexts_to_words
+    neighbor_graph = compute_neighbor_graph(nearest_neighbors,
+                                            wordlist[: n_words])
+
+    return words_to_neighbors, words_to_contexts, contexts_to_words, \
+        eigenvalues, eigenvectors, neighbor_graph
@@ -1,22 +1,53 @@
 # -*- encoding: utf8 -*-
 
-from collections import Counter
+import os
+from array import array
 
-from linguistica.util import fix_punctuations
+import numpy as np
 
+from linguistica.util import (fix_punctuations, unique_rows)
 
-def run(corpus_file_object=None, keep_case=False, max_word_tokens=0):
+# number of lines between the checkpoints of a Progress
+CHECKPOINT_LINES = 1000
 
-    unigrams_counter = Counter()
-    bigrams_counter = Counter()
-    trigrams_counter = Counter()
 
+def _remaining_size(corpus_file_object):
+    # the size (in bytes, for a file on disk) of the rest of the corpus,
+    # or None if unknown
+    try:
+        position = corpus_file_object.tell()
+        if hasattr(corpus_file_object, 'getvalue'):
+            return len(corpus_file_object.getvalue()) - position
+        return os.fstat(corpus_file_object.fileno()).st_size - position
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def tokenize(corpus_file_object=None, keep_case=False, max_word_tokens=0,
+             progress=None):
+    """
+    Yield the word tokens of each non-empty line of *corpus_file_object*
+    as a list of words, stopping after *max_word_tokens* word tokens
+    (at the end of a line).
+
+    :param progress: a ``linguistica.util.Progress``, updated by the
+        characters read over the size of the corpus
+    """
     current_word_token_count = 0
+    size = None
+    if progress is not None:
+        size = _remaining_size(corpus_file_object)
+    n_characters = 0
 
-    for line in corpus_file_object:
+    for line_number, line in enumerate(corpus_file_object):
         if max_word_tokens and current_word_token_count > max_word_tokens:
             break
 
+        if progress is not None:
+            n_characters += len(line)
+            if not line_number % CHECKPOINT_LINES:
+                progress.update(n_characters / size if size else None)
+
         line = fix_punctuations(line).strip()
 
         if not keep_case:
@@ -27,13 +58,81 @@ def run(corpus_file_object=None, keep_case=False, max_word_tokens=0):
             continue
 
         current_word_token_count += len(words)
+        yield words
+
+
+def encode(corpus_file_object=None, keep_case=False, max_word_tokens=0,
+           progress=None):
+    """
+    Read the corpus in one pass of ``tokenize()`` into the word types, in
+    the order of their first occurrence, and the word tokens as an array of
+    indices into the word types, with -1 at the end of each line.
+
+    :rtype: tuple(list(str), numpy.ndarray)
+    """
+    word_to_index = dict()
+    codes = array('q')
+
+    for words in tokenize(corpus_file_object, keep_case, max_word_tokens,
+                          progress):
+        codes.extend([word_to_index.setdefault(word, len(word_to_index))
+                      for word in words])
+        codes.append(-1)
+
+    return list(word_to_index), np.array(codes, dtype=np.int64)
+
+
+def decode(word_types, codes):
+    """
+    Yield the lines of a corpus from ``encode()`` as lists of words,
+    as ``tokenize()`` does.
+    """
+    start = 0
+    for end in np.flatnonzero(codes == -1).tolist():
+        yield [word_types[i] for i in codes[start: end].tolist()]
+        start = end + 1
+
+
+def count_encoded(word_types, codes, n):
+    """
+    Return a dict of the word ngrams of a corpus from ``encode()`` with
+    their counts, in the order of their first occurrence, as from ``run()``:
+    words for *n* = 1 and tuples of *n* words otherwise.
+    """
+    m = len(codes) - n + 1
+    if m <= 0:
+        return dict()
+    # ngrams do not cross the ends of lines
+    ngrams = np.column_stack([codes[i: i + m] for i in range(n)])
+    ngrams = ngrams[(ngrams >= 0).all(axis=1)]
+
+    vocabulary_size = max(len(word_types), 1)
+    if vocabulary_size ** n < 2 ** 63:
+        # each ngram as a single integer, which is much faster to sort
+        keys = np.zeros(len(ngrams), dtype=np.int64)
+        for i in range(n):
+            keys = keys * vocabulary_size + ngrams[:, i]
+        _, first, counts = np.unique(keys, return_index=True,
+                                     return_counts=True)
+    else:
+        first, _, counts = unique_rows(ngrams)
+    order = np.argsort(first)
+    ngrams = ngrams[first[order]].tolist()
+    counts = counts[order].tolist()
+
+    if n == 1:
+        return {word_types[i]: count for (i,), count in zip(ngrams, counts)}
+    return {tuple([word_types[i] for i in ngram]): count
+            for ngram, count in zip(ngrams, counts)}
+
+
+def run(corpus_file_object=None, keep_case=False, max_word_tokens=0,
+        progress=None):
 
-        unigrams_of_line = words
-        bigrams_of_line = zip(*[words[i:] for i in range(2)])
-        trigrams_of_line = zip(*[words[i:] for i in range(3)])
+    word_types, codes = encode(corpus_file_object, keep_case,
+                               max_word_tokens, progress)
 
-        unigrams_counter.update(unigrams_of_line)
-        bigrams_counter.update(bigrams_of_line)
-        trigrams_counter.update(trigrams_of_line)
+    if progress is not None:
+        progress.update(1.0)
 
-    return dict(unigrams_counter), dict(bigrams_counter), dict(trigrams_counter)
+    return tuple(count_encoded(word_types, codes, n) for n in (1, 2, 3))
@@ -1,7 +1,14 @@
 # -*- encoding: utf8 -*-
 
 
+import os
+import shutil
+import tempfile
+from hashlib import sha1
 from collections import Counter
+from collections.abc import Mapping
+
+import numpy as np
 
 
 def plog(x):
@@ -122,3 +129,847 @@ def make_word_dict(word_unigram_counter, phone_dict, biphone_dict,
                                phone_dict, biphone_dict)
 
     return word_dict
+
+
+def _merge_counts(codes, counts, new_codes, new_counts):
+    """
+    Add the counts of the packed n-grams *new_codes* to those of the sorted
+    packed n-grams *codes*. N-grams whose counts drop to zero are kept, as
+    the positions of the words with zero counts still refer to them.
+
+    :return: the merged n-grams and counts, and the index of each n-gram
+        of *codes* and then *new_codes* among the merged ones
+    """
+    codes, inverse = np.unique(np.concatenate([codes, new_codes]),
+                               return_inverse=True)
+    counts = np.bincount(inverse, weights=np.concatenate([counts, new_counts]),
+                         minlength=len(codes))
+    return codes, counts, inverse
+
+
+def _count_phones(lengths, sequence, weights, n_phones, boundary):
+    """
+    Count the phones and biphones of a stream of phone IDs, as in
+    ``PhonologyTables``, with each word weighted by *weights*.
+
+    :return: the phone counts, the sorted packed biphones with counts, and
+        the index of the biphone at each position
+    """
+    # each position but the last belongs to the word starting at or before
+    # it; the last boundary closes the last word
+    position_weights = np.repeat(weights, lengths)
+    phone_counts = np.bincount(sequence[:-1], weights=position_weights,
+                               minlength=n_phones)
+    phone_counts[boundary] += weights.sum()
+
+    codes, inverse = np.unique(sequence[:-1] * n_phones + sequence[1:],
+                               return_inverse=True)
+    counts = np.bincount(inverse, weights=position_weights,
+                         minlength=len(codes))
+    return (np.rint(phone_counts).astype(np.int64), codes,
+            np.rint(counts).astype(np.int64), inverse)
+
+
+class PhonologyTables:
+    """
+    Array-based phonology of a wordlist.
+
+    All words are laid out as one stream of phone IDs, with a shared word
+    boundary ``#`` between consecutive words: word *i* spans
+    ``sequence[offsets[i]:offsets[i + 1] + 1]``, boundaries included.
+    Phone plogs and biphone MI are computed once per phone and biphone type,
+    and the per-word sums are segment reductions over the stream. Words are
+    also scored by a trigram ``PhonotacticModel``.
+
+    Words can be added and their counts changed with ``update()``.
+    """
+
+    def __init__(self, words, counts, phones, offsets, sequence):
+        """
+        :param words: list of words
+        :param counts: array of word counts, aligned with ``words``
+        :param phones: list of phone spellings, indexed by phone ID
+        :param offsets: array of length ``len(words) + 1`` with the position
+            of each word's initial boundary in ``sequence``
+        :param sequence: array of phone IDs
+        """
+        self.words = list(words)
+        self.word_to_index = {word: i for i, word in enumerate(self.words)}
+        self.counts = np.array(counts, dtype=np.int64)
+        self.phones = list(phones)
+        self.phone_to_id = {phone: i for i, phone in enumerate(self.phones)}
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.sequence = np.asarray(sequence, dtype=np.int64)
+        # the number of phones after the initial boundary, i.e. len(phones) - 1
+        # for the old per-word objects; never zero
+        self.lengths = np.diff(self.offsets)
+
+        # the index of the biphone at each position of the stream
+        self.phone_counts, self.biphone_codes, self.biphone_counts, \
+            self._biphone_index = _count_phones(self.lengths, self.sequence,
+                                                self.counts, len(self.phones),
+                                                self.phone_to_id['#'])
+        self.trigram_model = PhonotacticModel(self, order=3)
+        self._compute_plogs()
+
+    def _compute_plogs(self):
+        sequence = self.sequence
+        n_phones = len(self.phones)
+        self.frequencies = self.counts / self.counts.sum()
+
+        # phones and biphones whose counts have dropped to zero (only in
+        # words with zero counts) give these words an infinite plog
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.phone_plogs = -np.log2(self.phone_counts /
+                                        self.phone_counts.sum())
+            first = self.biphone_codes // n_phones
+            second = self.biphone_codes % n_phones
+            self.biphone_mi = np.where(
+                self.biphone_counts > 0,
+                self.phone_plogs[first] + self.phone_plogs[second] +
+                np.log2(self.biphone_counts / self.biphone_counts.sum()),
+                -np.inf)
+
+        starts = self.offsets[:-1]
+        self.unigram_plog = np.add.reduceat(
+            self.phone_plogs[sequence[1:]], starts)
+        self.bigram_plog = self.unigram_plog - np.add.reduceat(
+            self.biphone_mi[self._biphone_index], starts)
+        self.avg_unigram_plog = self.unigram_plog / self.lengths
+        self.avg_bigram_plog = self.bigram_plog / self.lengths
+
+        self.trigram_plog = self.trigram_model.word_plog
+        self.avg_trigram_plog = self.trigram_plog / self.lengths
+
+    def update(self, word_counts, words_to_phones=None):
+        """
+        Add words and change word counts. Phone, biphone, and n-gram counts
+        are updated by the phones of the affected words only; plogs and MI
+        are then recomputed from the updated counts.
+
+        :param word_counts: dict of words to their new counts
+        :param words_to_phones: dict of new words to lists of phones; if not
+            given, the phones of a new word are its characters
+        """
+        boundary = self.phone_to_id['#']
+        known = [(self.word_to_index[word], count)
+                 for word, count in word_counts.items()
+                 if word in self.word_to_index]
+        new_words = [word for word in word_counts
+                     if word not in self.word_to_index]
+
+        # the words with changed counts, as a stream of their own
+        index = np.array([i for i, _ in known], dtype=np.int64)
+        new_counts = np.array([count for _, count in known], dtype=np.int64)
+        lengths = self.lengths[index]
+        starts = self.offsets[index] + 1
+        positions = np.repeat(starts - np.cumsum(lengths) + lengths,
+                              lengths) + np.arange(lengths.sum())
+        sequence = np.concatenate([[boundary], self.sequence[positions]])
+        weights = new_counts - self.counts[index]
+        self.counts[index] = new_counts
+
+        # the new words, with IDs for new phones
+        n_phones = len(self.phones)
+        new_stream = [boundary]
+        new_lengths = np.empty(len(new_words), dtype=np.int64)
+        for i, word in enumerate(new_words):
+            phones_ = words_to_phones[word] if words_to_phones else list(word)
+            new_lengths[i] = len(phones_)
+            for phone in phones_:
+                if phone not in self.phone_to_id:
+                    self.phone_to_id[phone] = len(self.phones)
+                    self.phones.append(phone)
+                new_stream.append(self.phone_to_id[phone])
+            new_stream.append(boundary)
+        new_stream = np.array(new_stream, dtype=np.int64)
+        new_word_counts = np.array([word_counts[word] for word in new_words],
+                                   dtype=np.int64)
+
+        self.word_to_index.update((word, len(self.words) + i)
+                                  for i, word in enumerate(new_words))
+        self.words.extend(new_words)
+        self.counts = np.concatenate([self.counts, new_word_counts])
+        self.offsets = np.concatenate([self.offsets, self.offsets[-1] +
+                                       np.cumsum(new_lengths + 1)])
+        self.sequence = np.concatenate([self.sequence, new_stream[1:]])
+        self.lengths = np.diff(self.offsets)
+
+        if len(self.phones) > n_phones:
+            first = self.biphone_codes // n_phones
+            second = self.biphone_codes % n_phones
+            self.biphone_codes = first * len(self.phones) + second
+            self.phone_counts = np.concatenate([
+                self.phone_counts,
+                np.zeros(len(self.phones) - n_phones, dtype=np.int64)])
+
+        lengths = np.concatenate([lengths, new_lengths + 1])
+        sequence = np.concatenate([sequence, new_stream[1:]])
+        weights = np.concatenate([weights, new_word_counts])
+        phone_counts, biphone_codes, biphone_counts, biphone_index = \
+            _count_phones(lengths, sequence, weights, len(self.phones),
+                          boundary)
+        self.phone_counts += phone_counts
+        n_biphones = len(self.biphone_codes)
+        self.biphone_codes, biphone_counts, inverse = _merge_counts(
+            self.biphone_codes, self.biphone_counts, biphone_codes,
+            biphone_counts)
+        self.biphone_counts = np.rint(biphone_counts).astype(np.int64)
+        # the biphones of the new words close the stream
+        self._biphone_index = np.concatenate([
+            inverse[self._biphone_index],
+            inverse[n_biphones:][biphone_index[len(biphone_index) -
+                                               new_lengths.sum() -
+                                               len(new_words):]]])
+
+        self.trigram_model.update(lengths, sequence, weights,
+                                  n_new_words=len(new_words))
+        self._compute_plogs()
+
+    def phonotactic_matrices(self, floor=None):
+        """
+        Return the phone plogs and the dense phones-by-phones biphone MI
+        matrix, each with one extra trailing row/entry for phones outside
+        the tables. Unseen phones and biphones get the frequency ``floor``.
+
+        :param floor: frequency of an unseen phone or biphone; by default,
+            half a count
+        :rtype: tuple(numpy.ndarray, numpy.ndarray)
+        """
+        n_phones = len(self.phones)
+        phone_total = self.phone_counts.sum()
+        biphone_total = self.biphone_counts.sum()
+        if floor is None:
+            phone_floor = 0.5 / phone_total
+            biphone_floor = 0.5 / biphone_total
+        else:
+            phone_floor = biphone_floor = floor
+
+        phone_plogs = np.append(self.phone_plogs, -np.log2(phone_floor))
+
+        biphone_plogs = np.full((n_phones + 1) ** 2, -np.log2(biphone_floor))
+        first = self.biphone_codes // n_phones
+        second = self.biphone_codes % n_phones
+        biphone_plogs[first * (n_phones + 1) + second] = \
+            -np.log2(self.biphone_counts / biphone_total)
+        biphone_plogs = biphone_plogs.reshape(n_phones + 1, n_phones + 1)
+
+        mi = phone_plogs[:, None] + phone_plogs[None, :] - biphone_plogs
+        return phone_plogs, mi
+
+    def word_phones(self, i):
+        """
+        Return the phones of the *i*-th word, word boundaries included.
+
+        :rtype: list(str)
+        """
+        ids = self.sequence[self.offsets[i]:self.offsets[i + 1] + 1]
+        return [self.phones[j] for j in ids.tolist()]
+
+    def phone_unigram_counter(self):
+        """
+        Return a dict of phone unigrams with (non-zero) counts.
+
+        :rtype: dict(str: int)
+        """
+        return {phone: count for phone, count
+                in zip(self.phones, self.phone_counts.tolist()) if count}
+
+    def phone_bigram_counter(self):
+        """
+        Return a dict of phone bigrams with (non-zero) counts.
+
+        :rtype: dict(tuple(str): int)
+        """
+        first = self.biphone_codes // len(self.phones)
+        second = self.biphone_codes % len(self.phones)
+        return {(self.phones[a], self.phones[b]): count for a, b, count in
+                zip(first.tolist(), second.tolist(),
+                    self.biphone_counts.tolist()) if count}
+
+    def phone_trigram_counter(self):
+        """
+        Return a dict of phone trigrams with (non-zero) counts.
+
+        :rtype: dict(tuple(str): int)
+        """
+        # the trigrams of the trigram model are the triphones within words
+        model = self.trigram_model
+        codes = model.ngram_codes[1]
+        counts = np.rint(model.ngram_counts[1]).astype(np.int64)
+        first = codes // model.base ** 2
+        second = codes // model.base % model.base
+        third = codes % model.base
+        return {(self.phones[a], self.phones[b], self.phones[c]): count
+                for a, b, c, count in zip(first.tolist(), second.tolist(),
+                                          third.tolist(), counts.tolist())
+                if count}
+
+
+class WordPhonology:
+    """
+    Phonology of one word, read off a ``PhonologyTables`` instance.
+    It has the attributes of ``Word``, plus ``trigram_plog`` and
+    ``avg_trigram_plog`` from the trigram ``PhonotacticModel``.
+    """
+
+    __slots__ = ('_tables', '_i')
+
+    def __init__(self, tables, i):
+        self._tables = tables
+        self._i = i
+
+    @property
+    def spelling(self):
+        return self._tables.words[self._i]
+
+    @property
+    def phones(self):
+        return self._tables.word_phones(self._i)
+
+    @property
+    def count(self):
+        return int(self._tables.counts[self._i])
+
+    @property
+    def frequency(self):
+        return float(self._tables.frequencies[self._i])
+
+    @property
+    def unigram_plog(self):
+        return float(self._tables.unigram_plog[self._i])
+
+    @property
+    def avg_unigram_plog(self):
+        return float(self._tables.avg_unigram_plog[self._i])
+
+    @property
+    def bigram_plog(self):
+        return float(self._tables.bigram_plog[self._i])
+
+    @property
+    def avg_bigram_plog(self):
+        return float(self._tables.avg_bigram_plog[self._i])
+
+    @property
+    def trigram_plog(self):
+        return float(self._tables.trigram_plog[self._i])
+
+    @property
+    def avg_trigram_plog(self):
+        return float(self._tables.avg_trigram_plog[self._i])
+
+
+class WordPhonologyView(Mapping):
+    """
+    Read-only dict of words to ``WordPhonology`` objects, backed by a
+    ``PhonologyTables`` instance.
+    """
+
+    def __init__(self, tables):
+        self.tables = tables
+
+    def __getitem__(self, word):
+        return WordPhonology(self.tables, self.tables.word_to_index[word])
+
+    def __iter__(self):
+        return iter(self.tables.words)
+
+    def __len__(self):
+        return len(self.tables.words)
+
+    def __contains__(self, word):
+        return word in self.tables.word_to_index
+
+
+def make_phonology_tables(word_unigram_counter, words_to_phones=None):
+    """
+    Build the array-based phonology of a wordlist.
+
+    :param word_unigram_counter: dict of words to counts
+    :param words_to_phones: dict of words to lists of phones; if not given,
+        the phones of a word are its characters
+    :rtype: PhonologyTables
+    """
+    words = list(word_unigram_counter)
+    counts = np.fromiter(word_unigram_counter.values(), dtype=np.int64,
+                         count=len(words))
+
+    if not words_to_phones:
+        lengths = np.fromiter(map(len, words), dtype=np.int64,
+                              count=len(words))
+        stream = '#' + ''.join(word + '#' for word in words)
+        codepoints = np.frombuffer(stream.encode('utf-32-le'),
+                                   dtype=np.uint32)
+        # rank the code points that occur by a lookup table, avoiding a sort
+        present = np.bincount(codepoints) > 0
+        phones = [chr(c) for c in np.flatnonzero(present).tolist()]
+        sequence = (np.cumsum(present) - 1)[codepoints]
+    else:
+        stream = ['#']
+        lengths = np.empty(len(words), dtype=np.int64)
+        for i, word in enumerate(words):
+            phones_ = words_to_phones[word]
+            lengths[i] = len(phones_)
+            stream.extend(phones_)
+            stream.append('#')
+        phone_array, sequence = np.unique(np.array(stream),
+                                          return_inverse=True)
+        phones = phone_array.tolist()
+
+    offsets = np.zeros(len(words) + 1, dtype=np.int64)
+    np.cumsum(lengths + 1, out=offsets[1:])
+    return PhonologyTables(words, counts, phones, offsets,
+                           sequence.astype(np.int64))
+
+
+def _encode_words(tables, words):
+    """
+    Encode words as a stream of phone IDs of ``tables`` with shared word
+    boundaries, as in ``PhonologyTables``; phones outside the tables get
+    the ID ``len(tables.phones)``.
+
+    :param tables: PhonologyTables instance
+    :param words: list of words, each either a string (its characters are
+        its phones) or a list of phones
+    :return: the number of phones after each initial boundary, and the stream
+    :rtype: tuple(numpy.ndarray, numpy.ndarray)
+    """
+    unseen = len(tables.phones)
+
+    if all(isinstance(word, str) for word in words):
+        # single-character phones, for encoding strings with array lookups;
+        # there is always at least the word boundary "#"
+        char_ids = np.array([i for i, phone in enumerate(tables.phones)
+                             if len(phone) == 1], dtype=np.int64)
+        char_codes = np.array([ord(tables.phones[i]) for i in char_ids],
+                              dtype=np.int64)
+        order = np.argsort(char_codes)
+        char_codes = char_codes[order]
+        char_ids = char_ids[order]
+
+        lengths = np.fromiter(map(len, words), dtype=np.int64,
+                              count=len(words))
+        stream = '#' + ''.join(word + '#' for word in words)
+        codepoints = np.frombuffer(stream.encode('utf-32-le'),
+                                   dtype=np.uint32).astype(np.int64)
+        index = np.searchsorted(char_codes, codepoints)
+        index[index == len(char_codes)] = 0
+        sequence = np.where(char_codes[index] == codepoints,
+                            char_ids[index], unseen)
+    else:
+        phone_to_id = {phone: i for i, phone in enumerate(tables.phones)}
+        boundary = phone_to_id['#']
+        stream = [boundary]
+        lengths = np.empty(len(words), dtype=np.int64)
+        for i, word in enumerate(words):
+            lengths[i] = len(word)
+            stream.extend(phone_to_id.get(phone, unseen) for phone in word)
+            stream.append(boundary)
+        sequence = np.array(stream, dtype=np.int64)
+
+    return lengths + 1, sequence
+
+
+def _score_in_chunks(score_stream, tables, words, average, chunk_size):
+    words = list(words)
+    scores = list()
+    for start in range(0, len(words), chunk_size):
+        lengths, sequence = _encode_words(tables,
+                                          words[start:start + chunk_size])
+        plogs = score_stream(lengths, sequence)
+        if average:
+            plogs /= lengths
+        scores.append(plogs)
+
+    if not scores:
+        return np.zeros(0)
+    return np.concatenate(scores)
+
+
+def score_phonotactics(tables, words, floor=None, average=True,
+                       chunk_size=2 ** 16):
+    """
+    Score words by the biphone model of a ``PhonologyTables`` instance.
+    The score is the bigram plog of ``Word``: low scores are phonotactically
+    likely, and the words need not be in the tables.
+
+    :param tables: PhonologyTables instance
+    :param words: iterable of words, each either a string (its characters
+        are its phones) or a list of phones
+    :param floor: frequency of unseen phones and biphones; by default,
+        half a count
+    :param average: if True, divide each score by the number of phones
+        plus one, as for ``avg_bigram_plog``
+    :param chunk_size: number of words scored at a time
+    :rtype: numpy.ndarray
+    """
+    phone_plogs, mi = tables.phonotactic_matrices(floor)
+
+    def score_stream(lengths, sequence):
+        starts = np.zeros(len(lengths), dtype=np.int64)
+        np.cumsum(lengths[:-1], out=starts[1:])
+        unigram_plog = np.add.reduceat(phone_plogs[sequence[1:]], starts)
+        return unigram_plog - np.add.reduceat(
+            mi[sequence[:-1], sequence[1:]], starts)
+
+    return _score_in_chunks(score_stream, tables, words, average, chunk_size)
+
+
+def _ngram_windows(lengths, sequence, order, base):
+    """
+    Yield the phone n-grams of orders 2 to *order* ending at each phone that
+    follows a word's initial boundary, packed as base-*base* integers.
+    An n-gram does not reach back past the word's initial boundary.
+
+    :param lengths: the number of phones after each initial boundary
+    :param sequence: stream of phone IDs, as in ``PhonologyTables``
+    :return: for each order, the indices (into ``sequence[1:]``) of the
+        phones having an n-gram of that order, and the packed n-grams
+    """
+    positions = np.arange(1, len(sequence))
+    starts = np.zeros(len(lengths), dtype=np.int64)
+    np.cumsum(lengths[:-1], out=starts[1:])
+    # the number of phones before each phone within its word
+    depth = positions - np.repeat(starts, lengths)
+
+    codes = sequence[1:]
+    for k in range(2, order + 1):
+        first = sequence[np.maximum(positions - k + 1, 0)]
+        codes = first * base ** (k - 1) + codes
+        index = np.flatnonzero(depth >= k - 1)
+        yield index, codes[index]
+
+
+def _lookup(keys, values, queries):
+    """
+    Return the values of *queries* in the sorted array *keys*, and 0 for
+    queries not in *keys*.
+    """
+    if not len(keys):
+        return np.zeros(len(queries), dtype=values.dtype)
+    index = np.searchsorted(keys, queries)
+    index[index == len(keys)] = 0
+    return np.where(keys[index] == queries, values[index], 0)
+
+
+def _context_stats(codes, counts, base):
+    """
+    Return, for the sorted packed n-grams *codes*, their contexts (n-grams
+    without the last phone) with the total count and the number of n-gram
+    types of each context, and the index of the context of each n-gram.
+    """
+    # sorted n-grams have sorted contexts
+    contexts = codes // base
+    first = np.flatnonzero(np.diff(np.concatenate(([-1], contexts))))
+    sizes = np.diff(np.concatenate((first, [len(codes)])))
+    totals = np.add.reduceat(counts, first) if len(codes) else np.zeros(0)
+    types = np.add.reduceat(counts > 0, first) if len(codes) \
+        else np.zeros(0, dtype=np.int64)
+    context_index = np.repeat(np.arange(len(first)), sizes)
+    return contexts[first], totals, types, context_index
+
+
+class PhonotacticModel:
+    """
+    Phone n-gram model of a ``PhonologyTables`` instance, smoothed by
+    interpolated absolute discounting. The n-grams of each order are kept as
+    sorted arrays of base-(number of phones + 1) packed integers, so that
+    words are scored in batch with binary searches.
+    ``word_plog`` holds the plogs of the words of the tables.
+    """
+
+    def __init__(self, tables, order=3, discount=0.75, floor=None):
+        """
+        :param tables: PhonologyTables instance
+        :param order: n-gram order of the model
+        :param discount: count subtracted from every seen n-gram of order 2
+            and higher
+        :param floor: frequency of phones outside the tables; by default,
+            half a count
+        """
+        self.tables = tables
+        self.order = order
+        self.discount = discount
+        self.floor = floor
+        self._fit()
+
+    def _fit(self):
+        tables = self.tables
+        discount = self.discount
+        # one more phone ID for phones outside the tables
+        self.base = len(tables.phones) + 1
+        if self.base ** self.order >= 2 ** 63:
+            raise ValueError('too many phones for a model of order %d'
+                             % self.order)
+
+        weights = np.repeat(tables.counts, tables.lengths)
+        phones = tables.sequence[1:]
+        self.phone_counts = np.bincount(phones, weights=weights,
+                                        minlength=self.base)
+        self._compute_phone_probs()
+
+        # per order: packed n-grams, their counts, and per context (n-gram
+        # without its last phone) the total count, the number of n-gram types,
+        # and the index of the context of each n-gram
+        self.ngram_codes = list()
+        self.ngram_counts = list()
+        self.context_codes = list()
+        self.context_totals = list()
+        self.context_types = list()
+        self._context_index = list()
+        # the index of the n-gram ending at each phone of the tables' stream
+        # which has one, so that the tables' words are rescored without
+        # searches
+        self._ngram_index = list()
+        for index, codes in _ngram_windows(tables.lengths, tables.sequence,
+                                           self.order, self.base):
+            codes, inverse = np.unique(codes, return_inverse=True)
+            counts = np.bincount(inverse, weights=weights[index])
+            self.ngram_codes.append(codes)
+            self.ngram_counts.append(counts)
+            self._ngram_index.append(inverse)
+            self._set_context_stats(len(self.ngram_codes) - 1)
+
+        self._score_tables()
+
+    def _set_context_stats(self, k):
+        contexts, totals, types, context_index = _context_stats(
+            self.ngram_codes[k], self.ngram_counts[k], self.base)
+        if k == len(self.context_codes):
+            self.context_codes.append(contexts)
+            self.context_totals.append(totals)
+            self.context_types.append(types)
+            self._context_index.append(context_index)
+        else:
+            self.context_codes[k] = contexts
+            self.context_totals[k] = totals
+            self.context_types[k] = types
+            self._context_index[k] = context_index
+
+    def _score_tables(self):
+        tables = self.tables
+        probs = self.phone_probs[tables.sequence[1:]]
+        windows = _ngram_windows(tables.lengths, tables.sequence, self.order,
+                                 self.base)
+        for k, (index, _) in enumerate(windows):
+            ngrams = self._ngram_index[k]
+            contexts = self._context_index[k][ngrams]
+            totals = self.context_totals[k][contexts]
+            # contexts only seen in words whose counts have dropped to zero
+            seen = totals > 0
+            index, ngrams = index[seen], ngrams[seen]
+            contexts, totals = contexts[seen], totals[seen]
+            probs[index] = (
+                np.maximum(self.ngram_counts[k][ngrams] - self.discount, 0) +
+                self.discount * self.context_types[k][contexts] * probs[index]
+            ) / totals
+
+        self.word_plog = np.add.reduceat(-np.log2(probs), tables.offsets[:-1])
+
+    def _compute_phone_probs(self):
+        total = self.phone_counts.sum()
+        floor = 0.5 / total if self.floor is None else self.floor
+        self.phone_probs = np.where(self.phone_counts > 0,
+                                    self.phone_counts / total, floor)
+
+    def update(self, lengths, sequence, weights, n_new_words=0):
+        """
+        Add the n-grams of a stream of phone IDs to the counts, with each
+        word weighted by *weights* (negative weights remove counts), and
+        rescore the words of the tables. The model is refit if the tables
+        have new phones.
+
+        :param lengths: the number of phones after each initial boundary
+        :param sequence: stream of phone IDs, as in ``PhonologyTables``
+        :param weights: array of word weights
+        :param n_new_words: the number of words at the end of the stream
+            which have just been added to the end of the tables
+        """
+        if len(self.tables.phones) + 1 != self.base:
+            self._fit()
+            return
+
+        weights = np.repeat(weights, lengths)
+        self.phone_counts += np.bincount(sequence[1:], weights=weights,
+                                         minlength=self.base)
+        self._compute_phone_probs()
+
+        # the phones of the new words close the stream
+        new_words_start = len(sequence) - 1 - lengths[len(lengths) -
+                                                      n_new_words:].sum()
+        windows = _ngram_windows(lengths, sequence, self.order, self.base)
+        for k, (index, codes) in enumerate(windows):
+            n_ngrams = len(self.ngram_codes[k])
+            self.ngram_codes[k], self.ngram_counts[k], inverse = \
+                _merge_counts(self.ngram_codes[k], self.ngram_counts[k],
+                              codes, weights[index])
+            self._ngram_index[k] = np.concatenate([
+                inverse[self._ngram_index[k]],
+                inverse[n_ngrams:][index >= new_words_start]])
+            self._set_context_stats(k)
+
+        self._score_tables()
+
+    def _score_stream(self, lengths, sequence):
+        probs = self.phone_probs[sequence[1:]]
+        windows = _ngram_windows(lengths, sequence, self.order, self.base)
+        for k, (index, codes) in enumerate(windows):
+            contexts = codes // self.base
+            totals = _lookup(self.context_codes[k], self.context_totals[k],
+                             contexts)
+            seen = totals > 0
+            index, codes = index[seen], codes[seen]
+            totals = totals[seen]
+            types = _lookup(self.context_codes[k], self.context_types[k],
+                            contexts[seen])
+            counts = _lookup(self.ngram_codes[k], self.ngram_counts[k], codes)
+            probs[index] = (np.maximum(counts - self.discount, 0) +
+                            self.discount * types * probs[index]) / totals
+
+        starts = np.zeros(len(lengths), dtype=np.int64)
+        np.cumsum(lengths[:-1], out=starts[1:])
+        return np.add.reduceat(-np.log2(probs), starts)
+
+    def score(self, words, average=True, chunk_size=2 ** 16):
+        """
+        Return the plogs of *words* under the model; low scores are
+        phonotactically likely.
+
+        :param words: iterable of words, each either a string (its characters
+            are its phones) or a list of phones
+        :param average: if True, divide each score by the number of phones
+            plus one
+        :param chunk_size: number of words scored at a time
+        :rtype: numpy.ndarray
+        """
+        return _score_in_chunks(self._score_stream, self.tables, words,
+                                average, chunk_size)
+
+
+WORDLIST_CACHE_VERSION = 1
+
+
+def _parse_wordlist(text, keep_case):
+    """
+    Parse the text of a wordlist file, with lines of the form
+    "word [count [phone phone ...]]". A missing or non-integer count is 1,
+    words without phones are spelled out in characters, and a repeated word
+    keeps its first position but takes its last line.
+    """
+    rows = [line.split() for line in text.splitlines()]
+    rows = [row for row in rows if row and not row[0].startswith('#')]
+
+    words = [row[0] for row in rows]
+    if not keep_case:
+        words = [word.lower() for word in words]
+    word_to_row = dict(zip(words, range(len(rows))))
+    rows = [rows[i] for i in word_to_row.values()]
+    words = list(word_to_row)
+
+    count_strings = np.array([row[1] if len(row) > 1 else '' for row in rows],
+                             dtype=str)
+    counts = np.ones(len(rows), dtype=np.int64)
+    if len(rows):
+        numeric = np.char.isdecimal(count_strings)
+        counts[numeric] = count_strings[numeric].astype(np.int64)
+        # the few other counts, such as "+3", go through int() one by one
+        for i in np.flatnonzero(~numeric & (count_strings != '')):
+            try:
+                counts[i] = int(count_strings[i])
+            except ValueError:
+                pass
+
+    stream = ['#']
+    lengths = np.empty(len(rows), dtype=np.int64)
+    for i, (word, row) in enumerate(zip(words, rows)):
+        phones_ = row[2:] or list(word)
+        lengths[i] = len(phones_)
+        stream.extend(phones_)
+        stream.append('#')
+    phone_array, sequence = np.unique(np.array(stream), return_inverse=True)
+
+    offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+    np.cumsum(lengths + 1, out=offsets[1:])
+    return (words, counts, phone_array.tolist(), offsets,
+            sequence.astype(np.int64))
+
+
+def _save_strings(path, strings):
+    np.save(path, np.frombuffer('\n'.join(strings).encode('utf8'),
+                                dtype=np.uint8))
+
+
+def _load_strings(path, n):
+    if not n:
+        return list()
+    return np.load(path).tobytes().decode('utf8').split('\n')
+
+
+def load_wordlist(file_path, encoding='utf8', keep_case=False,
+                  cache_dir=None):
+    """
+    Load a wordlist file with lines of the form "word [count [phone ...]]",
+    as the arguments of ``PhonologyTables``: the words, their counts, the
+    phones, and the offsets and phone IDs of the words in one stream.
+
+    If *cache_dir* is given, the parsed arrays are saved there in binary
+    form, and later loads of the unchanged file memory-map them instead
+    of parsing the text again.
+
+    :param file_path: path of the wordlist file
+    :param encoding: encoding of the wordlist file
+    :param keep_case: if False, words are lowercased
+    :param cache_dir: directory of binary caches; None for no caching
+    :rtype: tuple(list(str), numpy.ndarray, list(str), numpy.ndarray,
+        numpy.ndarray)
+    """
+    file_path = os.path.abspath(file_path)
+    stat = os.stat(file_path)
+    meta = np.array([WORDLIST_CACHE_VERSION, stat.st_size, stat.st_mtime_ns],
+                    dtype=np.int64)
+
+    if cache_dir is not None:
+        key = sha1(repr((file_path, encoding, bool(keep_case))).encode('utf8'))
+        cache_path = os.path.join(cache_dir, 'wordlist-' + key.hexdigest())
+        try:
+            if np.array_equal(np.load(os.path.join(cache_path, 'meta.npy')),
+                              meta):
+                counts = np.load(os.path.join(cache_path, 'counts.npy'),
+                                 mmap_mode='r')
+                offsets = np.load(os.path.join(cache_path, 'offsets.npy'),
+                                  mmap_mode='r')
+                sequence = np.load(os.path.join(cache_path, 'sequence.npy'),
+                                   mmap_mode='r')
+                words = _load_strings(os.path.join(cache_path, 'words.npy'),
+                                      len(counts))
+                phones = _load_strings(os.path.join(cache_path, 'phones.npy'),
+                                       1)
+                return words, counts, phones, offsets, sequence
+        except (OSError, ValueError):
+            pass  # no usable cache
+
+    with open(file_path, encoding=encoding) as f:
+        words, counts, phones, offsets, sequence = _parse_wordlist(f.read(),
+                                                                   keep_case)
+
+    if cache_dir is not None:
+        # write to a temporary directory and move it in place, so that
+        # a cache is never seen half-written; caching is best-effort
+        tmp_path = None
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp_path = tempfile.mkdtemp(dir=cache_dir)
+            _save_strings(os.path.join(tmp_path, 'words.npy'), words)
+            _save_strings(os.path.join(tmp_path, 'phones.npy'), phones)
+            np.save(os.path.join(tmp_path, 'counts.npy'), counts)
+            np.save(os.path.join(tmp_path, 'offsets.npy'), offsets)
+            np.save(os.path.join(tmp_path, 'sequence.npy'), sequence)
+            np.save(os.path.join(tmp_path, 'meta.npy'), meta)
+            shutil.rmtree(cache_path, ignore_errors=True)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            if tmp_path is not None:
+                shutil.rmtree(tmp_path, ignore_errors=True)
+
+    return words, counts, phones, offsets, sequence
@@ -8,7 +8,7 @@ sets cannot be keys.
 
 from itertools import (combinations, groupby)
 
-from linguistica.util import NULL
+from linguistica.util import (NULL, stage, track)
 
 
 def max_common_prefix(a, b):
@@ -101,10 +101,10 @@ def make_signatures_to_words(words_to_signatures):
 
 
 def make_signatures_to_stems(stems_to_words, max_affix_length, min_sig_count,
-                             suffixing):
+                             suffixing, progress=None):
     signatures_to_stems = dict()
 
-    for stem in stems_to_words.keys():
+    for stem in track(stems_to_words.keys(), progress):
         affix_set = set()
         len_stem = len(stem)
 
@@ -136,12 +136,14 @@ def make_signatures_to_stems(stems_to_words, max_affix_length, min_sig_count,
 
 
 def make_stems_to_words(wordlist, min_stem_length, max_affix_length, suffixing,
-                        min_sig_count):
+                        min_sig_count, progress=None):
     bisigs_to_tuples = make_bisignatures(wordlist, min_stem_length,
-                                         max_affix_length, suffixing)
+                                         max_affix_length, suffixing,
+                                         stage(progress, 0, 0.9))
     stems_to_words = dict()
 
-    for bisig in bisigs_to_tuples.keys():  # bisig is a tuple
+    for bisig in track(bisigs_to_tuples.keys(),
+                       stage(progress, 0.9, 1)):  # bisig is a tuple
         if len(bisigs_to_tuples[bisig]) < min_sig_count:
             continue
 
@@ -156,11 +158,14 @@ def make_stems_to_words(wordlist, min_stem_length, max_affix_length, suffixing,
 
 
 # noinspection PyPep8
-def make_bisignatures(wordlist, min_stem_length, max_affix_length, suffixing):
+def make_bisignatures(wordlist, min_stem_length, max_affix_length, suffixing,
+                      progress=None):
     """
     This function finds pairs of words which make a valid signature,
     and makes Dictionary whose key is the signature and
     whose value is a tuple: stem, word1, word2.
+
+    If *progress* is given, it is updated by the words analyzed so far.
     """
     bisigs_to_tuples = dict()
 
@@ -171,7 +176,8 @@ def make_bisignatures(wordlist, min_stem_length, max_affix_length, suffixing):
         wordlist = sorted(wordlist)
         group_key = lambda x: x[: min_stem_length]
 
-    wordlist = filter(lambda x: len(x) >= min_stem_length, wordlist)
+    wordlist = filter(lambda x: len(x) >= min_stem_length,
+                      track(wordlist, progress))
 
     for _, group in groupby(wordlist, key=group_key):  # groupby from itertools
         wordlist_for_analysis = list(group)  # must use list() here!
@@ -1,9 +1,9 @@
 # -*- encoding: utf8 -*-
 
-from linguistica.util import NULL
+from linguistica.util import (NULL, stage, track)
 
 
-def find_breaks(wordlist, min_stem_length):
+def find_breaks(wordlist, min_stem_length, progress=None):
     prefixes_found = set()
 
     breaks = dict()
@@ -12,7 +12,7 @@ def find_breaks(wordlist, min_stem_length):
 
     previous_word = wordlist[0]
 
-    for i in range(1, len(wordlist)):
+    for i in track(range(1, len(wordlist)), progress):
         this_word = wordlist[i]
         m = common_prefix_length(previous_word, this_word)
 
@@ -43,10 +43,11 @@ def find_breaks(wordlist, min_stem_length):
     return breaks
 
 
-def break_words(wordlist, break_dict):
+def break_words(wordlist, break_dict, progress=None):
     broken_words = dict()
 
-    for i, this_word in enumerate(wordlist):
+    for i, this_word in track(enumerate(wordlist), progress,
+                              total=len(wordlist)):
         broken_words[this_word] = list()
         break_list = sorted(break_dict[i])
 
@@ -65,9 +66,9 @@ def break_words(wordlist, break_dict):
     return broken_words
 
 
-def get_successors(wordlist, broken_words):
+def get_successors(wordlist, broken_words, progress=None):
     successors = dict()
-    for this_word in wordlist:
+    for this_word in track(wordlist, progress):
         this_word_parsed = broken_words[this_word]
 
         number_of_pieces = len(this_word_parsed)
@@ -135,27 +136,33 @@ def reverse_direction(str_to_sequences_of_strings, is_list=False):
     return output_dict
 
 
-def run(wordlist=None, min_stem_length=4):
+def run(wordlist=None, min_stem_length=4, progress=None):
     reversed_wordlist = sorted([x[::-1] for x in wordlist])
 
     # --------------------------------------------------------------------------
     # Find breaks in words (left-to-right and right-to-left)
 
-    breaks_left_to_right = find_breaks(wordlist, min_stem_length)
-    breaks_right_to_left = find_breaks(reversed_wordlist, min_stem_length)
+    breaks_left_to_right = find_breaks(wordlist, min_stem_length,
+                                       stage(progress, 0, 0.2))
+    breaks_right_to_left = find_breaks(reversed_wordlist, min_stem_length,
+                                       stage(progress, 0.2, 0.4))
 
     # --------------------------------------------------------------------------
     # Break up each word (left-to-right and right-to-left)
 
-    broken_words_left_to_right = break_words(wordlist, breaks_left_to_right)
+    broken_words_left_to_right = break_words(wordlist, breaks_left_to_right,
+                                             stage(progress, 0.4, 0.55))
     broken_words_right_to_left = break_words(reversed_wordlist,
-                                             breaks_right_to_left)
+                                             breaks_right_to_left,
+                                             stage(progress, 0.55, 0.7))
 
     # --------------------------------------------------------------------------
     # Compute successors and predecessors
 
-    successors = get_successors(wordlist, broken_words_left_to_right)
-    predecessors = get_successors(reversed_wordlist, broken_words_right_to_left)
+    successors = get_successors(wordlist, broken_words_left_to_right,
+                                stage(progress, 0.7, 0.85))
+    predecessors = get_successors(reversed_wordlist, broken_words_right_to_left,
+                                  stage(progress, 0.85, 1))
 
     # --------------------------------------------------------------------------
     # Reverse direction to right-to-left
@@ -2,8 +2,16 @@
 
 import sys
 import os
-
-from itertools import groupby
+import csv
+import heapq
+import json
+import shutil
+import tempfile
+import threading
+import zipfile
+
+from functools import lru_cache
+from itertools import chain, groupby, islice
 from time import strftime
 from pprint import pformat
 import platform
@@ -23,6 +31,9 @@ REQUIRED_PY_VERSION = (3, 4)
 
 ENCODING = 'utf8'
 
+# binary caches of parsed input files
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.linguistica', 'cache')
+
 SUFFIXING_LANGUAGES = {'english', 'french', 'hungarian', 'turkish', 'russian',
                        'german', 'spanish', 'test'}
 
@@ -35,6 +46,14 @@ SEP_NGRAM = '\t'        # separator between words in an ngram
 
 NULL = 'NULL'
 
+# buffer size of output files, written row by row
+OUTPUT_BUFFER_SIZE = 2 ** 20
+
+_NO_ROW = object()
+
+# formats of Lexicon.export()
+EXPORT_FORMATS = ('tsv', 'jsonl', 'npz')
+
 # ------------------------------------------------------------------------------
 # parameters, with the "factory settings"
 
@@ -44,7 +63,8 @@ NULL = 'NULL'
 # signature: min_stem_length, max_affix_length, min_sig_count
 # phon:      (no parameters so far)
 # trie:      min_stem_length, min_affix_length, min_sf_pf_count
-# manifold:  max_word_types, n_neighbors, n_eigenvectors, min_context_count
+# manifold:  max_word_types, n_neighbors, n_eigenvectors, min_context_count,
+#            embedding_method, max_memory, neighbor_method
 # (See the individual programs for what these parameters mean.)
 
 PARAMETERS = {'max_word_tokens': 0,  # zero means all word tokens
@@ -57,6 +77,9 @@ PARAMETERS = {'max_word_tokens': 0,  # zero means all word tokens
               'n_eigenvectors': 11,
               'min_context_count': 3,
               'max_word_types': 1000,
+              'embedding_method': 0,  # 0 = exact, 1 = randomized, 2 = Nystrom
+              'max_memory': 0,  # in megabytes; zero means no limit
+              'neighbor_method': 0,  # 0 = spectral, 1 = MinHash, 2 = cosine
               'suffixing': 1,  # 1 means yes, 0 means no
               'keep_case': 0,  # 1 means yes, 0 means no
               }
@@ -69,6 +92,9 @@ PARAMETERS_RANGES = {'max_word_tokens': (0, 1000000000),
                      'n_eigenvectors': (5, 20),
                      'min_context_count': (1, 10),
                      'max_word_types': (0, 1000000000),
+                     'embedding_method': (0, 2),
+                     'max_memory': (0, 1000000),
+                     'neighbor_method': (0, 2),
                      'suffixing': (0, 1),  # 1 means yes, 0 means no
                      'keep_case': (0, 1),  # 1 means yes, 0 means no
                      }
@@ -81,6 +107,11 @@ PARAMETERS_HINTS = {'max_word_tokens': '0 = all word tokens',
                     'n_eigenvectors': '',
                     'min_context_count': '',
                     'max_word_types': '',
+                    'embedding_method': '0 = exact; 1 = randomized; '
+                                        '2 = Nystrom',
+                    'max_memory': 'in MB; 0 = no limit',
+                    'neighbor_method': '0 = spectral; 1 = MinHash; '
+                                       '2 = cosine',
                     'suffixing': '1 = yes; 0 = no',
                     'keep_case': '1 = yes; 0 = no',
                     }
@@ -120,15 +151,302 @@ def double_sorted(input_object, key=lambda x: x, reverse=False,
     return new_sorted_list
 
 
+def ranked(input_object, key=lambda x: x, reverse=False,
+           subkey=lambda x: x, subreverse=False, k=None, min_key=None):
+    """
+    Return the first *k* items of ``double_sorted()`` for the same arguments,
+    optionally only among the items whose key is at least *min_key*.
+
+    The threshold is applied before any sorting. For the top *k* items, the
+    k-th best key is found with a heap over the keys alone, and only the
+    items at least as good as it are sorted, so ties at the cutoff are
+    broken exactly as in ``double_sorted()``.
+
+    :param input_object: an iterable
+    :param key: function of the sort key
+    :param reverse: whether the key is in descending order
+    :param subkey: function of the key for items with the same *key*
+    :param subreverse: whether the subkey is in descending order
+    :param k: number of items to return; None for all
+    :param min_key: if not None, items with a key less than this are left out
+    :rtype: list
+    """
+    if min_key is not None:
+        items = [x for x in input_object if key(x) >= min_key]
+    else:
+        items = list(input_object)
+
+    if k is None or k >= len(items):
+        return double_sorted(items, key=key, reverse=reverse,
+                             subkey=subkey, subreverse=subreverse)
+    if k <= 0:
+        return list()
+
+    keys = [key(x) for x in items]
+    if reverse:
+        kth_key = heapq.nlargest(k, keys)[-1]
+        items = [x for x, x_key in zip(items, keys) if x_key >= kth_key]
+    else:
+        kth_key = heapq.nsmallest(k, keys)[-1]
+        items = [x for x, x_key in zip(items, keys) if x_key <= kth_key]
+
+    return double_sorted(items, key=key, reverse=reverse,
+                         subkey=subkey, subreverse=subreverse)[:k]
+
+
+def top_k_indices(values, k=None, reverse=False):
+    """
+    Return the indices of the *k* smallest (or largest, if *reverse* is True)
+    of *values* in sorted order, with ties in the order of the indices.
+
+    Only the candidates found by ``numpy.partition`` are sorted, but all
+    values tied with the k-th one are kept until the final sort, so the
+    result does not depend on how the partition breaks ties.
+
+    :param values: a 1-D numeric array
+    :param k: number of indices to return; None for all
+    :param reverse: whether to select the largest values
+    :rtype: numpy.ndarray
+    """
+    values = numpy.asarray(values)
+    if reverse:
+        if values.dtype.kind == 'u':
+            values = values.astype(numpy.int64)
+        values = -values
+
+    if k is None or k >= len(values):
+        return numpy.argsort(values, kind='mergesort')
+    if k <= 0:
+        return numpy.zeros(0, dtype=numpy.intp)
+
+    kth_value = numpy.partition(values, k - 1)[k - 1]
+    candidates = numpy.flatnonzero(values <= kth_value)
+    order = numpy.argsort(values[candidates], kind='mergesort')[:k]
+    return candidates[order]
+
+
+def ranked_items(mapping, key=lambda x: x, reverse=False, k=None):
+    """
+    Yield the first *k* (key, value) pairs of *mapping* in the order of
+    ``ranked(mapping.items(), key=lambda x: key(x[1]), reverse=reverse)``,
+    i.e., by the sort key of the value and then by the key.
+
+    Only the keys and the sort keys are held in memory, from one pass over
+    the items, and each value is looked up again as its pair is yielded, so
+    that a large mapping (e.g., a ``linguistica.database.ResultView``) is
+    streamed rather than copied. Nothing is read before the first pair is
+    requested.
+
+    :param mapping: a dict, or a read-only mapping
+    :param key: function of the sort key of a value; numeric
+    :param reverse: whether the sort key is in descending order
+    :param k: number of pairs to yield; None for all
+    """
+    sort_keys = {x: key(value) for x, value in mapping.items()}
+    keys = sorted(sort_keys)
+    for i in top_k_indices([sort_keys[x] for x in keys],
+                           k=k, reverse=reverse).tolist():
+        yield keys[i], mapping[keys[i]]
+
+
+def unique_rows(array):
+    """
+    Return the indices of the first occurrences of the distinct rows of a
+    2-D array, the index of the distinct row of each row, and the count of
+    each distinct row, as ``numpy.unique(array, axis=0, return_index=True,
+    return_inverse=True, return_counts=True)`` does (which needs NumPy
+    1.13), except that the distinct rows are in no particular order.
+
+    :param array: a 2-D array
+    :rtype: tuple(numpy.ndarray, numpy.ndarray, numpy.ndarray)
+    """
+    # each row as a single scalar of its bytes
+    array = numpy.ascontiguousarray(array)
+    rows = array.view(numpy.dtype(
+        (numpy.void, array.dtype.itemsize * array.shape[1]))).ravel()
+    _, first, inverse, counts = numpy.unique(
+        rows, return_index=True, return_inverse=True, return_counts=True)
+    return first, inverse.ravel(), counts
+
+
+class Cancelled(Exception):
+    """
+    Raised at a checkpoint of a computation whose ``Progress`` is cancelled.
+    """
+    pass
+
+
+class Progress(object):
+    """
+    Progress of a long computation, and a way to cancel it.
+
+    The computation calls ``update()`` (or iterates through ``track()``) at
+    its checkpoints, which report the fraction done to *callback* as
+    ``callback(message, fraction)`` and raise ``Cancelled`` once
+    ``cancel()`` has been called, possibly from another thread. A part of
+    the computation gets ``stage()``, a Progress for a range of the overall
+    fraction, which shares the same cancellation.
+
+    :param callback: function of the message and the overall fraction
+        (from 0 to 1); reports are skipped for changes below 0.1%
+    """
+
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.message = ''
+        self.start = 0.0
+        self.end = 1.0
+        self._cancel_event = threading.Event()
+        self._reported = None
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def cancel(self):
+        """
+        Make the next checkpoint raise ``Cancelled``.
+        """
+        self._cancel_event.set()
+
+    def stage(self, start, end, message=None):
+        """
+        Return a Progress for the part of the computation from the fraction
+        *start* to *end* of this one. This is a checkpoint as well.
+
+        :param message: the message of the stage; defaults to this one's
+        """
+        child = Progress(self.callback)
+        child.message = self.message if message is None else message
+        child.start = self.start + (self.end - self.start) * start
+        child.end = self.start + (self.end - self.start) * end
+        child._cancel_event = self._cancel_event
+        child.update(0.0)
+        return child
+
+    def update(self, fraction=None):
+        """
+        Check for cancellation, and report the *fraction* done, if known.
+
+        :raise Cancelled: if ``cancel()`` has been called
+        """
+        if self._cancel_event.is_set():
+            raise Cancelled(self.message)
+        if fraction is None or self.callback is None:
+            return
+
+        fraction = self.start + (self.end - self.start) * \
+            min(max(fraction, 0.0), 1.0)
+        if self._reported is None or abs(fraction - self._reported) >= 0.001:
+            self._reported = fraction
+            self.callback(self.message, fraction)
+
+    def track(self, iterable, total=None, every=1000):
+        """
+        Yield the items of *iterable*, with a checkpoint every *every* items.
+
+        :param total: number of items, for the fraction done; defaults to
+            ``len(iterable)`` if available
+        """
+        if total is None and hasattr(iterable, '__len__'):
+            total = len(iterable)
+
+        for i, item in enumerate(iterable):
+            if not i % every:
+                self.update(i / total if total else None)
+            yield item
+
+        self.update(1.0)
+
+
+def track(iterable, progress=None, total=None, every=1000):
+    """
+    Return ``progress.track()`` for *iterable*, or *iterable* itself
+    if *progress* is None.
+    """
+    if progress is None:
+        return iterable
+    return progress.track(iterable, total=total, every=every)
+
+
+def checkpoint(progress=None, fraction=None):
+    """
+    Call ``progress.update()``, unless *progress* is None.
+    """
+    if progress is not None:
+        progress.update(fraction)
+
+
+def stage(progress, start, end, message=None):
+    """
+    Return ``progress.stage()``, or None if *progress* is None.
+    """
+    if progress is None:
+        return None
+    return progress.stage(start, end, message)
+
+
+@lru_cache(maxsize=None)
+def _system_info():
+    # platform.uname() is slow and never changes, so it is called only once
+    uname = platform.uname()
+    return ('System info:\n'
+            '=============================================\n'
+            'System: {}\n'
+            'Node: {}\n'
+            'Release: {}\n'
+            'Version: {}\n'
+            'Machine: {}\n'
+            'Processor: {}\n'
+            'Python version: {}\n'
+            '\n'
+            'Packages:\n'
+            '=============================================\n'
+            'Linguistica {}\n'
+            'SciPy {}\n'
+            'NumPy {}\n'
+            'NetworkX {}\n'
+            '\n'.format(uname.system, uname.node, uname.release,
+                         uname.version, uname.machine, uname.processor,
+                         platform.python_version(), lxa_version,
+                         scipy_version, numpy_version, networkx_version))
+
+
+def output_header(lxa_parameters=None, number_of_word_types=0,
+                  number_of_word_tokens=0, input_file_path=''):
+    """
+    Return the header block shared by the output files of one run:
+    system info, package versions, parameters, and input file information.
+
+    :param lxa_parameters: the parameter dict
+    :param number_of_word_types: number of word types
+    :param number_of_word_tokens: number of word tokens
+    :param input_file_path: path of the input file
+    :rtype: str
+    """
+    return (_system_info() +
+            'Linguistica parameters:\n'
+            '=============================================\n' +
+            pformat(lxa_parameters) + '\n'
+            '\n'
+            'Input file information:\n'
+            '=============================================\n'
+            'Path: {}\n'
+            'Number of word types: {}\n'
+            'Number of word tokens: {}\n'
+            '\n'.format(input_file_path, number_of_word_types,
+                         number_of_word_tokens))
+
+
 def output_latex(iter_obj, file_path, title, headers,
                  row_functions, column_widths, index=True,
                  lxa_parameters=None, test=False, encoding=ENCODING,
                  number_of_word_types=0, number_of_word_tokens=0,
-                 input_file_path=''):
+                 input_file_path='', header=None):
     """
     Output LaTeX table code for *iter_obj* to *file*.
 
-    :param iter_obj: an iterable object
+    :param iter_obj: an iterable object; rows are written as they come
     :param file_path: file path
     :param title: table title str
     :param headers: list of headers
@@ -140,57 +458,27 @@ def output_latex(iter_obj, file_path, title, headers,
     :param test: whether nosetests are being run; defaults to False.
         If True, *file_path* is overridden by `os.devnull`` so that no
         text files are produced.
+    :param header: header block from ``output_header()``, to share it among
+        files; if not given, it is made from *lxa_parameters*,
+        *number_of_word_types*, *number_of_word_tokens*, and
+        *input_file_path*.
     """
-    if not iter_obj:
+    # nothing is written for an empty iterable
+    iter_obj = iter(iter_obj)
+    first_row_obj = next(iter_obj, _NO_ROW)
+    if first_row_obj is _NO_ROW:
         return
 
     if test:
         file_path = os.devnull
 
-    file = open(file_path, 'w', encoding=encoding)
-
     if not (len(headers) == len(row_functions) == len(column_widths)):
         raise ValueError('headers, row_format, and column_widths '
                          'not of the same size')
 
-    print('Time:', strftime('%Y-%m-%d %H:%M:%S'), file=file)
-    print('Path of this file:', file_path, file=file)
-    print(file=file)
-
-    print('System info:\n'
-          '=============================================', file=file)
-
-    uname = platform.uname()
-    print('System:', uname.system, file=file)
-    print('Node:', uname.node, file=file)
-    print('Release:', uname.release, file=file)
-    print('Version:', uname.version, file=file)
-    print('Machine:', uname.machine, file=file)
-    print('Processor:', uname.processor, file=file)
-    print('Python version:', platform.python_version(), file=file)
-    print(file=file)
-
-    print('Packages:\n=============================================', file=file)
-
-    print('Linguistica', lxa_version, file=file)
-    print('SciPy', scipy_version, file=file)
-    print('NumPy', numpy_version, file=file)
-    print('NetworkX', networkx_version, file=file)
-    print(file=file)
-
-    print('Linguistica parameters:\n'
-          '=============================================', file=file)
-    print(pformat(lxa_parameters), file=file)
-    print(file=file)
-
-    print('Input file information:\n'
-          '=============================================', file=file)
-    print('Path:', input_file_path, file=file)
-    print('Number of word types:', number_of_word_types, file=file)
-    print('Number of word tokens:', number_of_word_tokens, file=file)
-    print(file=file)
-
-    print('Results:\n=============================================', file=file)
+    if header is None:
+        header = output_header(lxa_parameters, number_of_word_types,
+                               number_of_word_tokens, input_file_path)
 
     header_list = list()
 
@@ -198,33 +486,214 @@ def output_latex(iter_obj, file_path, title, headers,
     if index:
         header_list = ['Index'.ljust(index_str_length)]
 
-    for header, col_width in zip(headers, column_widths):
-        header_list.append(header.ljust(col_width))
+    for header_, col_width in zip(headers, column_widths):
+        header_list.append(header_.ljust(col_width))
 
     number_of_columns = len(header_list)
 
-    print(title + '\n', file=file)
-    print('\\begin{{tabular}}{{{}}}'.format('l' * number_of_columns), file=file)
-    print('\\toprule', file=file)
+    def rows():
+        for i, row_obj in enumerate(chain([first_row_obj], iter_obj), 1):
+            if index:
+                row_list = [str(i).ljust(index_str_length)]
+            else:
+                row_list = list()
 
-    print('{} \\\\'.format(' & '.join(header_list)), file=file)
-    print('\\midrule', file=file)
+            for row_func, col_width in zip(row_functions, column_widths):
+                row_list.append(str(row_func(row_obj)).ljust(col_width))
+
+            yield '{} \\\\\n'.format(' & '.join(row_list))
+
+    with open(file_path, 'w', encoding=encoding,
+              buffering=OUTPUT_BUFFER_SIZE) as file:
+        file.write('Time: {}\n'
+                   'Path of this file: {}\n'
+                   '\n'.format(strftime('%Y-%m-%d %H:%M:%S'), file_path))
+        file.write(header)
+        file.write('Results:\n'
+                   '=============================================\n')
+
+        file.write(title + '\n\n')
+        file.write('\\begin{{tabular}}{{{}}}\n'.format('l' * number_of_columns))
+        file.write('\\toprule\n')
+        file.write('{} \\\\\n'.format(' & '.join(header_list)))
+        file.write('\\midrule\n')
+        file.writelines(rows())
+        file.write('\\bottomrule\n')
+        file.write('\\end{tabular}\n\n')
+
+
+def _list_cell(cell):
+    # sets are sorted, as their order is arbitrary
+    if isinstance(cell, (set, frozenset)):
+        return sorted(cell)
+    return list(cell)
 
-    for i, row_obj in enumerate(iter_obj, 1):
-        if index:
-            row_list = [str(i).ljust(index_str_length)]
-        else:
-            row_list = list()
 
-        for row_func, col_width in zip(row_functions, column_widths):
-            row_list.append(str(row_func(row_obj)).ljust(col_width))
+def _table_cells(row, columns):
+    # cast the cells of a row by column type, e.g. numpy ints to int
+    return [_list_cell(cell) if type_ is list else type_(cell)
+            for cell, (_, type_) in zip(row, columns)]
 
-        print('{} \\\\'.format(' & '.join(row_list)), file=file)
 
-    print('\\bottomrule', file=file)
-    print('\\end{tabular}\n', file=file)
+def output_tsv(rows, file_path, columns, encoding=ENCODING):
+    """
+    Output *rows* to a tab-separated values file with a header line.
+    Rows are written as they come, so *rows* can be a generator.
+
+    :param rows: an iterable of row tuples
+    :param file_path: file path
+    :param columns: list of (column name, column type) pairs, where the type
+        is one of str, int, float, and list (of str); list cells are
+        joined by spaces.
+    :param encoding: encoding of the file
+    """
+    with open(file_path, 'w', encoding=encoding, newline='',
+              buffering=OUTPUT_BUFFER_SIZE) as file:
+        writer = csv.writer(file, delimiter='\t', lineterminator='\n')
+        writer.writerow([name for name, _ in columns])
+        writer.writerows([' '.join(cell) if type_ is list else cell
+                          for cell, (_, type_)
+                          in zip(_table_cells(row, columns), columns)]
+                         for row in rows)
+
+
+def output_jsonl(rows, file_path, columns, encoding=ENCODING):
+    """
+    Output *rows* to a JSON Lines file, one JSON object per row with the
+    column names as keys. Rows are written as they come, so *rows* can be
+    a generator.
+
+    :param rows: an iterable of row tuples
+    :param file_path: file path
+    :param columns: list of (column name, column type) pairs, as in
+        ``output_tsv()``
+    :param encoding: encoding of the file
+    """
+    names = [name for name, _ in columns]
+    with open(file_path, 'w', encoding=encoding,
+              buffering=OUTPUT_BUFFER_SIZE) as file:
+        file.writelines(json.dumps(dict(zip(names, _table_cells(row, columns))),
+                                   ensure_ascii=False) + '\n'
+                        for row in rows)
+
 
-    file.close()
+def output_npz(rows, file_path, columns, chunk_size=2 ** 16):
+    """
+    Output *rows* to a NumPy ``.npz`` file with one array per column.
+
+    Columns of int and float are int64 and float64 arrays. A str column is
+    a uint8 array of its UTF-8 strings, each ended by a newline. A list
+    column is a str column of all the list items, plus an int64 array
+    named "<column>_offsets" such that the items of row *i* are those
+    from offsets[i] to offsets[i+1]. ``read_npz()`` reads them back.
+
+    The rows are consumed in chunks of *chunk_size* and the columns are
+    spooled to temporary files, so memory use is bounded even for large
+    tables.
+
+    :param rows: an iterable of row tuples
+    :param file_path: file path
+    :param columns: list of (column name, column type) pairs, as in
+        ``output_tsv()``
+    :param chunk_size: number of rows held in memory at a time
+    """
+    arrays = dict()  # array name: [dtype, temporary file, length]
+
+    def add_array(name, dtype):
+        arrays[name] = [numpy.dtype(dtype), tempfile.TemporaryFile(), 0]
+
+    def write_array(name, data):
+        data = numpy.asarray(data, dtype=arrays[name][0])
+        arrays[name][1].write(data.tobytes())
+        arrays[name][2] += len(data)
+
+    def write_strings(name, strings):
+        data = ''.join(string + '\n' for string in strings).encode('utf8')
+        write_array(name, numpy.frombuffer(data, dtype=numpy.uint8))
+
+    for name, type_ in columns:
+        if type_ is int:
+            add_array(name, numpy.int64)
+        elif type_ is float:
+            add_array(name, numpy.float64)
+        elif type_ is str:
+            add_array(name, numpy.uint8)
+        elif type_ is list:
+            add_array(name, numpy.uint8)
+            add_array(name + '_offsets', numpy.int64)
+            write_array(name + '_offsets', [0])
+        else:
+            raise ValueError('unknown column type -- ' + str(type_))
+
+    try:
+        rows = iter(rows)
+        list_lengths = {name: 0 for name, type_ in columns if type_ is list}
+        while True:
+            chunk = [_table_cells(row, columns)
+                     for row in islice(rows, chunk_size)]
+            if not chunk:
+                break
+
+            for i, (name, type_) in enumerate(columns):
+                cells = [row[i] for row in chunk]
+                if type_ is str:
+                    write_strings(name, cells)
+                elif type_ is list:
+                    write_strings(name, chain.from_iterable(cells))
+                    offsets = numpy.cumsum([len(cell) for cell in cells])
+                    write_array(name + '_offsets',
+                                offsets + list_lengths[name])
+                    list_lengths[name] += int(offsets[-1])
+                else:
+                    write_array(name, cells)
+
+        # the same layout as numpy.savez(): each array is copied from its
+        # temporary file into an .npy file, which is added to the archive
+        # (ZipFile.open() cannot write before Python 3.6)
+        with tempfile.TemporaryDirectory() as directory, \
+                zipfile.ZipFile(file_path, 'w', allowZip64=True) as archive:
+            npy_path = os.path.join(directory, 'array.npy')
+            for name, (dtype, temp_file, length) in arrays.items():
+                with open(npy_path, 'wb') as file:
+                    numpy.lib.format.write_array_header_1_0(
+                        file, {'descr': numpy.lib.format.dtype_to_descr(dtype),
+                               'fortran_order': False, 'shape': (length,)})
+                    temp_file.seek(0)
+                    shutil.copyfileobj(temp_file, file, OUTPUT_BUFFER_SIZE)
+                archive.write(npy_path, name + '.npy')
+    finally:
+        for _, temp_file, _ in arrays.values():
+            temp_file.close()
+
+
+def read_npz(file_path):
+    """
+    Read a file from ``output_npz()``.
+
+    :param file_path: file path
+    :return: dict of column names to int64 or float64 arrays for number
+        columns, lists of str for str columns, and lists of lists of str for
+        list columns
+    :rtype: dict(str: numpy.ndarray or list)
+    """
+    table = dict()
+    with numpy.load(file_path) as arrays:
+        for name in arrays.files:
+            if name.endswith('_offsets') and name[:-8] in arrays.files:
+                continue
+
+            array = arrays[name]
+            if array.dtype != numpy.uint8:
+                table[name] = array
+                continue
+
+            strings = array.tobytes().decode('utf8').split('\n')[:-1]
+            if name + '_offsets' in arrays.files:
+                offsets = arrays[name + '_offsets'].tolist()
+                strings = [strings[start: end] for start, end
+                           in zip(offsets[:-1], offsets[1:])]
+            table[name] = strings
+    return table
 
 
 def vprint(*objects, verbose=False, sep='', end='\n', file=sys.stdout,
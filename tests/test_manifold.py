@@ -2,6 +2,7 @@
 
 import os
 import networkx as nx
+import pytest
 
 import linguistica as lxa
 from linguistica.datasets import brown as corpus_path
@@ -9,8 +10,21 @@ from linguistica.datasets import brown as corpus_path
 data_dir = os.path.join(os.path.dirname(__file__), 'data')
 
 
-def test_words_to_neighbors():
+@pytest.fixture(scope='module')
+def brown_object():
+    # the manifold results with the default parameters (from the word
+    # ngrams), computed once for the tests that do not change them
     lxa_object = lxa.read_corpus(corpus_path, max_word_tokens=50000)
+    lxa_object.run_ngram_module()
+    lxa_object.run_manifold_module()
+    return lxa_object
+
+
+def test_words_to_neighbors():
+    # the expected neighbors were computed from the 6 eigenvectors that the
+    # earlier non-symmetric solver returned (by its default k=6)
+    lxa_object = lxa.read_corpus(corpus_path, max_word_tokens=50000,
+                                 n_eigenvectors=6)
     number_of_neighbors = lxa_object.parameters()['n_neighbors']
     test_object = lxa_object.words_to_neighbors()
     number_of_words = len(test_object)
@@ -55,7 +69,9 @@ def test_contexts_to_words():
 
 
 def test_neighbor_graph():
-    lxa_object = lxa.read_corpus(corpus_path, max_word_tokens=50000)
+    # 6 eigenvectors, as for test_words_to_neighbors()
+    lxa_object = lxa.read_corpus(corpus_path, max_word_tokens=50000,
+                                 n_eigenvectors=6)
     test_object = lxa_object.neighbor_graph()
 
     expected_object = nx.Graph()
@@ -80,3 +96,480 @@ def test_neighbor_graph():
     hit_ratio = number_of_hits / len(expected_edges)
 
     assert hit_ratio > 0.5
+
+
+def test_sparse_laplacian(brown_object):
+    import numpy as np
+    from linguistica import manifold
+
+    wordlist = brown_object.wordlist()[: brown_object.parameters()
+                                       ['max_word_types']]
+    context_array, _, _ = manifold.get_context_array(
+        wordlist, len(wordlist), brown_object.word_bigram_counter(),
+        brown_object.word_trigram_counter(),
+        brown_object.parameters()['min_context_count'])
+    n_words = len(wordlist)
+
+    shared_context_matrix = context_array.dot(context_array.T).todense()
+    diameter = manifold.normalize(n_words, shared_context_matrix)
+    incidence_graph = manifold.compute_incidence_graph(
+        n_words, diameter, shared_context_matrix)
+    expected_object = manifold.compute_laplacian(diameter, incidence_graph)
+
+    shared_context_matrix = manifold.compute_shared_context_matrix(
+        context_array)
+    diameter = manifold.normalize_sparse(shared_context_matrix)
+    incidence_graph = manifold.compute_incidence_graph_sparse(
+        diameter, shared_context_matrix)
+    test_object = manifold.compute_laplacian_sparse(diameter, incidence_graph)
+
+    assert np.allclose(test_object.toarray(), expected_object)
+
+
+def test_eigenvectors(brown_object):
+    n_eigenvectors = brown_object.parameters()['n_eigenvectors']
+    eigenvalues = brown_object.eigenvalues()
+    eigenvectors = brown_object.eigenvectors()
+
+    assert eigenvalues.shape == (n_eigenvectors,)
+    assert eigenvectors.shape == (len(brown_object.words_to_neighbors()),
+                                  n_eigenvectors)
+    assert eigenvectors.dtype.kind == 'f'
+    assert all(eigenvalues[:-1] >= eigenvalues[1:])
+
+
+def test_eigensolvers(brown_object):
+    import numpy as np
+    from linguistica import manifold
+
+    n_eigenvectors = brown_object.parameters()['n_eigenvectors']
+    wordlist = brown_object.wordlist()[: brown_object.parameters()
+                                       ['max_word_types']]
+    context_array, _, _ = manifold.get_context_array(
+        wordlist, len(wordlist), brown_object.word_bigram_counter(),
+        brown_object.word_trigram_counter(),
+        brown_object.parameters()['min_context_count'])
+    shared_context_matrix = manifold.compute_shared_context_matrix(
+        context_array)
+    diameter = manifold.normalize_sparse(shared_context_matrix)
+    incidence_graph = manifold.compute_incidence_graph_sparse(
+        diameter, shared_context_matrix)
+    laplacian = manifold.compute_laplacian_sparse(diameter, incidence_graph)
+
+    expected_values, expected_vectors = np.linalg.eigh(laplacian.toarray())
+    expected_values = expected_values[::-1][:n_eigenvectors]
+
+    eigenvalues, eigenvectors = manifold.compute_eigenvectors(
+        laplacian, n_eigenvectors)
+    assert np.allclose(eigenvalues, expected_values)
+
+    # warm start from the previous eigenvectors
+    eigenvalues, _ = manifold.compute_eigenvectors(
+        laplacian, n_eigenvectors, solver='lobpcg', tol=1e-8,
+        initial_vectors=eigenvectors)
+    assert np.allclose(eigenvalues, expected_values, atol=1e-5)
+
+
+def test_nearest_neighbor_methods(brown_object):
+    import numpy as np
+    from linguistica import manifold
+
+    n_neighbors = brown_object.parameters()['n_neighbors']
+    coordinates = brown_object.eigenvectors()
+
+    def neighbor_distances(nearest_neighbors):
+        return np.linalg.norm(coordinates[nearest_neighbors] -
+                              coordinates[:, np.newaxis, :], axis=2)
+
+    expected_object = neighbor_distances(manifold.compute_nearest_neighbors(
+        coordinates, n_neighbors, method='full'))
+
+    # neighbors at exactly the same distance may come in any order,
+    # so the distances are compared instead of the neighbors themselves
+    for method in ['kdtree', 'partition']:
+        nearest_neighbors = manifold.compute_nearest_neighbors(
+            coordinates, n_neighbors, method=method, block_size=100)
+        assert np.array_equal(nearest_neighbors[:, 0],
+                              np.arange(len(coordinates)))
+        test_object = neighbor_distances(nearest_neighbors)
+        assert np.allclose(test_object, expected_object)
+
+
+def test_get_context_array():
+    from linguistica import manifold
+
+    wordlist = ['the', 'cat', 'sat', 'on', 'mat']
+    bigram_counter = {('the', 'cat'): 3, ('cat', 'sat'): 2, ('sat', 'on'): 1}
+    trigram_counter = {('the', 'cat', 'sat'): 2}
+
+    context_array, words_to_contexts, contexts_to_words = \
+        manifold.get_context_array(wordlist, 2, bigram_counter,
+                                   trigram_counter, min_context_count=2)
+
+    assert words_to_contexts == {
+        'the': {('_', 'cat', 'sat'): 2, ('_', 'cat'): 3},
+        'cat': {('the', '_', 'sat'): 2, ('the', '_'): 3, ('_', 'sat'): 2}}
+    assert contexts_to_words == {
+        ('_', 'cat', 'sat'): {'the': 2}, ('_', 'cat'): {'the': 3},
+        ('the', '_', 'sat'): {'cat': 2}, ('the', '_'): {'cat': 3},
+        ('_', 'sat'): {'cat': 2}}
+    assert context_array.shape == (2, 5)
+    assert context_array.sum(axis=1).tolist() == [[2], [3]]
+
+
+def test_most_common_contexts(brown_object):
+    words_to_contexts = brown_object.words_to_contexts()
+    contexts_to_words = brown_object.contexts_to_words()
+
+    for word in brown_object.wordlist()[:10]:
+        contexts = words_to_contexts[word]
+        expected_object = sorted(contexts.values(), reverse=True)[:5]
+        test_object = contexts.most_common(5)
+        assert [count for _, count in test_object] == expected_object
+
+        for context, count in test_object:
+            assert contexts_to_words[context][word] == count
+
+
+def test_approximate_eigenvectors():
+    import numpy as np
+    from linguistica import manifold
+
+    # a spectrum in [0, 2] like that of the word Laplacian,
+    # with a cluster of unwanted eigenvalues near 0
+    random_state = np.random.RandomState(0)
+    n_words = 300
+    basis, _ = np.linalg.qr(random_state.randn(n_words, n_words))
+    spectrum = np.concatenate([[2, 1.95, 1.9, 1.8, 1.7, 1.6],
+                               random_state.uniform(0.8, 1.2, n_words - 46),
+                               random_state.uniform(0, 0.05, 40)])
+    laplacian = (basis * spectrum).dot(basis.T)
+    laplacian = (laplacian + laplacian.T) / 2
+
+    expected_values, expected_vectors = manifold.compute_eigenvectors(
+        laplacian, 6)
+    test_values, test_vectors = manifold.compute_approximate_eigenvectors(
+        laplacian, 6)
+    np.testing.assert_allclose(test_values, expected_values, atol=1e-2)
+    # the cosines of the angles between the two subspaces
+    cosines = np.linalg.svd(expected_vectors.T.dot(test_vectors),
+                            compute_uv=False)
+    assert cosines.min() > 0.99
+
+
+def test_approximate_embedding(brown_object):
+    n_neighbors = brown_object.parameters()['n_neighbors']
+    n_eigenvectors = brown_object.parameters()['n_eigenvectors']
+    expected_object = brown_object.words_to_neighbors()
+
+    lxa_object = lxa.read_corpus(corpus_path, max_word_tokens=50000)
+    for embedding_method in [1, 2]:  # randomized, Nystrom
+        lxa_object.change_parameters(embedding_method=embedding_method)
+        lxa_object.run_manifold_module()
+        assert lxa_object.eigenvectors().shape[1] == n_eigenvectors
+
+        test_object = lxa_object.words_to_neighbors()
+        number_of_hits = 0
+        for word in test_object:
+            number_of_hits += len(set(test_object[word]) &
+                                  set(expected_object[word]))
+
+        # the approximate neighbors should mostly be the exact ones
+        assert number_of_hits / (len(test_object) * n_neighbors) > 0.5
+
+
+def test_manifold_cache():
+    import numpy as np
+
+    lxa_object = lxa.read_corpus(corpus_path, max_word_tokens=50000)
+    lxa_object.run_manifold_module()
+    eigenvectors = lxa_object.eigenvectors()
+
+    # only the nearest neighbors are re-computed
+    lxa_object.change_parameters(n_neighbors=5)
+    lxa_object.run_manifold_module()
+    assert np.may_share_memory(lxa_object.eigenvectors(), eigenvectors)
+    assert all(len(neighbors) == 5
+               for neighbors in lxa_object.words_to_neighbors().values())
+
+    # fewer eigenvectors than before are taken from the cache
+    lxa_object.change_parameters(n_eigenvectors=6)
+    lxa_object.run_manifold_module()
+    assert np.may_share_memory(lxa_object.eigenvectors(), eigenvectors)
+    assert lxa_object.eigenvectors().shape[1] == 6
+
+    # a new context count threshold means new eigenvectors
+    lxa_object.change_parameters(min_context_count=2)
+    lxa_object.run_manifold_module()
+    assert not np.may_share_memory(lxa_object.eigenvectors(), eigenvectors)
+
+    # new word counts mean a new wordlist
+    max_word_types = len(lxa_object.wordlist()) // 2
+    lxa_object.change_parameters(max_word_types=max_word_types)
+    lxa_object.run_manifold_module()
+    eigenvectors = lxa_object.eigenvectors()
+    rare_word = lxa_object.wordlist()[max_word_types]
+    assert rare_word not in lxa_object.words_to_neighbors()
+    lxa_object.update_word_counts({rare_word: 10 ** 6})
+    lxa_object.run_manifold_module()
+    assert rare_word in lxa_object.words_to_neighbors()
+    assert not np.may_share_memory(lxa_object.eigenvectors(), eigenvectors)
+
+    # with fewer words than eigenvectors, all of them are cached
+    lxa_object = lxa.read_corpus(corpus_path, max_word_tokens=50000,
+                                 max_word_types=8, n_eigenvectors=11)
+    lxa_object.run_manifold_module()
+    eigenvectors = lxa_object.eigenvectors()
+    assert eigenvectors.shape[1] == 8
+    lxa_object.change_parameters(n_neighbors=3)
+    lxa_object.run_manifold_module()
+    assert np.may_share_memory(lxa_object.eigenvectors(), eigenvectors)
+
+
+def test_memory_budget(brown_object):
+    import numpy as np
+    from scipy import sparse
+    from linguistica import manifold
+
+    eigenvalues = brown_object.eigenvalues()
+
+    lxa_object = lxa.read_corpus(corpus_path, max_word_tokens=50000,
+                                 max_memory=100)
+    lxa_object.run_manifold_module()
+    assert lxa_object.eigenvectors().dtype == np.float32
+    np.testing.assert_allclose(lxa_object.eigenvalues(), eigenvalues,
+                               rtol=1e-4)
+
+    context_array = manifold.get_context_array(
+        lxa_object.wordlist(), 500, lxa_object.word_bigram_counter(),
+        lxa_object.word_trigram_counter(), 3, np.int32)[0]
+    assert context_array.dtype == np.int32
+
+    # a tiny budget means the sparse Laplacian and approximate eigenvectors
+    assert manifold.choose_stages(context_array, 11, 0) == \
+        (True, 'randomized')
+
+    # all words share a context: the dense Laplacian if it fits
+    shared = sparse.csr_matrix(np.ones((500, 1), dtype=np.int32))
+    assert manifold.choose_stages(shared, 11, 100) == (False, 'exact')
+    assert manifold.choose_stages(shared, 11, 1) == (True, 'randomized')
+
+
+def test_sparse_neighbor_graph(brown_object):
+    import tempfile
+    from scipy import io
+
+    test_object = brown_object.sparse_neighbor_graph()
+
+    expected_object = nx.Graph()
+    for word, neighbors in brown_object.words_to_neighbors().items():
+        for neighbor in neighbors:
+            expected_object.add_edge(word, neighbor)
+
+    assert set(map(frozenset, test_object.edges())) == \
+        set(map(frozenset, expected_object.edges()))
+    assert test_object.number_of_edges() == expected_object.number_of_edges()
+    assert nx.utils.graphs_equal(brown_object.neighbor_graph(),
+                                 expected_object)
+
+    word = brown_object.wordlist()[0]
+    assert set(test_object.neighbors(word)) == \
+        set(expected_object.neighbors(word))
+
+    expected_components = sorted(nx.connected_components(expected_object),
+                                 key=len, reverse=True)
+    assert [len(c) for c in test_object.connected_components()] == \
+        [len(c) for c in expected_components]
+
+    with tempfile.TemporaryDirectory() as directory:
+        edgelist_path = os.path.join(directory, 'neighbors.txt')
+        test_object.write_edgelist(edgelist_path)
+        graph = nx.read_edgelist(edgelist_path)
+        assert nx.utils.graphs_equal(graph, expected_object)
+
+        graphml_path = os.path.join(directory, 'neighbors.graphml')
+        test_object.write_graphml(graphml_path)
+        graph = nx.read_graphml(graphml_path)
+        assert set(map(frozenset, graph.edges())) == \
+            set(map(frozenset, expected_object.edges()))
+
+        mtx_path = os.path.join(directory, 'neighbors.mtx')
+        test_object.write_matrix_market(mtx_path)
+        adjacency = io.mmread(mtx_path)
+        assert (adjacency != test_object.adjacency).nnz == 0
+
+
+def test_nearest_words(brown_object):
+    import numpy as np
+
+    words_to_neighbors = brown_object.words_to_neighbors()
+    eigenvectors = brown_object.eigenvectors()
+    words = brown_object.sparse_neighbor_graph().words
+    word_to_row = {word: i for i, word in enumerate(words)}
+
+    def distances(word, neighbors):
+        return [np.linalg.norm(eigenvectors[word_to_row[word]] -
+                               eigenvectors[word_to_row[neighbor]])
+                for neighbor in neighbors]
+
+    word = words[0]
+    test_object = brown_object.nearest_words(word)
+    assert word not in test_object
+    np.testing.assert_allclose(distances(word, test_object),
+                               distances(word, words_to_neighbors[word]))
+
+    assert len(brown_object.nearest_words(word, k=20)) == 20
+    assert brown_object.nearest_words(word, k=20)[:9] == test_object
+
+    # a vector query finds the word itself first
+    assert brown_object.nearest_words(eigenvectors[0], k=1) == [word]
+
+    subset = words[10: 30]
+    test_object = brown_object.nearest_words(word, k=5, subset=subset)
+    assert len(test_object) == 5 and set(test_object) <= set(subset)
+    expected = sorted(distances(word, subset))[:5]
+    np.testing.assert_allclose(distances(word, test_object), expected)
+
+    batch = brown_object.nearest_words_batch(words[:50], k=4)
+    for word in words[:50]:
+        np.testing.assert_allclose(
+            distances(word, batch[word]),
+            distances(word, brown_object.nearest_words(word, k=4)))
+
+
+def test_streaming_contexts(brown_object):
+    from linguistica import (manifold, ngram)
+
+    wordlist = brown_object.wordlist()
+
+    word_to_index = {w: i for i, w in enumerate(wordlist)}
+    bigrams, bigram_counts = manifold.encode_ngrams(
+        brown_object.word_bigram_counter(), word_to_index, 2)
+    trigrams, trigram_counts = manifold.encode_ngrams(
+        brown_object.word_trigram_counter(), word_to_index, 3)
+    expected_matrix, expected_keys = manifold.make_context_matrix(
+        500, len(wordlist), bigrams, bigram_counts, trigrams, trigram_counts,
+        min_context_count=3)
+
+    with open(corpus_path, encoding='utf8') as f:
+        sentences = ngram.tokenize(f, max_word_tokens=50000)
+        # a small chunk size for several chunks to merge
+        test_matrix, test_keys = manifold.count_contexts(
+            sentences, wordlist, 500, 3, chunk_size=10000)
+
+    assert (test_keys == expected_keys).all()
+    assert (test_matrix != expected_matrix).nnz == 0
+
+    # the contexts are counted from the corpus if there are no word ngrams
+    streaming_object = lxa.read_corpus(corpus_path, max_word_tokens=50000)
+    streaming_object.run_manifold_module()
+    assert dict(streaming_object.words_to_contexts().items()) == \
+        dict(brown_object.words_to_contexts().items())
+    # ... in the same pass as for the word ngrams
+    streaming_object.corpus_file_object.close()
+    assert streaming_object.word_bigram_counter() == \
+        brown_object.word_bigram_counter()
+
+
+def test_minhash_neighbors(brown_object):
+    import numpy as np
+    from scipy import sparse
+    from linguistica import manifold
+
+    # words 0 and 1 share all their contexts, and so do words 2 and 3
+    context_array = sparse.csr_matrix(np.array([[1, 1, 1, 0, 0, 0],
+                                                [1, 1, 1, 0, 0, 0],
+                                                [0, 0, 1, 1, 1, 1],
+                                                [0, 0, 0, 1, 1, 1],
+                                                [0, 0, 0, 0, 0, 0]]))
+    left, right = manifold.lsh_candidate_pairs(
+        manifold.minhash_signatures(context_array))
+    assert (0, 1) in set(zip(left, right))
+    assert (left < right).all()
+
+    nearest_neighbors = manifold.compute_minhash_neighbors(context_array, 1)
+    assert nearest_neighbors.tolist() == [[0, 1], [1, 0], [2, 3], [3, 2],
+                                          [4, 0]]
+
+    spectral_neighbors = brown_object.words_to_neighbors()
+    lxa_object = lxa.read_corpus(corpus_path, max_word_tokens=50000,
+                                 neighbor_method=1)
+    words_to_neighbors = lxa_object.words_to_neighbors()
+
+    assert lxa_object.eigenvectors() is None
+    assert words_to_neighbors.keys() == spectral_neighbors.keys()
+    for word, neighbors in words_to_neighbors.items():
+        assert len(neighbors) == 9
+        assert word not in neighbors
+    assert 0 <= manifold.neighbor_overlap(words_to_neighbors,
+                                          spectral_neighbors) <= 1
+
+
+def test_cosine_neighbors():
+    import numpy as np
+    from scipy import sparse
+    from linguistica import manifold
+
+    random = np.random.RandomState(0)
+    context_array = sparse.random(200, 300, density=0.05, format='csr',
+                                  random_state=random)
+    context_array.data[:] = 1
+
+    # brute force with the full similarity matrix
+    dense = context_array.toarray()
+    norms = np.linalg.norm(dense, axis=1)
+    norms[norms == 0] = 1
+    similarities = dense.dot(dense.T) / np.outer(norms, norms)
+    np.fill_diagonal(similarities, -np.inf)
+
+    for block_size, n_jobs in [(None, 1), (7, 3)]:
+        fractions = list()
+        progress = lxa.util.Progress(
+            lambda message, fraction: fractions.append(fraction))
+        nearest_neighbors = manifold.compute_cosine_neighbors(
+            context_array, 5, block_size=block_size, n_jobs=n_jobs,
+            progress=progress)
+        assert fractions and fractions == sorted(fractions)
+        assert (nearest_neighbors[:, 0] == np.arange(200)).all()
+        test_object = similarities[np.arange(200)[:, np.newaxis],
+                                   nearest_neighbors[:, 1:]]
+        expected_object = -np.sort(-similarities, axis=1)[:, :5]
+        np.testing.assert_allclose(test_object, expected_object)
+
+    lxa_object = lxa.read_corpus(corpus_path, max_word_tokens=50000,
+                                 neighbor_method=2)
+    for word, neighbors in lxa_object.words_to_neighbors().items():
+        assert len(neighbors) == 9
+        assert word not in neighbors
+
+
+def test_word_clusters(brown_object):
+    import numpy as np
+    from scipy import sparse
+    from linguistica import manifold
+
+    # three well-separated blobs
+    random = np.random.RandomState(0)
+    centers = np.array([[0, 0], [10, 0], [0, 10]])
+    points = np.repeat(centers, 100, axis=0) + random.randn(300, 2)
+    labels, _ = manifold.minibatch_kmeans(points, 3, batch_size=50)
+    for i in range(3):
+        assert len(set(labels[i * 100: (i + 1) * 100])) == 1
+    assert len(set(labels)) == 3
+
+    # two cliques joined by one edge
+    adjacency = np.zeros((10, 10))
+    adjacency[:5, :5] = adjacency[5:, 5:] = 1
+    adjacency[4, 5] = adjacency[5, 4] = 1
+    np.fill_diagonal(adjacency, 0)
+    labels = manifold.label_propagation(sparse.csr_matrix(adjacency))
+    assert len(set(labels[:5])) == len(set(labels[5:])) == 1
+    assert labels[0] != labels[9]
+
+    words = set(brown_object.words_to_neighbors())
+    for method in ['kmeans', 'label_propagation']:
+        clusters = brown_object.word_clusters(5, method=method)
+        assert set().union(*clusters) == words
+        assert sum(len(cluster) for cluster in clusters) == len(words)
+    assert len(brown_object.word_clusters(5)) <= 5
+    assert brown_object.word_clusters(5) is brown_object.word_clusters(5)
@@ -50,3 +50,27 @@ def test_word_trigram_counter():
     expected_object_path = os.path.join(data_dir, 'word_trigram_counter.txt')
     expected_object = eval(open(expected_object_path).read())
     assert test_object == expected_object
+
+
+def test_encode():
+    from io import StringIO
+    from linguistica import ngram
+
+    corpus = 'the cat sat\n\nthe cat\nsat on the cat\n'
+    word_types, codes = ngram.encode(StringIO(corpus))
+    assert word_types == ['the', 'cat', 'sat', 'on']
+    assert codes.tolist() == [0, 1, 2, -1, 0, 1, -1, 2, 3, 0, 1, -1]
+    assert list(ngram.decode(word_types, codes)) == \
+        list(ngram.tokenize(StringIO(corpus)))
+
+    # ngrams do not cross lines, in the order of their first occurrence
+    assert list(ngram.count_encoded(word_types, codes, 1).items()) == \
+        [('the', 3), ('cat', 3), ('sat', 2), ('on', 1)]
+    assert list(ngram.count_encoded(word_types, codes, 2).items()) == \
+        [(('the', 'cat'), 3), (('cat', 'sat'), 1), (('sat', 'on'), 1),
+         (('on', 'the'), 1)]
+    assert ngram.count_encoded(word_types, codes, 3) == \
+        {('the', 'cat', 'sat'): 1, ('sat', 'on', 'the'): 1,
+         ('on', 'the', 'cat'): 1}
+    assert ngram.run(StringIO(corpus)) == tuple(
+        ngram.count_encoded(word_types, codes, n) for n in (1, 2, 3))
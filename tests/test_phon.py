@@ -1,5 +1,6 @@
 # -*- encoding: utf8 -*-
 
+import math
 import os
 
 import pytest
@@ -63,3 +64,118 @@ def test_word_phonology_dict():
     lxa_object = lxa.read_corpus(corpus_path, max_word_tokens=50000)
     _ = lxa_object.word_phonology_dict()
     assert True  # TODO: only testing if there are errors for now...
+
+
+def test_phonology_tables():
+    from linguistica import phon
+    from linguistica.datasets import cmudict
+    lxa_object = lxa.read_wordlist(cmudict)
+    word_unigram_counter = lxa_object.word_unigram_counter()
+    words_to_phones = lxa_object.words_to_phones()
+
+    unigrams, bigrams, trigrams = phon.make_word_ngrams(word_unigram_counter,
+                                                        words_to_phones)
+    assert lxa_object.phone_unigram_counter() == unigrams
+    assert lxa_object.phone_bigram_counter() == bigrams
+    assert lxa_object.phone_trigram_counter() == trigrams
+
+    phone_dict = phon.make_phone_dict(unigrams)
+    biphone_dict = phon.make_biphone_dict(bigrams, phone_dict)
+    expected_object = phon.make_word_dict(word_unigram_counter, phone_dict,
+                                          biphone_dict, words_to_phones)
+    test_object = lxa_object.word_phonology_dict()
+    assert list(test_object) == list(expected_object)
+    for word in ['the', 'linguistics', 'zoo']:
+        test_word = test_object[word]
+        expected_word = expected_object[word]
+        assert test_word.phones == expected_word.phones
+        assert test_word.count == expected_word.count
+        for attr in ['frequency', 'unigram_plog', 'avg_unigram_plog',
+                     'bigram_plog', 'avg_bigram_plog']:
+            assert getattr(test_word, attr) == \
+                pytest.approx(getattr(expected_word, attr))
+
+
+def test_score_phonotactics():
+    from linguistica.datasets import cmudict
+    lxa_object = lxa.read_wordlist(cmudict)
+    words = ['the', 'linguistics']
+    test_object = lxa_object.score_phonotactics(
+        [lxa_object.words_to_phones()[word] for word in words])
+    expected_object = [lxa_object.word_phonology_dict()[word].avg_bigram_plog
+                       for word in words]
+    assert test_object == pytest.approx(expected_object)
+
+    # unseen phones and biphones are scored with the floor
+    scores = lxa_object.score_phonotactics([['DH', 'AH0'], ['DH', 'XX']])
+    assert scores[0] < scores[1] < float('inf')
+    low_floor_scores = lxa_object.score_phonotactics([['DH', 'XX']],
+                                                     floor=1e-12)
+    assert low_floor_scores[0] > scores[1]
+
+
+def test_phonotactic_model():
+    from linguistica import phon
+    tables = phon.make_phonology_tables({'ab': 1})
+    model = phon.PhonotacticModel(tables, order=3, discount=0.75)
+
+    # "#ab#": P(a|#) = P(b|a) = P(#|b) = 0.25 + 0.75 * 1/3 = 0.5, and
+    # P(b|#a) = P(#|ab) = 0.25 + 0.75 * 0.5 = 0.625
+    expected_plog = -math.log2(0.5 * 0.625 * 0.625)
+    assert model.score(['ab'], average=False)[0] == \
+        pytest.approx(expected_plog)
+    assert tables.trigram_plog[0] == pytest.approx(expected_plog)
+    assert model.score([['a', 'b']])[0] == pytest.approx(expected_plog / 3)
+
+
+def test_trigram_plog():
+    word_unigram_counter = {'abc': 3, 'abd': 1, 'bcd': 2}
+    lxa_object = lxa.from_wordlist(word_unigram_counter, keep_case=True)
+    scores = lxa_object.score_phonotactics(['abc', 'cba', 'axz'], order=3)
+    assert scores[0] < scores[1] < scores[2]
+    assert lxa_object.word_phonology_dict()['abc'].avg_trigram_plog == \
+        pytest.approx(scores[0])
+
+
+def test_update_word_counts():
+    from linguistica import phon
+    word_unigram_counter = {'abc': 3, 'abd': 1, 'bcd': 2}
+    updates = {'abd': 4, 'bca': 1, 'dcb': 2}
+    lxa_object = lxa.from_wordlist(dict(word_unigram_counter), keep_case=True)
+    lxa_object.run_phon_module()
+    lxa_object.update_word_counts(updates)
+
+    word_unigram_counter.update(updates)
+    unigrams, bigrams, trigrams = phon.make_word_ngrams(word_unigram_counter)
+    assert lxa_object.phone_unigram_counter() == unigrams
+    assert lxa_object.phone_bigram_counter() == bigrams
+    assert lxa_object.phone_trigram_counter() == trigrams
+
+    expected_object = phon.make_phonology_tables(word_unigram_counter)
+    test_object = lxa_object.word_phonology_dict()
+    assert list(test_object) == expected_object.words
+    for attr in ['unigram_plog', 'bigram_plog', 'trigram_plog']:
+        assert [getattr(test_object[word], attr) for word in test_object] == \
+            pytest.approx(list(getattr(expected_object, attr)))
+
+
+def test_update_word_counts_to_zero():
+    lxa_object = lxa.from_wordlist({'abc': 3, 'xyz': 1, 'ab': 2},
+                                   keep_case=True)
+    lxa_object.run_phon_module()
+    lxa_object.update_word_counts({'xyz': 0, 'ab': 0})
+
+    expected_object = lxa.from_wordlist({'abc': 3}, keep_case=True)
+    assert lxa_object.phone_unigram_counter() == \
+        expected_object.phone_unigram_counter()
+    assert lxa_object.phone_bigram_counter() == \
+        expected_object.phone_bigram_counter()
+    assert lxa_object.phone_trigram_counter() == \
+        expected_object.phone_trigram_counter()
+    assert set(lxa_object.phone_dict()) == {'#', 'a', 'b', 'c'}
+
+    test_object = lxa_object.word_phonology_dict()
+    assert test_object['abc'].bigram_plog == pytest.approx(
+        expected_object.word_phonology_dict()['abc'].bigram_plog)
+    assert math.isinf(test_object['xyz'].unigram_plog)
+    assert math.isinf(test_object['ab'].bigram_plog)
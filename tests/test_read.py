@@ -5,10 +5,11 @@ import os
 import pytest
 
 import linguistica as lxa
-from linguistica import (Lexicon,
+from linguistica import (Lexicon, database,
                          read_corpus, read_wordlist, from_corpus, from_wordlist)
 from linguistica.datasets import brown as corpus_path
 from linguistica.datasets import cmudict as wordlist_path
+from linguistica.util import (Cancelled, Progress)
 
 
 data_dir = os.path.join(os.path.dirname(__file__), 'data')
@@ -33,6 +34,37 @@ def test_read_wordlist():
     assert isinstance(read_wordlist(wordlist_path), Lexicon)
 
 
+def test_read_wordlist_cache(tmp_path):
+    wordlist_file = tmp_path / 'wordlist.txt'
+    wordlist_file.write_text('# comment\n'
+                             'Cat 3 K AE1 T\n'
+                             'dog 2\n'
+                             'cat 5 K AE1 T\n'
+                             'ox\n'
+                             'hen +4\n'
+                             'pig x\n', encoding='utf8')
+    cache_dir = str(tmp_path / 'cache')
+    for _ in range(2):  # parse and write the cache, then read the cache
+        test_object = read_wordlist(str(wordlist_file), cache_dir=cache_dir)
+        assert test_object.word_unigram_counter() == {'cat': 5, 'dog': 2,
+                                                      'ox': 1, 'hen': 4,
+                                                      'pig': 1}
+        assert test_object.words_to_phones() == {'cat': ['K', 'AE1', 'T'],
+                                                 'dog': ['d', 'o', 'g'],
+                                                 'ox': ['o', 'x'],
+                                                 'hen': ['h', 'e', 'n'],
+                                                 'pig': ['p', 'i', 'g']}
+    assert len(os.listdir(cache_dir)) == 1
+
+    # no cache unless asked for
+    assert read_wordlist(str(wordlist_file)).cache_dir is None
+
+    # a changed file is parsed again
+    wordlist_file.write_text('cat 7\n', encoding='utf8')
+    test_object = read_wordlist(str(wordlist_file), cache_dir=cache_dir)
+    assert test_object.word_unigram_counter() == {'cat': 7}
+
+
 def test_from_corpus():
     corpus_str = open(corpus_path, encoding='utf8').read()
     assert isinstance(from_corpus(corpus_str), Lexicon)
@@ -70,6 +102,22 @@ def test_run_all_modules():
     assert True  # test if there are errors
 
 
+def test_run_all_modules_cancelled():
+    lxa_object = lxa.read_corpus(corpus_path, max_word_tokens=50000)
+    progress = Progress()
+
+    def cancel_in_tries(message, fraction):
+        if message == 'Tries':
+            progress.cancel()
+
+    progress.callback = cancel_in_tries
+    with pytest.raises(Cancelled):
+        lxa_object.run_all_modules(progress=progress)
+    assert lxa_object._word_unigram_counter is not None
+    assert lxa_object._successors is None
+    assert lxa_object._words_to_neighbors is None
+
+
 def test_run_ngram_module():
     lxa_object = lxa.read_corpus(corpus_path, max_word_tokens=50000)
     lxa_object.run_ngram_module()
@@ -105,3 +153,115 @@ def test_output_all_results():
     lxa_object.run_all_modules()
     lxa_object.output_all_results(test=True)
     assert True  # test if there are errors
+
+
+@pytest.fixture(scope='module')
+def results_object():
+    # all results, computed once for the tests that write them out
+    lxa_object = lxa.read_corpus(corpus_path, max_word_tokens=50000)
+    lxa_object.run_all_modules()
+    return lxa_object
+
+
+def test_export(tmp_path, results_object):
+    tsv_paths = results_object.export(str(tmp_path), format='tsv')
+    jsonl_paths = results_object.export(str(tmp_path), format='jsonl')
+    npz_paths = results_object.export(str(tmp_path), format='npz')
+    assert len(tsv_paths) == len(jsonl_paths) == len(npz_paths)
+
+    trigrams = lxa.util.read_npz(str(tmp_path / 'word_trigrams.npz'))
+    assert dict(zip(map(tuple, trigrams['words']), trigrams['count'])) == \
+        results_object.word_trigram_counter()
+
+    with open(str(tmp_path / 'word_unigrams.tsv'), encoding='utf8') as f:
+        assert next(f) == 'word\tcount\n'
+        word, count = next(f).split()
+    assert results_object.word_unigram_counter()[word] == int(count)
+
+    with pytest.raises(ValueError):
+        results_object.export(str(tmp_path), format='xml')
+
+
+def test_sqlite(tmp_path, results_object):
+    db_path = str(tmp_path / 'results.sqlite')
+    results_object.to_sqlite(db_path)
+
+    db_object = lxa.read_sqlite(db_path)
+    assert db_object.parameters() == results_object.parameters()
+    assert db_object.number_of_word_tokens() == \
+        results_object.number_of_word_tokens()
+    assert list(db_object.wordlist()) == results_object.wordlist()
+    assert db_object.wordlist()[:5] == results_object.wordlist()[:5]
+    assert dict(db_object.word_trigram_counter().items()) == \
+        results_object.word_trigram_counter()
+    assert dict(db_object.signatures_to_stems().items()) == \
+        results_object.signatures_to_stems()
+    assert dict(db_object.words_to_sigtransforms().items()) == \
+        results_object.words_to_sigtransforms()
+    assert set(db_object.affixes()) == results_object.affixes()
+
+    word = results_object.wordlist()[0]
+    assert db_object.words_to_neighbors()[word] == \
+        results_object.words_to_neighbors()[word]
+    assert db_object.successors()[word] == results_object.successors()[word]
+    assert 'no such word' not in db_object.word_unigram_counter()
+
+    # the stored word ngrams and neighbors are written out, not recomputed
+    db_object.run_all_modules()
+    for test_object, name in [(results_object, 'corpus'), (db_object, 'db')]:
+        os.mkdir(str(tmp_path / name))
+        test_object.export(str(tmp_path / name), format='tsv')
+    for fname in ['word_bigrams.tsv', 'words_to_neighbors.tsv']:
+        with open(str(tmp_path / 'corpus' / fname), encoding='utf8') as f:
+            expected = sorted(f)
+        with open(str(tmp_path / 'db' / fname), encoding='utf8') as f:
+            assert sorted(f) == expected
+
+    graph = results_object.sparse_neighbor_graph()
+    db_graph = db_object.sparse_neighbor_graph()
+    assert db_graph.words == graph.words
+    assert (db_graph.adjacency != graph.adjacency).nnz == 0
+
+
+def test_sqlite_update_word_counts(tmp_path, results_object):
+    db_path = str(tmp_path / 'results.sqlite')
+    results_object.to_sqlite(db_path)
+
+    db_object = lxa.read_sqlite(db_path)
+    db_object.phone_unigram_counter()
+    word = db_object.wordlist()[0]
+    count = db_object.word_unigram_counter()[word]
+    db_object.update_word_counts({word: 1, 'zzyzx': 5})
+
+    assert db_object.word_unigram_counter()[word] == 1
+    assert db_object.word_unigram_counter()['zzyzx'] == 5
+    assert db_object.number_of_word_types() == \
+        results_object.number_of_word_types() + 1
+    assert db_object.phone_unigram_counter()['z'] >= 15
+    # the database itself is left as it is
+    assert lxa.read_sqlite(db_path).word_unigram_counter()[word] == count
+
+
+def test_sqlite_empty_sets(tmp_path):
+    db_path = str(tmp_path / 'results.sqlite')
+    database.write_database(
+        db_path, {'number_of_word_types': 2, 'number_of_word_tokens': 3},
+        dict(), ['cat', 'cats'], {'cat': 2, 'cats': 1},
+        stems_to_words={'cat': {'cat', 'cats'}, 'dog': set()},
+        signatures_to_stems={('NULL', 's'): set()},
+        signatures_to_words={('NULL', 's'): set()},
+        words_to_signatures={'cat': set()},
+        words_to_sigtransforms={'cat': set()},
+        successors={'cat': set()}, predecessors={'cats': set()})
+
+    results = database.read_results(database.connect(db_path))
+    assert dict(results['stems_to_words'].items()) == \
+        {'cat': {'cat', 'cats'}, 'dog': set()}
+    assert results['signatures_to_stems'][('NULL', 's')] == set()
+    assert results['words_to_sigtransforms']['cat'] == set()
+    assert results['successors']['cat'] == set()
+    # no keys from the rows of the empty sets of the other direction
+    assert dict(results['stems_to_signatures'].items()) == dict()
+    assert list(results['signatures_to_words']) == list()
+    assert len(results['signatures_to_words']) == 0
+    assert results['word_bigram_counter'] is None
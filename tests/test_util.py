@@ -1,6 +1,11 @@
 # -*- encoding: utf8 -*-
 
-from linguistica.util import (vprint, check_py_version)
+from linguistica.util import (vprint, check_py_version, output_header,
+                              output_latex, output_npz, read_npz,
+                              double_sorted, ranked, ranked_items,
+                              top_k_indices, Cancelled, Progress)
+
+import pytest
 
 def test_vprint():
     assert vprint('x', verbose=False) is None
@@ -8,3 +13,78 @@ def test_vprint():
 
 def test_check_py_version():
     assert check_py_version() is None
+
+def test_output_latex(tmp_path):
+    header = output_header({'min_stem_length': 4}, 2, 3, 'input.txt')
+    f_path = str(tmp_path / 'out.txt')
+    output_latex(((word, count) for word, count in [('a', 2), ('b', 1)]),
+                 f_path, title='Words', headers=['Word', 'Count'],
+                 row_functions=[lambda x: x[0], lambda x: x[1]],
+                 column_widths=[5, 0], header=header)
+    with open(f_path, encoding='utf8') as f:
+        text = f.read()
+    assert header in text
+    assert text.endswith('\\midrule\n'
+                         '1          & a     & 2 \\\\\n'
+                         '2          & b     & 1 \\\\\n'
+                         '\\bottomrule\n'
+                         '\\end{tabular}\n\n')
+
+    empty_path = tmp_path / 'empty.txt'
+    output_latex(iter([]), str(empty_path), title='Words', headers=['Word'],
+                 row_functions=[lambda x: x], column_widths=[5], header=header)
+    assert not empty_path.exists()
+
+def test_output_npz(tmp_path):
+    columns = [('word', str), ('count', int), ('plog', float),
+               ('phones', list)]
+    rows = [('ab', 2, 0.5, ['a', 'b']), ('', 1, 1.5, []),
+            ('é', 3, 2.5, {'e', 'é'})]
+    f_path = str(tmp_path / 'out.npz')
+    output_npz(iter(rows), f_path, columns, chunk_size=2)
+    table = read_npz(f_path)
+    assert table['word'] == ['ab', '', 'é']
+    assert table['count'].tolist() == [2, 1, 3]
+    assert table['plog'].tolist() == [0.5, 1.5, 2.5]
+    assert table['phones'] == [['a', 'b'], [], ['e', 'é']]
+
+def test_ranked():
+    items = [('b', 2), ('a', 2), ('c', 3), ('d', 1), ('e', 2)]
+    expected = double_sorted(items, key=lambda x: x[1], reverse=True)
+    for k in range(len(items) + 2):
+        assert ranked(iter(items), key=lambda x: x[1], reverse=True,
+                      k=k) == expected[:k]
+    assert ranked(items, key=lambda x: x[1], reverse=True, min_key=2) == \
+        [('c', 3), ('a', 2), ('b', 2), ('e', 2)]
+
+def test_ranked_items():
+    mapping = {'b': {1, 2}, 'a': {3, 4}, 'c': {5, 6, 7}, 'd': set(),
+               'e': {8, 9}}
+    expected = double_sorted(mapping.items(), key=lambda x: len(x[1]),
+                             reverse=True)
+    for k in [None, 0, 2, 10]:
+        assert list(ranked_items(mapping, key=len, reverse=True, k=k)) == \
+            expected[:k]
+    assert list(ranked_items(dict())) == []
+
+def test_top_k_indices():
+    values = [3, 1, 3, 2, 3, 0]
+    assert top_k_indices(values, 2, reverse=True).tolist() == [0, 2]
+    assert top_k_indices(values, 3).tolist() == [5, 1, 3]
+    assert top_k_indices(values, reverse=True).tolist() == [0, 2, 4, 3, 1, 5]
+
+def test_progress():
+    reports = []
+    progress = Progress(lambda message, fraction: reports.append(
+        (message, round(fraction, 6))))
+    child = progress.stage(0.5, 1, 'second half')
+    assert list(child.track(range(4), every=2)) == [0, 1, 2, 3]
+    assert reports == [('second half', 0.5), ('second half', 0.75),
+                       ('second half', 1.0)]
+
+    progress.cancel()
+    assert child.cancelled
+    with pytest.raises(Cancelled):
+        list(child.track(range(4)))
+    with pytest.raises(Cancelled):
+        progress.stage(0, 0.5)